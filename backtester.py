@@ -0,0 +1,271 @@
+import argparse
+import heapq
+import logging
+import time
+import numpy as np
+import pandas as pd
+from ohlcv_cache import OHLCVCache
+from risk_management import DynamicRiskManagement
+from performance_analytics import PerformanceAnalytics
+
+MODES = ('vectorized', 'event')
+ACTIONS = {'buy': 1.0, 'sell': -1.0, 'close': 0.0}
+FIELDS = ['open', 'high', 'low', 'close', 'volatility', 'position', 'stop_loss', 'take_profit']
+
+
+def _ffill(x):
+    """Forward-fill NaNs along the time axis of a (symbols x time) array."""
+    index = np.where(~np.isnan(x), np.arange(x.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    return np.take_along_axis(x, index, axis=1)
+
+
+class Backtester:
+    """Replays cached candles through a Strategy, DynamicRiskManagement and PerformanceAnalytics.
+
+    ``vectorized`` mode holds each symbol's target position from the strategy's
+    signals and computes the returns of all symbols in one array pass.
+    ``event`` mode opens risk-sized positions and closes each one on the first
+    bar whose range crosses its stop loss or take profit, or when the strategy
+    changes its target. Orders fill at the close of the signal bar, as in
+    live trading.
+    """
+
+    def __init__(self, config, cache=None):
+        backtest_config = config['backtesting']
+        self.config = config
+        self.start = pd.Timestamp(backtest_config['start_date'])
+        # end_date is inclusive
+        self.end = pd.Timestamp(backtest_config['end_date']) + pd.Timedelta(days=1)
+        self.initial_balance = backtest_config['initial_balance']
+        self.fee_rate = backtest_config.get('fee_rate', 0.00055)
+        self.warmup = backtest_config.get('warmup', 200)
+        self.timeframe = config['data_fetcher']['timeframe']
+        self.volatility_window = config['data_fetcher'].get('limit', 1000)
+        self.stop_loss_pct = config['risk_management']['stop_loss_pct']
+        self.take_profit_pct = config['risk_management']['take_profit_pct']
+        self.cache = cache
+
+    def load(self, symbols):
+        """Cached candles from ``warmup`` bars before the start date to the end date."""
+        if self.cache is None:
+            self.cache = OHLCVCache(self.config['data_fetcher']['cache_dir'])
+        frames = {}
+        for symbol in symbols:
+            df = self.cache.read(symbol, self.timeframe)
+            first = df.index.searchsorted(self.start)
+            df = df.iloc[max(0, first - self.warmup):df.index.searchsorted(self.end)]
+            if df.empty:
+                logging.warning(f"No cached {self.timeframe} candles for {symbol} in the backtest window, skipping")
+                continue
+            frames[symbol] = df
+        return frames
+
+    def signals(self, strategy, df):
+        """Per-row target position (1 long, -1 short, 0 flat, NaN unchanged), stop loss and take profit."""
+        frame = strategy.signal_frame(df)
+        if frame is not None:
+            nan = np.full(len(df), np.nan)
+            return (frame['position'].to_numpy(dtype=float),
+                    frame['stop_loss'].to_numpy(dtype=float) if 'stop_loss' in frame else nan,
+                    frame['take_profit'].to_numpy(dtype=float) if 'take_profit' in frame else nan)
+
+        # no vectorized form: replay generate_signals bar by bar on the history up to each bar
+        position, stop_loss, take_profit = (np.full(len(df), np.nan) for _ in range(3))
+        for i in range(df.index.searchsorted(self.start), len(df)):
+            signal = strategy.generate_signals(df.iloc[:i + 1], None, None, None, None)
+            if not signal or signal.get('action') not in ACTIONS:
+                continue
+            position[i] = ACTIONS[signal['action']]
+            stop_loss[i] = signal.get('stop_loss') or np.nan
+            take_profit[i] = signal.get('take_profit') or np.nan
+        return position, stop_loss, take_profit
+
+    def _panel(self, strategy, frames):
+        in_window = {symbol: (df.index >= self.start) & (df.index < self.end) for symbol, df in frames.items()}
+        grid = np.unique(np.concatenate([df.index.values[in_window[symbol]] for symbol, df in frames.items()]))
+        panel = {field: np.full((len(frames), len(grid)), np.nan) for field in FIELDS}
+        for i, (symbol, df) in enumerate(frames.items()):
+            rows = in_window[symbol]
+            columns = np.searchsorted(grid, df.index.values[rows])
+            position, stop_loss, take_profit = self.signals(strategy, df)
+            volatility = df['close'].pct_change().rolling(self.volatility_window, min_periods=2).std().to_numpy()
+            series = {'position': position, 'stop_loss': stop_loss, 'take_profit': take_profit,
+                      'volatility': volatility}
+            for field in FIELDS:
+                values = series[field] if field in series else df[field].to_numpy(dtype=float)
+                panel[field][i, columns] = values[rows]
+        panel['close'] = _ffill(panel['close'])
+        panel['volatility'] = _ffill(panel['volatility'])
+        return pd.DatetimeIndex(grid), panel
+
+    def run(self, strategy, frames, mode='vectorized'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown backtest mode {mode!r}, expected one of {MODES}")
+        symbols = list(frames)
+        grid, panel = self._panel(strategy, frames)
+        held = np.nan_to_num(_ffill(panel['position']))
+        if mode == 'vectorized':
+            equity, trades = self._run_vectorized(symbols, grid, panel, held, strategy.strategy_type)
+        else:
+            equity, trades = self._run_events(symbols, grid, panel, held, strategy.strategy_type)
+
+        analytics = PerformanceAnalytics(initial_capital=self.initial_balance, history=max(len(equity), 1),
+                                         trade_history=None)
+        for value in equity:
+            analytics.record_equity(value)
+        for trade in trades:
+            analytics.record_trade(trade)
+        return {
+            'equity': pd.Series(equity, index=grid),
+            'trades': trades,
+            'metrics': analytics.calculate_metrics(),
+        }
+
+    def _run_vectorized(self, symbols, grid, panel, held, strategy_name):
+        close = panel['close']
+        returns = np.zeros_like(close)
+        returns[:, 1:] = np.nan_to_num(close[:, 1:] / close[:, :-1] - 1)
+        turnover = np.abs(np.diff(held, axis=1, prepend=0))
+        strategy_returns = np.zeros_like(close)
+        strategy_returns[:, 1:] = held[:, :-1] * returns[:, 1:]
+        strategy_returns -= turnover * self.fee_rate
+
+        # equal capital per symbol, rebalanced every bar
+        equity = self.initial_balance * np.cumprod(1 + strategy_returns.mean(axis=0))
+
+        capital = self.initial_balance / len(symbols)
+        cumulative = np.cumsum(strategy_returns, axis=1)
+        trades = []
+        for i, symbol in enumerate(symbols):
+            starts = np.flatnonzero(turnover[i])
+            ends = np.append(starts[1:], held.shape[1] - 1)
+            for start, end in zip(starts, ends):
+                if held[i, start] == 0:
+                    continue
+                trade_return = cumulative[i, end] - cumulative[i, start] - self.fee_rate
+                trades.append({
+                    'symbol': symbol,
+                    'strategy': strategy_name,
+                    'side': 'buy' if held[i, start] > 0 else 'sell',
+                    'entry_time': grid[start],
+                    'exit_time': grid[end],
+                    'entry_price': close[i, start],
+                    'exit_price': close[i, end],
+                    'return': trade_return,
+                    'profit': trade_return * capital,
+                })
+        return equity, trades
+
+    def _find_exit(self, panel, i, start, end, direction, stop_loss, take_profit):
+        """First bar after ``start`` whose range crosses the stop or the target; the stop wins ties."""
+        low = panel['low'][i, start + 1:end + 1]
+        high = panel['high'][i, start + 1:end + 1]
+        if direction > 0:
+            stop_hit, target_hit = low <= stop_loss, high >= take_profit
+        else:
+            stop_hit, target_hit = high >= stop_loss, low <= take_profit
+        hit = stop_hit | target_hit
+        if not hit.any():
+            return end, panel['close'][i, end], 'signal'
+
+        k = int(np.argmax(hit))
+        bar = start + 1 + k
+        opening = panel['open'][i, bar]
+        # a gap through the level fills at the open
+        if stop_hit[k]:
+            price = np.fmin(opening, stop_loss) if direction > 0 else np.fmax(opening, stop_loss)
+            return bar, price, 'stop_loss'
+        price = np.fmax(opening, take_profit) if direction > 0 else np.fmin(opening, take_profit)
+        return bar, price, 'take_profit'
+
+    def _run_events(self, symbols, grid, panel, held, strategy_name):
+        risk_management = DynamicRiskManagement(self.config['risk_management'])
+        n_bars = len(grid)
+        changed = np.diff(held, axis=1, prepend=0) != 0
+        realized = np.zeros(n_bars)
+        unrealized = np.zeros(n_bars)
+        current_positions = {}
+        open_positions = []
+        trades = []
+
+        def close_until(bar):
+            while open_positions and open_positions[0][0] <= bar:
+                exit_bar, _, symbol, exit_price, reason = heapq.heappop(open_positions)
+                position = current_positions.pop(symbol)
+                size, entry_price, direction = position['size'], position['entry_price'], position['direction']
+                fees = self.fee_rate * size * (entry_price + exit_price)
+                profit = direction * size * (exit_price - entry_price) - fees
+                realized[exit_bar] += profit
+                trade = {
+                    'symbol': symbol,
+                    'strategy': strategy_name,
+                    'side': 'buy' if direction > 0 else 'sell',
+                    'entry_time': grid[position['entry_bar']],
+                    'exit_time': grid[exit_bar],
+                    'entry_price': entry_price,
+                    'exit_price': exit_price,
+                    'size': size,
+                    'exit_reason': reason,
+                    'return': profit / (size * entry_price),
+                    'profit': profit,
+                }
+                risk_management.record_trade(trade)
+                trades.append(trade)
+
+        # np.nonzero on the transpose walks the changes in time order
+        for bar, i in zip(*np.nonzero(changed.T)):
+            close_until(bar)
+            direction = held[i, bar]
+            entry_price = panel['close'][i, bar]
+            if direction == 0 or np.isnan(entry_price):
+                continue
+            symbol = symbols[i]
+            stop_loss = panel['stop_loss'][i, bar]
+            if np.isnan(stop_loss):
+                stop_loss = entry_price * (1 - direction * self.stop_loss_pct)
+            take_profit = panel['take_profit'][i, bar]
+            if np.isnan(take_profit):
+                take_profit = entry_price * (1 + direction * self.take_profit_pct)
+
+            size = risk_management.calculate_position_size(entry_price, stop_loss, current_positions,
+                                                           np.nan_to_num(panel['volatility'][i, bar]))
+            if size <= 0:
+                continue
+
+            later_changes = np.flatnonzero(changed[i, bar + 1:])
+            end = bar + 1 + later_changes[0] if len(later_changes) else n_bars - 1
+            exit_bar, exit_price, reason = self._find_exit(panel, i, bar, end, direction, stop_loss, take_profit)
+            unrealized[bar:exit_bar] += direction * size * (panel['close'][i, bar:exit_bar] - entry_price)
+            current_positions[symbol] = {'size': size, 'entry_price': entry_price, 'direction': direction,
+                                         'entry_bar': bar}
+            heapq.heappush(open_positions, (exit_bar, i, symbol, exit_price, reason))
+        close_until(n_bars)
+
+        equity = self.initial_balance + np.cumsum(realized) + unrealized
+        return equity, trades
+
+
+def main():
+    from strategy import Strategy
+    from utils import load_config
+
+    parser = argparse.ArgumentParser(description='Backtest the configured strategies on cached candles.')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--mode', choices=MODES, default='vectorized')
+    parser.add_argument('--symbols', nargs='*', help='defaults to trading.symbols')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    backtester = Backtester(config)
+    frames = backtester.load(args.symbols or config['trading']['symbols'])
+    for strategy_type in config['strategy']['capital_allocation']:
+        started = time.perf_counter()
+        result = backtester.run(Strategy(config['strategy'], strategy_type), frames, args.mode)
+        print(f"{strategy_type}: {len(result['trades'])} trades in {time.perf_counter() - started:.2f}s, "
+              f"final equity {result['equity'].iloc[-1]:.2f}, metrics {result['metrics']}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
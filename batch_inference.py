@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import numpy as np
+from collections import deque
+
+
+class InferenceBatcher:
+    """Collects concurrent predict calls for a short window and runs them as one batch.
+
+    ``process_symbol`` coroutines for all symbols call ``predict`` at roughly
+    the same time; instead of one forward pass each, requests arriving within
+    ``window_ms`` (or until ``max_batch`` is reached) are handed to
+    ``EnhancedMLPredictor.predict_batch`` together, off the event loop.
+    """
+
+    def __init__(self, predictor, window_ms=5, max_batch=256, history=1000):
+        self.predictor = predictor
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending = {}
+        self.latencies = deque(maxlen=history)
+        self.batch_sizes = deque(maxlen=history)
+        self._timer = None
+        self._tasks = set()
+
+    async def predict(self, symbol, df):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        futures = self.pending[symbol][1] if symbol in self.pending else []
+        futures.append(future)
+        # a later call for the same symbol carries the fresher frame
+        self.pending[symbol] = (df, futures)
+
+        if len(self.pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending = self.pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        frames = {symbol: df for symbol, (df, _) in batch.items()}
+        try:
+            predictions, stats = await asyncio.to_thread(self.predictor.predict_batch, frames)
+        except Exception as e:
+            logging.error(f"Batched inference failed for {len(frames)} symbols: {e}", exc_info=True)
+            for _, futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.latencies.append(stats['latency'])
+        self.batch_sizes.append(len(frames))
+        for symbol, (_, futures) in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(predictions.get(symbol))
+
+    def metrics(self):
+        if not self.latencies:
+            return {'batches': 0}
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'batches': len(self.latencies),
+            'mean_batch_size': float(np.mean(self.batch_sizes)),
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+        }
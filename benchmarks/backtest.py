@@ -0,0 +1,61 @@
+"""Time both backtest modes on a year of synthetic hourly candles.
+
+Usage: python benchmarks/backtest.py [--symbols 60] [--days 365]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester import Backtester
+from benchmarks.indicator_panel import synthetic_frames
+from strategy import Strategy
+from utils import load_config
+
+
+class MovingAverageCrossover(Strategy):
+    def __init__(self, config, fast=20, slow=50):
+        super().__init__(config, 'ma_crossover')
+        self.fast = fast
+        self.slow = slow
+
+    def signal_frame(self, df):
+        fast = df['close'].rolling(self.fast).mean()
+        slow = df['close'].rolling(self.slow).mean()
+        position = np.sign(fast - slow)
+        return pd.DataFrame({
+            'position': position,
+            'stop_loss': df['close'] * (1 - 0.02 * position),
+            'take_profit': df['close'] * (1 + 0.04 * position),
+        }, index=df.index)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=60)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    config = load_config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.yaml'))
+    warmup = config['backtesting'].get('warmup', 200)
+    frames = synthetic_frames(args.symbols, args.days * 24 + warmup)
+    first = next(iter(frames.values())).index
+    config['backtesting']['start_date'] = str(first[warmup].date())
+    config['backtesting']['end_date'] = str(first[-1].date())
+
+    backtester = Backtester(config)
+    strategy = MovingAverageCrossover(config['strategy'])
+    for mode in ('vectorized', 'event'):
+        started = time.perf_counter()
+        result = backtester.run(strategy, frames, mode)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:>10}: {args.symbols} symbols x {len(result['equity'])} bars in {elapsed:.2f}s, "
+              f"{len(result['trades'])} trades, final equity {result['equity'].iloc[-1]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
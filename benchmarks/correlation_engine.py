@@ -0,0 +1,46 @@
+"""Cost of one EWMA covariance refresh against recomputing the correlation matrix from the window.
+
+Usage: python benchmarks/correlation_engine.py [--symbols 60 200 500] [--window 720] [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from correlation_engine import CorrelationEngine
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, nargs='+', default=[60, 200, 500])
+    parser.add_argument('--window', type=int, default=720, help='return rows in the recomputed window')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    for n in args.symbols:
+        symbols = [f"SYM{i}/USDT:USDT" for i in range(n)]
+        returns = rng.normal(0, 0.01, (args.window, n))
+        window = pd.DataFrame(returns, columns=symbols)
+        engine = CorrelationEngine(symbols, update_interval=3600, lookback_period=30)
+
+        started = time.perf_counter()
+        for i in range(args.repeat):
+            engine._fold(returns[i % args.window])
+        fold = (time.perf_counter() - started) / args.repeat
+
+        started = time.perf_counter()
+        for _ in range(max(args.repeat // 20, 1)):
+            window.corr()
+        recompute = (time.perf_counter() - started) / max(args.repeat // 20, 1)
+
+        print(f"{n:>4} symbols: EWMA refresh {fold * 1e6:8.1f} us, "
+              f"pandas corr over {args.window} rows {recompute * 1e6:10.1f} us ({recompute / fold:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
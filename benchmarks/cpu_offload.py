@@ -0,0 +1,67 @@
+"""Time a regime-detection cycle in-process and on analytics pools of growing size.
+
+Every cycle refits every symbol's mixture (update_interval=0), which is the
+worst case the pool has to absorb.
+
+Usage: python benchmarks/cpu_offload.py [--symbols 60] [--cycles 3] [--workers 1 2 4 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.indicator_panel import synthetic_frames
+from cpu_offload import AnalyticsPool, OffloadedRegimeDetector
+from market_regime_detector import MarketRegimeDetector
+
+SETTINGS = {'lookback_period': 100, 'update_interval': 0}
+
+
+def run_in_process(frames, cycles):
+    detector = MarketRegimeDetector(**SETTINGS)
+    # untimed like the offloaded warm-up, so both sides compare warm-started refits
+    for symbol, df in frames.items():
+        detector.detect_regime(df['close'], symbol)
+    started = time.perf_counter()
+    for _ in range(cycles):
+        for symbol, df in frames.items():
+            detector.detect_regime(df['close'], symbol)
+    return (time.perf_counter() - started) / cycles
+
+
+async def run_offloaded(frames, cycles, workers):
+    pool = AnalyticsPool(workers)
+    detector = OffloadedRegimeDetector(pool, **SETTINGS)
+    try:
+        # the first cycle pays for worker start-up and imports
+        await asyncio.gather(*(detector.detect_regime(df['close'], symbol) for symbol, df in frames.items()))
+        started = time.perf_counter()
+        for _ in range(cycles):
+            await asyncio.gather(*(detector.detect_regime(df['close'], symbol) for symbol, df in frames.items()))
+        return (time.perf_counter() - started) / cycles
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=60)
+    parser.add_argument('--cycles', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=[n for n in (1, 2, 4, 8, 16) if n <= (os.cpu_count() or 1)])
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.symbols, 500)
+    baseline = run_in_process(frames, args.cycles)
+    print(f"{args.symbols} symbols, in-process: {baseline * 1000:.0f} ms per cycle")
+    for workers in args.workers:
+        elapsed = asyncio.run(run_offloaded(frames, args.cycles, workers))
+        print(f"{args.symbols} symbols, {workers:>2} workers: {elapsed * 1000:.0f} ms per cycle "
+              f"({baseline / elapsed:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Load-test the exchange simulator and compare execution algorithms on it.
+
+Usage: python benchmarks/exchange_simulator.py [--orders 20000] [--symbols 10] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from exchange_simulator import SimulatedExchange
+from smart_execution import SmartExecutionAlgorithm
+
+
+async def load_test(n_orders, n_symbols, concurrency, seed=42):
+    symbols = [f"SYM{i}/USDT:USDT" for i in range(n_symbols)]
+    exchange = SimulatedExchange(symbols, initial_balance=1e9, seed=seed)
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def submit():
+        symbol = rng.choice(symbols)
+        side = rng.choice(('buy', 'sell'))
+        mid = exchange.mids[symbol]
+        amount = float(exchange.amount_to_precision(symbol, rng.uniform(1, 50) / mid * 100))
+        async with semaphore:
+            started = time.perf_counter()
+            if rng.random() < 0.3:
+                await exchange.create_order(symbol, 'market', side, amount)
+            else:
+                offset = rng.uniform(-0.001, 0.002) * (1 if side == 'sell' else -1)
+                price = float(exchange.price_to_precision(symbol, mid * (1 + offset)))
+                order = await exchange.create_order(symbol, 'limit', side, amount, price)
+                if order['status'] == 'open' and rng.random() < 0.5:
+                    await exchange.cancel_order(order['id'], symbol)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for start in range(0, n_orders, 1000):
+        await asyncio.gather(*(submit() for _ in range(min(1000, n_orders - start))))
+        exchange.tick(0.1)
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array(latencies) * 1e6
+    print(f"{n_orders} orders over {n_symbols} symbols in {elapsed:.2f}s: {n_orders / elapsed:,.0f} orders/s, "
+          f"{len(exchange.trades)} fills, call latency p50 {np.percentile(latencies, 50):.0f}us "
+          f"p99 {np.percentile(latencies, 99):.0f}us")
+
+
+async def compare_execution(quantity_notional=50000, time_window=2.0, seed=42):
+    symbol = 'BTC/USDT:USDT'
+    results = {}
+    for name in ('market', 'twap'):
+        exchange = SimulatedExchange([symbol], initial_balance=1e9, seed=seed, initial_prices={symbol: 60000},
+                                     tick_interval=time_window / 40)
+        exchange.start()
+        arrival = exchange.mids[symbol]
+        quantity = float(exchange.amount_to_precision(symbol, quantity_notional / arrival))
+        if name == 'market':
+            await exchange.create_market_buy_order(symbol, quantity)
+        else:
+            await SmartExecutionAlgorithm(exchange, symbol, quantity, time_window).twap_execution()
+        await exchange.close()
+        filled = sum(trade['amount'] for trade in exchange.trades)
+        average = sum(trade['cost'] for trade in exchange.trades) / filled
+        results[name] = (average / arrival - 1) * 1e4
+    print('implementation shortfall vs arrival mid: ' +
+          ', '.join(f"{name} {bps:.2f}bps" for name, bps in results.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--symbols', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(load_test(args.orders, args.symbols, args.concurrency))
+    asyncio.run(compare_execution())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Compare IndicatorPanel against the per-symbol pandas pipeline.
+
+Usage: python benchmarks/indicator_panel.py [--rows 1000] [--symbols 60 300 1000]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indicators import Indicators
+
+
+def synthetic_frames(n_symbols, rows, seed=42):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2023-01-01', periods=rows, freq='h')
+    frames = {}
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+        spread = np.abs(rng.normal(0, 0.005, rows)) * close
+        frames[f"SYM{i}/USDT:USDT"] = pd.DataFrame({
+            'open': close * (1 + rng.normal(0, 0.002, rows)),
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.uniform(1, 1000, rows),
+        }, index=index)
+    return frames
+
+
+def per_symbol(frames, atr_period=14, ma_period=50):
+    results = {}
+    for symbol, df in frames.items():
+        atr = Indicators.calculate_atr(df, atr_period)
+        delta = df['close'].diff()
+        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        fast = df['close'].ewm(span=12, adjust=False).mean()
+        slow = df['close'].ewm(span=26, adjust=False).mean()
+        macd = fast - slow
+        results[symbol] = {
+            'returns': df['close'].pct_change(),
+            'volatility': df['close'].pct_change().std(),
+            'atr': atr,
+            'moving_average': Indicators.moving_average(df, ma_period),
+            'chandelier_exit': Indicators.chandelier_exit(df, atr, atr_period),
+            'fibonacci': Indicators.fibonacci_retracement(df),
+            'rsi': 100 - (100 / (1 + gain / loss)),
+            'macd': macd - macd.ewm(span=9, adjust=False).mean(),
+        }
+    return results
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--symbols', type=int, nargs='+', default=[60, 300, 1000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} {'per-symbol (s)':>15} {'panel (s)':>10} {'speedup':>8}")
+    for n_symbols in args.symbols:
+        frames = synthetic_frames(n_symbols, args.rows)
+        loop_time = best_of(lambda: per_symbol(frames), args.repeat)
+        panel_time = best_of(lambda: Indicators.panel(frames), args.repeat)
+        print(f"{n_symbols:>8} {loop_time:>15.4f} {panel_time:>10.4f} {loop_time / panel_time:>7.1f}x")
+
+    # spot check that both paths agree
+    frames = synthetic_frames(3, args.rows)
+    reference = per_symbol(frames)
+    panel = Indicators.panel(frames)
+    for symbol in frames:
+        row = panel.symbol(symbol)
+        for name in ('atr', 'moving_average', 'chandelier_exit', 'rsi', 'macd'):
+            assert np.allclose(row[name], reference[symbol][name].values, equal_nan=True), name
+        assert np.isclose(row['volatility'], reference[symbol]['volatility'])
+
+
+if __name__ == '__main__':
+    main()
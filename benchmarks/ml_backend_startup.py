@@ -0,0 +1,76 @@
+"""Startup time and peak RSS of the Keras and NumPy prediction backends.
+
+Each backend is measured in a fresh interpreter: import the predictor, load a
+checkpoint and run one prediction. A checkpoint is trained first (this needs
+TensorFlow) unless --checkpoint points at an existing one.
+
+Usage: python benchmarks/ml_backend_startup.py [--checkpoint models/BTC_USDT_USDT/v000001]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import numpy as np
+from ml_predictor import EnhancedMLPredictor
+predictor = EnhancedMLPredictor(lookback={lookback}, backend='{backend}')
+model, scaler = predictor.load_checkpoint('{checkpoint}')
+loaded = time.perf_counter()
+window = scaler.transform(np.random.default_rng(0).uniform(100, 110, ({lookback}, 5)))
+prediction = float(np.asarray(model.predict_on_batch(window[np.newaxis]))[0][0])
+done = time.perf_counter()
+print(json.dumps({{
+    'startup_s': loaded - start,
+    'first_prediction_ms': (done - loaded) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'prediction': prediction,
+}}))
+"""
+
+
+def train_checkpoint(path, lookback):
+    from benchmarks.indicator_panel import synthetic_frames
+    from ml_predictor import EnhancedMLPredictor
+
+    df = next(iter(synthetic_frames(1, 500).values()))
+    predictor = EnhancedMLPredictor(lookback=lookback)
+    predictor.train(df, epochs=1, verbose=0)
+    predictor.save_checkpoint(path)
+
+
+def probe(backend, checkpoint, lookback):
+    code = PROBE.format(backend=backend, checkpoint=checkpoint, lookback=lookback)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checkpoint')
+    parser.add_argument('--lookback', type=int, default=60)
+    args = parser.parse_args()
+
+    checkpoint = args.checkpoint
+    if checkpoint is None:
+        checkpoint = os.path.join(tempfile.mkdtemp(), 'v000001')
+        train_checkpoint(checkpoint, args.lookback)
+
+    results = {backend: probe(backend, checkpoint, args.lookback) for backend in ('keras', 'numpy')}
+    print(f"{'backend':>8} {'startup (s)':>12} {'1st predict (ms)':>17} {'max RSS (MB)':>13}")
+    for backend, result in results.items():
+        print(f"{backend:>8} {result['startup_s']:>12.2f} {result['first_prediction_ms']:>17.1f} "
+              f"{result['max_rss_mb']:>13.0f}")
+    difference = abs(results['keras']['prediction'] - results['numpy']['prediction'])
+    print(f"prediction difference between backends: {difference:.2e}")
+
+
+if __name__ == '__main__':
+    main()
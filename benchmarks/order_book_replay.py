@@ -0,0 +1,70 @@
+"""Replay a synthetic snapshot/delta feed through L2OrderBook.
+
+Measures the update rate and top-of-book read cost; correctness against a
+dict-of-levels reference, gap detection and resyncs are covered by
+tests/test_order_book.py.
+
+Usage: python benchmarks/order_book_replay.py [--messages 200000] [--levels 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from order_book import L2OrderBook
+
+
+def synthetic_feed(n_messages, levels, seed=7):
+    rng = random.Random(seed)
+    mid = 30000.0
+    tick = 0.5
+
+    def side(sign, count):
+        return [[mid + sign * tick * (i + 1), round(rng.uniform(0.001, 5), 3)] for i in range(count)]
+
+    messages = [('snapshot', side(-1, levels), side(1, levels), 1)]
+    for update_id in range(2, n_messages + 2):
+        mid += rng.choice((-tick, 0, tick))
+        bids = [[mid - tick * rng.randint(1, levels), rng.choice((0, round(rng.uniform(0.001, 5), 3)))]
+                for _ in range(rng.randint(1, 4))]
+        asks = [[mid + tick * rng.randint(1, levels), rng.choice((0, round(rng.uniform(0.001, 5), 3)))]
+                for _ in range(rng.randint(1, 4))]
+        messages.append(('delta', bids, asks, update_id))
+    return messages
+
+
+def replay(book, messages):
+    for kind, bids, asks, update_id in messages:
+        if kind == 'snapshot':
+            book.apply_snapshot(bids, asks, update_id)
+        else:
+            book.apply_delta(bids, asks, update_id)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=200000)
+    parser.add_argument('--levels', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=10)
+    args = parser.parse_args()
+
+    messages = synthetic_feed(args.messages, args.levels)
+    book = L2OrderBook('BTC/USDT:USDT')
+    start = time.perf_counter()
+    replay(book, messages)
+    elapsed = time.perf_counter() - start
+    level_updates = sum(len(bids) + len(asks) for _, bids, asks, _ in messages[1:])
+    print(f"{len(messages)} messages ({level_updates} level updates) in {elapsed:.2f}s: "
+          f"{len(messages) / elapsed:,.0f} messages/s, {level_updates / elapsed:,.0f} level updates/s")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        book.top(args.depth)
+    print(f"top-{args.depth} read: {(time.perf_counter() - start) / 10000 * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
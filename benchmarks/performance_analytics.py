@@ -0,0 +1,92 @@
+"""Memory and update cost of PerformanceAnalytics over months of minute-level equity points.
+
+The baseline keeps the whole curve in a Python list and recomputes the
+metrics with pandas, as the analytics did before they became incremental.
+
+Usage: python benchmarks/performance_analytics.py [--months 3] [--history 10080]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from performance_analytics import PerformanceAnalytics
+
+MINUTES_PER_MONTH = 30 * 24 * 60
+
+
+def baseline_metrics(curve):
+    returns = pd.Series(curve).pct_change()
+    peak = pd.Series(curve).cummax()
+    return {
+        'sharpe_ratio': np.sqrt(252) * returns.mean() / returns.std(),
+        'max_drawdown': ((peak - curve) / peak).max(),
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current / 2 ** 20, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--months', type=float, default=3)
+    parser.add_argument('--history', type=int, default=10080)
+    args = parser.parse_args()
+
+    n = int(args.months * MINUTES_PER_MONTH)
+    equity = (1000 * np.exp(np.cumsum(np.random.default_rng(42).normal(0, 0.0005, n)))).tolist()
+
+    def build_list():
+        curve = []
+        for value in equity:
+            curve.append(value)
+        return curve
+
+    def build_streaming(path=None):
+        analytics = PerformanceAnalytics(history=args.history, history_path=path, periods_per_year=252)
+        for value in equity:
+            analytics.record_equity(value)
+        return analytics
+
+    curve, list_time, list_mb, list_peak = measure(build_list)
+    started = time.perf_counter()
+    expected = baseline_metrics(curve)
+    recompute = time.perf_counter() - started
+    print(f"{n:,} minute points ({args.months:g} months)")
+    print(f"  list + pandas:  {list_mb:7.1f} MB held, {list_peak:7.1f} MB peak, "
+          f"{list_time / n * 1e6:.2f} us per point, {recompute * 1000:.1f} ms per metrics call")
+    del curve
+
+    analytics, stream_time, stream_mb, stream_peak = measure(build_streaming)
+    started = time.perf_counter()
+    metrics = analytics.calculate_metrics()
+    summary = time.perf_counter() - started
+    print(f"  streaming:      {stream_mb:7.1f} MB held, {stream_peak:7.1f} MB peak, "
+          f"{stream_time / n * 1e6:.2f} us per point, {summary * 1000:.3f} ms per metrics call")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'equity.bin')
+        _, disk_time, _, _ = measure(lambda: build_streaming(path))
+        size = os.path.getsize(path) / 2 ** 20
+        print(f"  streaming+disk: {disk_time / n * 1e6:.2f} us per point, {size:.1f} MB on disk, "
+              f"{len(PerformanceAnalytics.load_history(path)):,} rows reloaded")
+
+    for key, value in expected.items():
+        print(f"  {key}: baseline {value:.6f}, streaming {metrics[key]:.6f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,332 @@
+"""Time process_symbol and its components against the exchange simulator, from 1 to 500 symbols.
+
+Every stage of process_symbol is timed separately, then each component is
+run on its own over the same data. The report has per-stage latency
+percentiles, symbols per second and peak traced memory for each symbol
+count. ``--save-baseline`` stores the report; a later run with
+``--baseline`` exits non-zero when a p50/p99 latency or the peak memory
+grows, or the throughput drops, by more than ``--threshold``.
+
+Usage: python benchmarks/pipeline.py [--symbols 1 10 100 500] [--cycles 5] [--recorded data_cache]
+                                     [--save-baseline FILE | --baseline FILE] [--threshold 0.2] [--ml]
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from correlation_engine import CorrelationEngine
+from data_fetcher import DataFetcher
+from exchange_simulator import SimulatedExchange
+from execution import Execution
+from hft_components import OrderBookAnalyzer
+from indicators import Indicators
+from instrument_cache import InstrumentCache
+from main import process_symbol
+from market_regime_detector import MarketRegimeDetector
+from ohlcv_cache import OHLCVCache
+from performance_analytics import PerformanceAnalytics
+from risk_management import DynamicRiskManagement
+from smart_execution import SmartExecutionAlgorithm
+from strategy import Strategy, MultiStrategyManager
+from utils import load_config
+
+PERCENTILES = (50, 90, 99)
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.wrapped = []
+
+    def wrap(self, obj, name, stage):
+        """Replace ``obj.name`` with a version that records its duration under ``stage``."""
+        method = getattr(obj, name)
+        # a class attribute is the plain function; it is put back by ``restore``
+        self.wrapped.append((obj, name, obj.__dict__.get(name)))
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self.samples[stage].append(time.perf_counter() - started)
+        else:
+            @functools.wraps(method)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self.samples[stage].append(time.perf_counter() - started)
+        setattr(obj, name, timed)
+
+    def restore(self):
+        for obj, name, original in reversed(self.wrapped):
+            if original is None:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self.wrapped.clear()
+
+    def summary(self):
+        return {stage: {f"p{p}_ms": float(np.percentile(values, p) * 1000) for p in PERCENTILES}
+                for stage, values in self.samples.items() if values}
+
+
+class BenchmarkStrategy(Strategy):
+    """Moving-average trend read that trades every cycle, so sizing and execution are timed too.
+
+    Signals are handed out in strategy order: momentum opens a position in
+    the trend's direction, mean reversion closes it again and breakout holds.
+    """
+
+    def generate_signals(self, df, order_book_analysis, market_sentiment, ml_prediction, market_regime):
+        close = df['close'].to_numpy()
+        fast, slow = close[-20:].mean(), close[-50:].mean()
+        trend = 'up' if fast > slow else 'down'
+        if self.strategy_type == 'momentum':
+            action = 'buy' if trend == 'up' else 'sell'
+        elif self.strategy_type == 'mean_reversion':
+            action = 'close'
+        else:
+            action = 'hold'
+        if action == 'sell':
+            stop_loss, take_profit = close[-1] * 1.01, close[-1] * 0.97
+        else:
+            stop_loss, take_profit = close[-1] * 0.99, close[-1] * 1.03
+        return {'action': action, 'trend': trend, 'stop_loss': stop_loss, 'take_profit': take_profit}
+
+
+def make_exchange(config, symbols, recorded=None):
+    exchange = SimulatedExchange(symbols, initial_balance=1e9, seed=42)
+    if recorded:
+        cache = OHLCVCache(recorded)
+        timeframe = config['data_fetcher']['timeframe']
+        for symbol in symbols:
+            arrays = cache.read_arrays(symbol, timeframe)
+            if len(arrays['timestamp']):
+                exchange.candles[(symbol, timeframe)] = np.column_stack(
+                    [arrays[column] for column in ('timestamp', 'open', 'high', 'low', 'close', 'volume')]).tolist()
+                exchange.mids[symbol] = float(arrays['close'][-1])
+    return exchange
+
+
+def make_components(config, exchange, symbols, timer):
+    data_fetcher = DataFetcher(exchange, dict(config['data_fetcher'], cache_dir=None))
+    allocation = config['strategy']['capital_allocation']
+    manager = MultiStrategyManager([BenchmarkStrategy(config['strategy'], name) for name in allocation], allocation)
+    correlation_engine = CorrelationEngine.from_config(symbols, config['correlation'])
+    # a zero window sends each entry and exit as one market order instead of minutes of slices
+    execution_config = dict(config, execution=dict(config.get('execution', {}), adaptive_window=0))
+    components = {
+        'data_fetcher': data_fetcher,
+        'multi_strategy_manager': manager,
+        'correlation_engine': correlation_engine,
+        'risk_management': DynamicRiskManagement(config['risk_management'], correlation_engine),
+        'execution': Execution(exchange, execution_config),
+        'order_book_analyzer': OrderBookAnalyzer(config['hft_components']['order_book_depth']),
+        'market_regime_detector': MarketRegimeDetector(lookback_period=config['market_regime']['lookback_period'],
+                                                       update_interval=config['market_regime']['update_interval']),
+        'performance_analytics': PerformanceAnalytics(),
+    }
+    timer.wrap(data_fetcher, 'fetch_historical_data', 'fetch_ohlcv')
+    timer.wrap(data_fetcher, 'fetch_order_book', 'fetch_order_book')
+    timer.wrap(components['market_regime_detector'], 'detect_regime', 'regime')
+    timer.wrap(components['order_book_analyzer'], 'analyze_order_book', 'order_book_analysis')
+    timer.wrap(manager, 'get_signals', 'signals')
+    timer.wrap(components['risk_management'], 'calculate_position_size', 'sizing')
+    timer.wrap(components['risk_management'], 'adjust_for_correlation', 'correlation')
+    timer.wrap(SmartExecutionAlgorithm, 'adaptive_execution', 'execution')
+    timer.wrap(components['performance_analytics'], 'record_trade', 'record_trade')
+    timer.wrap(components['risk_management'], 'update_risk_parameters', 'risk_update')
+    timer.wrap(components['risk_management'], 'calculate_var', 'var')
+    return components
+
+
+async def run_pipeline(config, symbols, cycles, recorded):
+    timer = StageTimer()
+    exchange = make_exchange(config, symbols, recorded)
+    c = make_components(config, exchange, symbols, timer)
+    risk_management = c['risk_management']
+    current_positions = {}
+
+    async def cycle():
+        # update_risk_parameters compounds the risk budget towards zero across symbols; without
+        # a reset sizing returns 0 after the first cycle and execution is never reached
+        risk_management.risk_per_trade = risk_management.initial_risk_per_trade
+        await asyncio.gather(*(
+            process_symbol(symbol, c['data_fetcher'], c['multi_strategy_manager'], risk_management,
+                           c['execution'], None, None, None, c['order_book_analyzer'], c['market_regime_detector'],
+                           c['performance_analytics'], current_positions, None)
+            for symbol in symbols))
+        c['correlation_engine'].refresh()
+
+    try:
+        # the first cycle fits every regime model from scratch; it is reported on its own
+        started = time.perf_counter()
+        await cycle()
+        first_cycle = time.perf_counter() - started
+        timer.samples.clear()
+
+        durations = []
+        for _ in range(cycles):
+            exchange.tick(60)
+            started = time.perf_counter()
+            await cycle()
+            durations.append(time.perf_counter() - started)
+            timer.samples['cycle'].append(durations[-1])
+    finally:
+        timer.restore()
+    return timer, first_cycle, len(symbols) * cycles / sum(durations)
+
+
+async def run_components(config, symbols, cycles, recorded, ml):
+    timer = StageTimer()
+    exchange = make_exchange(config, symbols, recorded)
+    data_fetcher = DataFetcher(exchange, dict(config['data_fetcher'], cache_dir=None))
+    frames = {symbol: await data_fetcher.fetch_historical_data(symbol) for symbol in symbols}
+    books = {symbol: await exchange.fetch_order_book(symbol, config['hft_components']['order_book_depth'])
+             for symbol in symbols}
+
+    indicators = Indicators()
+    detector = MarketRegimeDetector(lookback_period=config['market_regime']['lookback_period'],
+                                    update_interval=config['market_regime']['update_interval'])
+    analyzer = OrderBookAnalyzer(config['hft_components']['order_book_depth'])
+    allocation = config['strategy']['capital_allocation']
+    manager = MultiStrategyManager([BenchmarkStrategy(config['strategy'], name) for name in allocation], allocation)
+    risk_management = DynamicRiskManagement(config['risk_management'])
+    instruments = InstrumentCache(exchange)
+    await instruments.load()
+    execution = Execution(exchange, config, instruments=instruments)
+    for symbol in symbols:
+        detector.detect_regime(frames[symbol]['close'], symbol)
+
+    def timed(stage, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        timer.samples[stage].append(time.perf_counter() - started)
+        return result
+
+    for _ in range(cycles):
+        for symbol in symbols:
+            df, book = frames[symbol], books[symbol]
+            timed('indicators', indicators.latest, symbol, df)
+            timed('regime', detector.detect_regime, df['close'], symbol)
+            analysis = timed('order_book_analysis', analyzer.analyze_order_book, book, symbol)
+            timed('signals', manager.get_signals, df, analysis, None, None, 0)
+            entry = df['close'].iloc[-1]
+            timed('sizing', risk_management.calculate_position_size, entry, entry * 0.99, {},
+                  df['close'].pct_change().std())
+            started = time.perf_counter()
+            quantity = 100 / exchange.mids[symbol]
+            await execution.place_order(symbol, 'buy', quantity, exchange.mids[symbol],
+                                        exchange.mids[symbol] * 0.99, exchange.mids[symbol] * 1.03)
+            timer.samples['execution'].append(time.perf_counter() - started)
+
+    if ml:
+        from ml_predictor import EnhancedMLPredictor
+        predictor = EnhancedMLPredictor()
+        symbol = symbols[0]
+        started = time.perf_counter()
+        predictor.train(frames[symbol], epochs=1, verbose=0)
+        timer.samples['ml_train'].append(time.perf_counter() - started)
+        for symbol in symbols:
+            predictor.install_model(symbol, 1, predictor.model, predictor.scaler)
+        started = time.perf_counter()
+        predictor.predict_batch(frames)
+        timer.samples['ml_predict_batch'].append(time.perf_counter() - started)
+    return timer
+
+
+def peak_memory(config, symbols, recorded):
+    tracemalloc.start()
+    asyncio.run(run_pipeline(config, symbols, 1, recorded))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def compare(report, baseline, threshold):
+    failures = []
+    for count, current in report.items():
+        reference = baseline.get(count)
+        if reference is None:
+            continue
+        for group in ('pipeline', 'components'):
+            for stage, stats in current[group].items():
+                for key, value in stats.items():
+                    old = reference[group].get(stage, {}).get(key)
+                    if old and value > old * (1 + threshold):
+                        failures.append(f"{count} symbols {group}/{stage} {key}: {old:.3f} -> {value:.3f}")
+        if current['throughput'] < reference['throughput'] * (1 - threshold):
+            failures.append(f"{count} symbols throughput: {reference['throughput']:.1f} -> "
+                            f"{current['throughput']:.1f} symbols/s")
+        if current['peak_mb'] > reference['peak_mb'] * (1 + threshold):
+            failures.append(f"{count} symbols peak memory: {reference['peak_mb']:.1f} -> "
+                            f"{current['peak_mb']:.1f} MB")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, nargs='+', default=[1, 10, 100, 500])
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--recorded', help='OHLCVCache directory to replay instead of synthetic candles')
+    parser.add_argument('--ml', action='store_true', help='also time LSTM training and batch prediction')
+    parser.add_argument('--save-baseline')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    config = load_config(os.path.join(ROOT, 'config.yaml'))
+    report = {}
+    for count in args.symbols:
+        symbols = [f"SYM{i}/USDT:USDT" for i in range(count)]
+        if args.recorded:
+            symbols = (config['trading']['symbols'] * (count // len(config['trading']['symbols']) + 1))[:count]
+            symbols = list(dict.fromkeys(symbols))
+        timer, first_cycle, throughput = asyncio.run(run_pipeline(config, symbols, args.cycles, args.recorded))
+        components = asyncio.run(run_components(config, symbols, args.cycles, args.recorded, args.ml))
+        report[str(count)] = {
+            'pipeline': timer.summary(),
+            'components': components.summary(),
+            'first_cycle_s': first_cycle,
+            'throughput': throughput,
+            'peak_mb': peak_memory(config, symbols, args.recorded),
+        }
+        result = report[str(count)]
+        print(f"\n{len(symbols)} symbols: {throughput:.1f} symbols/s, first cycle {first_cycle:.2f}s, "
+              f"peak memory {result['peak_mb']:.1f} MB")
+        for group in ('pipeline', 'components'):
+            for stage, stats in result[group].items():
+                print(f"  {group:>10} {stage:<20} " + '  '.join(f"{key} {value:8.3f}" for key, value in stats.items()))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nbaseline written to {args.save_baseline}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = compare(report, json.load(f), args.threshold)
+        if failures:
+            print(f"\nregressions beyond {args.threshold:.0%}:\n  " + '\n  '.join(failures))
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
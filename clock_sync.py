@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import numpy as np
+
+
+class ClockSync:
+    """Background estimate of the exchange clock used to timestamp signed requests.
+
+    Every ``interval`` seconds a burst of server time requests is sent and
+    only the sample with the lowest round trip is kept, since its midpoint is
+    the least distorted by queueing. Offset and drift are fitted over the
+    fastest half of the recent samples, and ``now_ms`` extrapolates from the
+    fit so timestamps stay correct between syncs.
+    """
+
+    def __init__(self, exchange, interval=60, burst=5, history=20, recv_window=5000, retry_interval=5):
+        self.exchange = exchange
+        self.interval = interval
+        self.burst = burst
+        self.retry_interval = retry_interval
+        self.recv_window = recv_window
+        self.samples = deque(maxlen=history)
+        self.offset = None
+        self.drift = 0.0
+        self.reference = 0.0
+        self.jitter = 0.0
+        self.synced_at = None
+        self._task = None
+
+    @classmethod
+    def from_config(cls, exchange, config):
+        return cls(exchange,
+                   interval=config.get('interval', 60),
+                   burst=config.get('burst', 5),
+                   history=config.get('history', 20),
+                   recv_window=config.get('recv_window', 5000),
+                   retry_interval=config.get('retry_interval', 5))
+
+    def attach(self):
+        """Route the exchange's request timestamps through the corrected clock."""
+        # ccxt signs with self.nonce(); its own time-difference adjustment would fight ours
+        self.exchange.options['adjustForTimeDifference'] = False
+        self.exchange.options['recvWindow'] = self.recv_window
+        self.exchange.nonce = self.now_ms
+
+    def now_ms(self):
+        local = time.time() * 1000
+        if self.offset is None:
+            return int(local)
+        return int(local + self.offset + self.drift * (local - self.reference))
+
+    async def _measure(self):
+        started = time.time() * 1000
+        server_time = await self.exchange.fetch_time()
+        finished = time.time() * 1000
+        midpoint = (started + finished) / 2
+        return midpoint, server_time - midpoint, finished - started
+
+    async def sample(self):
+        best = None
+        for _ in range(self.burst):
+            measurement = await self._measure()
+            if best is None or measurement[2] < best[2]:
+                best = measurement
+        self.samples.append(best)
+        self._estimate()
+        self.synced_at = time.time()
+        return best
+
+    def _estimate(self):
+        samples = np.array(self.samples)
+        local, offsets, rtts = samples[:, 0], samples[:, 1], samples[:, 2]
+        fastest = rtts <= np.median(rtts)
+        local, offsets = local[fastest], offsets[fastest]
+        self.reference = local[-1]
+        if len(offsets) >= 3 and local[-1] - local[0] > 0:
+            # drift in ms of offset per ms of local time
+            self.drift, intercept = np.polyfit(local - self.reference, offsets, 1)
+            self.offset = float(intercept)
+            self.jitter = float(np.std(offsets - (self.drift * (local - self.reference) + intercept)))
+        else:
+            self.drift = 0.0
+            self.offset = float(offsets[-1])
+            self.jitter = float(np.std(offsets)) if len(offsets) > 1 else 0.0
+
+    async def sync(self, max_attempts=5):
+        """Initial synchronisation; returns the offset in ms or None when the exchange is unreachable."""
+        for attempt in range(max_attempts):
+            try:
+                await self.sample()
+                logging.info(f"Clock offset {self.offset:.1f}ms (jitter {self.jitter:.1f}ms)")
+                return self.offset
+            except Exception as e:
+                logging.warning(f"Time sync attempt {attempt + 1} failed: {e}. Retrying...")
+                await asyncio.sleep(self.retry_interval)
+        logging.error("Failed to synchronize time after multiple attempts")
+        return None
+
+    async def _run(self):
+        delay = self.interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.sample()
+                delay = self.interval
+                if self.jitter > self.recv_window / 4:
+                    logging.warning(f"Clock jitter {self.jitter:.1f}ms is large for recv_window {self.recv_window}ms")
+            except Exception as e:
+                logging.warning(f"Clock sync failed: {e}")
+                delay = self.retry_interval
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def metrics(self):
+        rtts = [sample[2] for sample in self.samples]
+        return {
+            'offset_ms': self.offset,
+            'drift_ppm': self.drift * 1e6,
+            'jitter_ms': self.jitter,
+            'min_rtt_ms': min(rtts) if rtts else None,
+            'samples': len(self.samples),
+            'since_sync_s': time.time() - self.synced_at if self.synced_at else None,
+        }
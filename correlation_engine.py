@@ -0,0 +1,106 @@
+import time
+import numpy as np
+import pandas as pd
+
+
+class CorrelationEngine:
+    """EWMA covariance and correlation of log returns across all traded symbols.
+
+    The latest close of every symbol is recorded each cycle; once per
+    ``update_interval`` seconds the log returns since the previous refresh
+    form one row ``r`` that is folded into the matrix in place,
+    ``S = decay * S + (1 - decay) * r r^T``, so a refresh is one outer
+    product regardless of history length. The decay gives an effective
+    window of ``lookback_period`` days. The first history handed to
+    ``observe`` seeds the matrix, so it is usable from the first cycle.
+    """
+
+    def __init__(self, symbols, update_interval=86400, lookback_period=30):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.update_interval = update_interval
+        span = max(lookback_period * 86400 / update_interval, 1)
+        self.decay = 1 - 2 / (span + 1)
+        n = len(self.symbols)
+        self.cov = np.zeros((n, n))
+        self.prices = np.full(n, np.nan)
+        self.last_prices = np.full(n, np.nan)
+        # sum of the weights folded in so far; dividing by it removes the bias of starting from zero
+        self.total_weight = 0.0
+        self.seeded = False
+        self.last_refresh = None
+        self._pending = {}
+        self._correlation = None
+
+    @classmethod
+    def from_config(cls, symbols, config):
+        return cls(symbols,
+                   update_interval=config.get('update_interval', 86400),
+                   lookback_period=config.get('lookback_period', 30))
+
+    def observe(self, symbol, closes):
+        """Record the latest close of ``symbol``; before seeding, its history is kept to seed from."""
+        i = self.index.get(symbol)
+        if i is None or not len(closes):
+            return
+        self.prices[i] = closes.iloc[-1]
+        if not self.seeded:
+            self._pending[symbol] = closes
+
+    def _fold(self, returns):
+        self.cov *= self.decay
+        self.cov += np.outer(returns, (1 - self.decay) * returns)
+        self.total_weight = self.total_weight * self.decay + (1 - self.decay)
+        self._correlation = None
+
+    def _seed(self):
+        frame = pd.concat(self._pending, axis=1)
+        bars = frame.resample(f"{int(self.update_interval)}s").last().ffill()
+        returns = np.log(bars).diff().iloc[1:].fillna(0.0)
+        columns = [self.index[symbol] for symbol in returns.columns]
+        row = np.zeros(len(self.symbols))
+        for values in returns.to_numpy():
+            row[columns] = values
+            self._fold(row)
+        self._pending.clear()
+        self.seeded = True
+
+    def refresh(self, now=None):
+        """Fold in the returns since the last refresh if ``update_interval`` has passed; True if it did."""
+        now = time.time() if now is None else now
+        if not self.seeded:
+            if not self._pending:
+                return False
+            self._seed()
+        elif now - self.last_refresh < self.update_interval:
+            return False
+        else:
+            valid = ~np.isnan(self.prices) & ~np.isnan(self.last_prices)
+            returns = np.zeros(len(self.symbols))
+            returns[valid] = np.log(self.prices[valid] / self.last_prices[valid])
+            self._fold(returns)
+        self.last_prices = np.where(np.isnan(self.prices), self.last_prices, self.prices)
+        self.last_refresh = now
+        return True
+
+    def covariance(self, symbols=None):
+        """Covariance of log returns over one ``update_interval``, for ``symbols`` in that order."""
+        cov = self.cov / self.total_weight if self.total_weight else self.cov
+        if symbols is None:
+            return cov
+        indices = [self.index[symbol] for symbol in symbols]
+        return cov[np.ix_(indices, indices)]
+
+    def correlation_matrix(self):
+        if self._correlation is None:
+            std = np.sqrt(np.diag(self.cov))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._correlation = np.nan_to_num(self.cov / np.outer(std, std))
+        return self._correlation
+
+    def correlations(self, symbol):
+        """Correlation of ``symbol`` with every other symbol, or {} before seeding."""
+        i = self.index.get(symbol)
+        if i is None or not self.seeded:
+            return {}
+        return dict(zip(self.symbols, self.correlation_matrix()[i].tolist()))
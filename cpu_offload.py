@@ -0,0 +1,125 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from market_regime_detector import MarketRegimeDetector
+
+# per worker process: symbol -> (block name, attached SharedMemory), and the regime detectors
+_attached = {}
+_detectors = {}
+
+
+def _call(fn, symbol, name, shape, args):
+    # The input array is read in place from the parent's block; only names, shapes and results are pickled.
+    cached = _attached.get(symbol)
+    if cached is None or cached[0] != name:
+        if cached is not None:
+            cached[1].close()
+        cached = _attached[symbol] = (name, shared_memory.SharedMemory(name=name))
+    values = np.ndarray(shape, dtype=np.float64, buffer=cached[1].buf)
+    return fn(symbol, values, *args)
+
+
+def _detect_regime(symbol, prices, settings):
+    # settings is a sorted tuple of constructor arguments, so each configuration keeps its own models
+    detector = _detectors.get(settings)
+    if detector is None:
+        detector = _detectors[settings] = MarketRegimeDetector(**dict(settings))
+    return detector.detect_regime(prices, symbol)
+
+
+def _regime_parameters(symbol, values, settings):
+    return _detectors[settings].get_regime_parameters(symbol)
+
+
+class AnalyticsPool:
+    """Runs CPU-bound per-symbol analytics in worker processes, off the event loop.
+
+    There is one single-process executor per worker and every symbol is
+    pinned to one of them, so state a task leaves behind in its worker (a
+    fitted model, say) is there again for that symbol's next task. Each
+    symbol's input array is written into a shared-memory block the worker
+    keeps attached, so a call pickles only the block name, the shape and the
+    result.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        context = multiprocessing.get_context('spawn')
+        self.executors = [ProcessPoolExecutor(max_workers=1, mp_context=context) for _ in range(self.workers)]
+        self.assignment = {}
+        self.blocks = {}
+        self.locks = {}
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(workers=config.get('workers') or None)
+
+    def worker_for(self, symbol):
+        """Symbols are assigned round-robin on first use and keep their worker afterwards."""
+        if symbol not in self.assignment:
+            self.assignment[symbol] = len(self.assignment) % self.workers
+        return self.assignment[symbol]
+
+    def _block(self, symbol, size):
+        block = self.blocks.get(symbol)
+        if block is None or block.size < size:
+            if block is not None:
+                block.close()
+                block.unlink()
+            block = self.blocks[symbol] = shared_memory.SharedMemory(create=True, size=max(size, 8))
+        return block
+
+    async def run(self, symbol, fn, values, *args):
+        """Return ``fn(symbol, values, *args)`` evaluated in the symbol's worker.
+
+        ``fn`` must be a module-level function and ``values`` a float array;
+        the worker sees it as a view of shared memory, so results must not
+        reference it.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        lock = self.locks.setdefault(symbol, asyncio.Lock())
+        # the block is reused, so it must not be rewritten while the worker still reads it
+        async with lock:
+            block = self._block(symbol, values.nbytes)
+            np.ndarray(values.shape, dtype=np.float64, buffer=block.buf)[...] = values
+            executor = self.executors[self.worker_for(symbol)]
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, functools.partial(_call, fn, symbol, block.name, values.shape, args))
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks.clear()
+        logging.info(f"Analytics pool with {self.workers} workers shut down")
+
+
+class OffloadedRegimeDetector(MarketRegimeDetector):
+    """MarketRegimeDetector whose fits and classifications run in an AnalyticsPool.
+
+    The fitted mixtures live in the worker each symbol is pinned to, so
+    warm-started refits work as in-process; ``detect_regime`` and
+    ``get_regime_parameters`` are coroutines.
+    """
+
+    def __init__(self, pool, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+        self.settings = tuple(sorted(kwargs.items()))
+
+    async def detect_regime(self, price_data, symbol=None):
+        # only the lookback window is used, so only it is copied into shared memory
+        prices = np.asarray(price_data, dtype=np.float64)[-self.lookback_period:]
+        return await self.pool.run(symbol, _detect_regime, prices, self.settings)
+
+    async def get_regime_parameters(self, symbol=None):
+        """Means, covariances and weights of the mixture fitted in the symbol's worker."""
+        # no input is needed; an empty array keeps the call on the pinned worker's usual path
+        return await self.pool.run(symbol, _regime_parameters, np.empty(0), self.settings)
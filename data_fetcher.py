@@ -2,6 +2,9 @@ import pandas as pd
 import asyncio
 import logging
 from utils import handle_api_error
+from ohlcv_cache import OHLCVCache
+from order_book import OrderBookManager
+from instrumentation import metrics
 
 class DataFetcher:
     def __init__(self, exchange, config):
@@ -10,10 +13,79 @@ class DataFetcher:
         self.limit = config['limit']
         self.max_retries = 3
         self.retry_delay = 5
+        cache_dir = config.get('cache_dir')
+        self.cache = OHLCVCache(cache_dir) if cache_dir else None
+        self.stream = None
+        self.order_books = OrderBookManager(exchange)
+        self._synced_epochs = {}
+        self._kline_sequences = {}
+        self._kline_backlog = {}
+        self._kline_gaps = set()
+        self._stream_tasks = []
+
+    def attach_stream(self, stream):
+        """Feed klines and order books from a MarketDataStream instead of polling REST."""
+        self.stream = stream
+        self._stream_tasks = [
+            asyncio.create_task(self._consume_klines(stream.subscribe('kline'))),
+            asyncio.create_task(self.order_books.consume(stream.subscribe('orderbook'))),
+        ]
+
+    async def _consume_klines(self, queue):
+        # Streamed candles only extend a cache that REST has brought up to date
+        # for the current connection; anything else would leave a hole behind
+        # the candle it writes, since the next sync starts from the last one.
+        while True:
+            update = await queue.get()
+            if self.cache is None:
+                continue
+            symbol = update['symbol']
+            previous = self._kline_sequences.get(symbol)
+            self._kline_sequences[symbol] = update['sequence']
+            if previous is not None and update['sequence'] != previous + 1:
+                # updates were dropped on queue overflow; the missing candles must come from REST
+                logging.warning(f"Lost {update['sequence'] - previous - 1} kline updates for {symbol}, resyncing")
+                self._synced_epochs.pop(symbol, None)
+                self._kline_backlog.pop(symbol, None)
+                self._kline_gaps.add(symbol)
+                continue
+            if symbol in self._kline_backlog:
+                self._kline_backlog[symbol].extend(update['candles'])
+            elif self._stream_is_current(symbol):
+                self.cache.update(symbol, self.timeframe, update['candles'])
+
+    def _stream_is_current(self, symbol):
+        # The cache only stays complete while the socket that fed it has not
+        # dropped since the last REST sync; a reconnect bumps the epoch.
+        return (self.stream is not None and self.stream.is_live(symbol)
+                and self._synced_epochs.get(symbol) == self.stream.connection_epochs[symbol])
+
+    async def _resync(self, symbol):
+        """Bring the cache up to date over REST, then let the stream extend it."""
+        self._synced_epochs.pop(symbol, None)
+        self._kline_gaps.discard(symbol)
+        epoch = None
+        if self.stream is not None:
+            epoch = self.stream.connection_epochs[symbol]
+            # candles streamed while REST is paging are held back and applied after it
+            self._kline_backlog[symbol] = []
+        try:
+            await self._sync_cache(symbol)
+            backlog = self._kline_backlog.pop(symbol, None)
+            if backlog:
+                self.cache.update(symbol, self.timeframe, backlog)
+            if symbol not in self._kline_gaps:
+                self._synced_epochs[symbol] = epoch
+        finally:
+            self._kline_backlog.pop(symbol, None)
 
     async def fetch_historical_data(self, symbol):
         for attempt in range(self.max_retries):
             try:
+                if self.cache is not None:
+                    if not self._stream_is_current(symbol):
+                        await self._resync(symbol)
+                    return self.cache.read(symbol, self.timeframe, self.limit)
                 ohlcv = await self.exchange.fetch_ohlcv(symbol, self.timeframe, limit=self.limit)
                 df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
                 df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
@@ -22,13 +94,33 @@ class DataFetcher:
             except Exception as e:
                 logging.warning(f"Attempt {attempt + 1} failed to fetch data for {symbol}: {e}")
                 if attempt < self.max_retries - 1:
+                    metrics.increment('retries_total', operation='fetch_ohlcv')
                     await asyncio.sleep(self.retry_delay)
                 else:
                     handle_api_error(e)
                     logging.error(f"Failed to fetch data for {symbol} after {self.max_retries} attempts")
         return pd.DataFrame() 
 
+    async def _sync_cache(self, symbol):
+        last_ts = self.cache.last_timestamp(symbol, self.timeframe)
+        if last_ts is None:
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, self.timeframe, limit=self.limit)
+            self.cache.update(symbol, self.timeframe, ohlcv)
+            return
+
+        # The last stored candle was still open when written, so fetch from it
+        # onwards: it gets overwritten and only newer candles are appended.
+        since = last_ts
+        while True:
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, self.timeframe, since=since, limit=self.limit)
+            self.cache.update(symbol, self.timeframe, ohlcv)
+            if len(ohlcv) < self.limit or ohlcv[-1][0] <= since:
+                break
+            since = ohlcv[-1][0]
+
     async def fetch_order_book(self, symbol, depth=10):
+        if self.stream is not None and self.stream.is_live(symbol) and self.order_books.is_synced(symbol):
+            return self.order_books.top(symbol, depth)
         for attempt in range(self.max_retries):
             try:
                 order_book = await self.exchange.fetch_order_book(symbol, depth)
@@ -36,6 +128,7 @@ class DataFetcher:
             except Exception as e:
                 logging.warning(f"Attempt {attempt + 1} failed to fetch order book for {symbol}: {e}")
                 if attempt < self.max_retries - 1:
+                    metrics.increment('retries_total', operation='fetch_order_book')
                     await asyncio.sleep(self.retry_delay)
                 else:
                     handle_api_error(e)
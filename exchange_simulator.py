@@ -0,0 +1,732 @@
+import asyncio
+import bisect
+import itertools
+import math
+import time
+from collections import deque
+import ccxt
+import numpy as np
+
+EPSILON = 1e-12
+ORDER_TYPES = ('market', 'limit', 'stop', 'trailing_stop_market', 'oco', 'iceberg', 'twap')
+
+
+class LatencyModel:
+    """Per-request delay: a fixed base plus log-normal jitter, in milliseconds."""
+
+    def __init__(self, base_ms=0.0, jitter_ms=0.0, seed=42):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self):
+        if self.jitter_ms <= 0:
+            return self.base_ms / 1000
+        return (self.base_ms + self.rng.lognormal(math.log(self.jitter_ms), 0.5)) / 1000
+
+
+class FeeModel:
+    def __init__(self, maker=0.0002, taker=0.00055):
+        self.maker = maker
+        self.taker = taker
+
+    def rate(self, liquidity):
+        return self.maker if liquidity == 'maker' else self.taker
+
+
+class MatchingEngine:
+    """Price-time priority limit order book for one symbol.
+
+    Each price level is a FIFO queue; incoming orders take liquidity from the
+    best opposite level first and, within a level, from the oldest resting
+    order. Resting orders are plain dicts with ``id``, ``side``, ``price``,
+    ``remaining`` and ``owner`` (None for the simulator's own liquidity). An
+    iceberg also has ``visible`` and ``hidden``: when its shown slice is used
+    up the next one is shown at the back of the level's queue.
+    """
+
+    def __init__(self):
+        self.levels = {'buy': {}, 'sell': {}}
+        # ascending prices per side; the best bid is the last, the best ask the first
+        self.prices = {'buy': [], 'sell': []}
+
+    def best(self, side):
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == 'buy' else prices[0]
+
+    def _crosses(self, side, limit, level_price):
+        if limit is None:
+            return True
+        return level_price <= limit if side == 'buy' else level_price >= limit
+
+    def match(self, side, amount, limit=None):
+        """Take up to ``amount`` from the opposite side; returns [(maker, quantity, price)]."""
+        opposite = 'sell' if side == 'buy' else 'buy'
+        fills = []
+        while amount > EPSILON:
+            level_price = self.best(opposite)
+            if level_price is None or not self._crosses(side, limit, level_price):
+                break
+            queue = self.levels[opposite][level_price]
+            while queue and amount > EPSILON:
+                maker = queue[0]
+                quantity = min(maker['remaining'], amount)
+                maker['remaining'] -= quantity
+                amount -= quantity
+                fills.append((maker, quantity, level_price))
+                if maker['remaining'] <= EPSILON:
+                    queue.popleft()
+                    if maker.get('hidden', 0.0) > EPSILON:
+                        maker['remaining'] = min(maker['visible'], maker['hidden'])
+                        maker['hidden'] -= maker['remaining']
+                        queue.append(maker)
+            if not queue:
+                self._remove_level(opposite, level_price)
+        return fills
+
+    def rest(self, order):
+        side, price = order['side'], order['price']
+        queue = self.levels[side].get(price)
+        if queue is None:
+            queue = self.levels[side][price] = deque()
+            bisect.insort(self.prices[side], price)
+        queue.append(order)
+
+    def cancel(self, order):
+        queue = self.levels[order['side']].get(order['price'])
+        if queue is None or order not in queue:
+            return False
+        queue.remove(order)
+        if not queue:
+            self._remove_level(order['side'], order['price'])
+        return True
+
+    def _remove_level(self, side, price):
+        del self.levels[side][price]
+        prices = self.prices[side]
+        del prices[bisect.bisect_left(prices, price)]
+
+    def remove_where(self, predicate):
+        for side in ('buy', 'sell'):
+            for price in list(self.prices[side]):
+                queue = self.levels[side][price]
+                kept = deque(order for order in queue if not predicate(order))
+                if kept:
+                    self.levels[side][price] = kept
+                else:
+                    self._remove_level(side, price)
+
+    def depth(self, side, limit):
+        prices = self.prices[side]
+        prices = reversed(prices[-limit:]) if side == 'buy' else prices[:limit]
+        return [[price, sum(order['remaining'] for order in self.levels[side][price])] for price in prices]
+
+
+class SimulatedExchange:
+    """In-process stand-in for the ccxt async exchange, for paper trading and load tests.
+
+    Each symbol has a MatchingEngine seeded with simulator liquidity around a
+    random-walk mid price; ``tick`` moves the mid, re-quotes that liquidity
+    (filling any resting orders it crosses), fires stop, take-profit and
+    trailing-stop orders and sends the next TWAP slices. Besides market, limit
+    and stop orders it takes the ``AdvancedOrderTypes`` ones: a trailing stop
+    arms at its trigger price and fires on a ``trailingStop`` (fraction)
+    retrace from the best price since, an OCO is a limit order plus a stop in
+    one group, an iceberg rests ``visibleSize`` at a time and a TWAP takes
+    liquidity evenly over ``duration`` simulated seconds. Everything random
+    comes from ``seed``, and every API call waits on the latency model first.
+    """
+
+    def __init__(self, symbols, initial_balance=1000, seed=42, latency=None, fees=None, initial_prices=None,
+                 volatility=0.8, book_levels=20, level_notional=5000, spread=0.0002, tick_interval=1.0):
+        self.symbols = list(symbols)
+        self.rng = np.random.default_rng(seed)
+        self.latency = latency or LatencyModel(seed=seed)
+        self.fees = fees or FeeModel()
+        self.volatility = volatility
+        self.book_levels = book_levels
+        self.level_notional = level_notional
+        self.spread = spread
+        self.tick_interval = tick_interval
+        self.balance = float(initial_balance)
+
+        self.id = 'simulator'
+        self.options = {}
+        self.enableRateLimit = False
+        self.last_response_headers = None
+
+        initial_prices = initial_prices or {}
+        self.markets = {}
+        self.mids = {}
+        self.engines = {}
+        for symbol in self.symbols:
+            mid = float(initial_prices.get(symbol, self.rng.uniform(1, 1000)))
+            self.mids[symbol] = mid
+            self.engines[symbol] = MatchingEngine()
+            tick_size = 10 ** math.floor(math.log10(mid * 1e-4))
+            lot_size = 10 ** math.floor(math.log10(10 / mid))
+            self.markets[symbol] = {
+                'id': symbol.split(':')[0].replace('/', ''),
+                'symbol': symbol,
+                'type': 'swap',
+                'linear': True,
+                'contract': True,
+                'precision': {'price': tick_size, 'amount': lot_size},
+                'limits': {'amount': {'min': lot_size}, 'cost': {'min': 5.0}, 'leverage': {'max': 100.0}},
+            }
+
+        self.orders = {}
+        self.conditional = {symbol: [] for symbol in self.symbols}
+        self.twaps = {symbol: [] for symbol in self.symbols}
+        self.positions = {symbol: {'size': 0.0, 'entry_price': 0.0, 'realized': 0.0} for symbol in self.symbols}
+        self.leverage = {symbol: 1.0 for symbol in self.symbols}
+        self.trades = []
+        self.candles = {}
+        self._resting = {}
+        self._order_ids = itertools.count(1)
+        self._trade_ids = itertools.count(1)
+        self._queues = {}
+        self._task = None
+        for symbol in self.symbols:
+            self._quote(symbol)
+
+    @classmethod
+    def from_config(cls, symbols, config):
+        return cls(symbols,
+                   initial_balance=config.get('initial_balance', 1000),
+                   seed=config.get('seed', 42),
+                   latency=LatencyModel(config.get('latency_ms', 0.0), config.get('latency_jitter_ms', 0.0),
+                                        config.get('seed', 42)),
+                   fees=FeeModel(config.get('maker_fee', 0.0002), config.get('taker_fee', 0.00055)),
+                   initial_prices=config.get('initial_prices'),
+                   volatility=config.get('volatility', 0.8),
+                   book_levels=config.get('book_levels', 20),
+                   level_notional=config.get('level_notional', 5000),
+                   spread=config.get('spread', 0.0002),
+                   tick_interval=config.get('tick_interval', 1.0))
+
+    # -- simulation -------------------------------------------------------------------------------
+
+    def _market(self, symbol):
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"simulator does not list {symbol}")
+        return self.markets[symbol]
+
+    def _quote(self, symbol):
+        """Replace the simulator's liquidity around the current mid; crossed resting orders fill."""
+        engine = self.engines[symbol]
+        engine.remove_where(lambda order: order['owner'] is None)
+        mid = self.mids[symbol]
+        tick_size = self.markets[symbol]['precision']['price']
+        offsets = self.spread / 2 + np.arange(self.book_levels) * tick_size / mid * 2
+        sizes = self.level_notional / mid * self.rng.uniform(0.5, 1.5, (2, self.book_levels))
+        for side, sign, row in (('sell', 1, 0), ('buy', -1, 1)):
+            for offset, size in zip(offsets, sizes[row]):
+                price = round(mid * (1 + sign * offset) / tick_size) * tick_size
+                maker = {'id': None, 'side': side, 'price': price, 'remaining': float(size), 'owner': None}
+                for resting, quantity, fill_price in engine.match(side, maker['remaining'], price):
+                    maker['remaining'] -= quantity
+                    if resting['owner'] is not None:
+                        self._fill(self.orders[resting['id']], quantity, fill_price, 'maker')
+                if maker['remaining'] > EPSILON:
+                    engine.rest(maker)
+
+    def tick(self, seconds=None):
+        seconds = self.tick_interval if seconds is None else seconds
+        sigma = self.volatility * math.sqrt(seconds / (365 * 86400))
+        moves = np.exp(sigma * self.rng.standard_normal(len(self.symbols)) - sigma ** 2 / 2)
+        now = self.milliseconds()
+        for symbol, move in zip(self.symbols, moves):
+            self.mids[symbol] *= float(move)
+            self._quote(symbol)
+            self._update_candles(symbol, now)
+            self._trigger(symbol)
+            self._slice_twaps(symbol, seconds)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            self.tick()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _update_candles(self, symbol, now):
+        mid = self.mids[symbol]
+        for (candle_symbol, timeframe), candles in self.candles.items():
+            if candle_symbol != symbol:
+                continue
+            bar = self.parse_timeframe(timeframe) * 1000
+            start = now // bar * bar
+            if candles[-1][0] < start:
+                candles.append([start, candles[-1][4], mid, mid, mid, 0.0])
+            candle = candles[-1]
+            candle[2], candle[3], candle[4] = max(candle[2], mid), min(candle[3], mid), mid
+            candle[5] += float(self.rng.uniform(0, self.level_notional / mid))
+
+    def _history(self, symbol, timeframe, bars=1000):
+        key = (symbol, timeframe)
+        if key not in self.candles:
+            # a random walk backwards from the current mid, so the last close matches the book
+            seconds = self.parse_timeframe(timeframe)
+            sigma = self.volatility * math.sqrt(seconds / (365 * 86400))
+            closes = self.mids[symbol] / np.exp(np.cumsum(sigma * self.rng.standard_normal(bars))[::-1])
+            closes = np.append(closes[1:], self.mids[symbol])
+            opens = np.append(closes[0], closes[:-1])
+            wicks = np.abs(self.rng.normal(0, sigma / 2, (2, bars)))
+            highs = np.maximum(opens, closes) * (1 + wicks[0])
+            lows = np.minimum(opens, closes) * (1 - wicks[1])
+            volumes = self.rng.uniform(0.5, 1.5, bars) * self.level_notional / closes
+            last = self.milliseconds() // (seconds * 1000) * seconds * 1000
+            timestamps = last - np.arange(bars)[::-1] * seconds * 1000
+            self.candles[key] = [[int(ts), float(o), float(h), float(l), float(c), float(v)]
+                                 for ts, o, h, l, c, v in zip(timestamps, opens, highs, lows, closes, volumes)]
+        return self.candles[key]
+
+    # -- order handling ---------------------------------------------------------------------------
+
+    def _new_order(self, symbol, order_type, side, amount, price, params):
+        return {
+            'id': str(next(self._order_ids)),
+            'clientOrderId': params.get('clientOrderId'),
+            'timestamp': self.milliseconds(),
+            'symbol': symbol,
+            'type': order_type,
+            'side': side,
+            'price': price,
+            'amount': amount,
+            'filled': 0.0,
+            'remaining': amount,
+            'cost': 0.0,
+            'average': None,
+            'status': 'open',
+            'reduceOnly': bool(params.get('reduceOnly')),
+            'triggerPrice': None,
+            'fee': {'cost': 0.0, 'currency': 'USDT'},
+            'trades': [],
+            'info': {},
+        }
+
+    def _fill(self, order, quantity, price, liquidity):
+        symbol, side = order['symbol'], order['side']
+        fee = quantity * price * self.fees.rate(liquidity)
+        order['filled'] += quantity
+        order['remaining'] = max(order['amount'] - order['filled'], 0.0)
+        order['cost'] += quantity * price
+        order['average'] = order['cost'] / order['filled']
+        order['fee']['cost'] += fee
+        if order['remaining'] <= EPSILON:
+            order['status'] = 'closed'
+            self._resting.pop(order['id'], None)
+
+        position = self.positions[symbol]
+        signed = quantity if side == 'buy' else -quantity
+        size = position['size']
+        if size == 0 or (size > 0) == (signed > 0):
+            position['entry_price'] = (position['entry_price'] * abs(size) + price * quantity) / (abs(size) + quantity)
+        else:
+            closed = min(quantity, abs(size))
+            realized = closed * (price - position['entry_price']) * (1 if size > 0 else -1)
+            position['realized'] += realized
+            self.balance += realized
+            if quantity > abs(size):
+                position['entry_price'] = price
+        position['size'] = size + signed
+        if abs(position['size']) <= EPSILON:
+            position['size'] = 0.0
+            position['entry_price'] = 0.0
+        self.balance -= fee
+
+        trade = {
+            'id': str(next(self._trade_ids)),
+            'order': order['id'],
+            'symbol': symbol,
+            'side': side,
+            'price': price,
+            'amount': quantity,
+            'cost': quantity * price,
+            'fee': {'cost': fee, 'currency': 'USDT'},
+            'takerOrMaker': liquidity,
+            'timestamp': self.milliseconds(),
+        }
+        self.trades.append(trade)
+        order['trades'].append(trade)
+        self._publish('execution', trade)
+        self._publish('order', dict(order))
+        if order['status'] == 'closed':
+            self._on_closed(order)
+
+    def _on_closed(self, order):
+        # attached stop loss / take profit become live once the entry is filled
+        for key in ('stopLoss', 'takeProfit'):
+            attached = order['info'].get(key)
+            if attached is not None:
+                self._add_conditional(order['symbol'], 'sell' if order['side'] == 'buy' else 'buy', order['filled'],
+                                      attached['triggerPrice'], attached.get('price'), reduce_only=True,
+                                      group=order['id'])
+        # one side of a bracket closing cancels the other
+        group = order['info'].get('group')
+        if group is not None:
+            for other in list(self.conditional[order['symbol']]):
+                if other['info'].get('group') == group:
+                    self._cancel(other)
+            for order_id in list(self._resting):
+                if self.orders[order_id]['info'].get('group') == group:
+                    self._cancel(self.orders[order_id])
+
+    def _add_conditional(self, symbol, side, amount, trigger_price, price=None, reduce_only=False, group=None,
+                         order=None):
+        if order is None:
+            order = self._new_order(symbol, 'limit' if price else 'market', side, amount, price,
+                                    {'reduceOnly': reduce_only})
+            self.orders[order['id']] = order
+        order['triggerPrice'] = trigger_price
+        order['info']['triggerDirection'] = 'rise' if trigger_price > self.mids[symbol] else 'fall'
+        if group is not None:
+            order['info']['group'] = group
+        self.conditional[symbol].append(order)
+        self._publish('order', dict(order))
+        return order
+
+    @staticmethod
+    def _crossed(order, mid):
+        rising = order['info']['triggerDirection'] == 'rise'
+        return (rising and mid >= order['triggerPrice']) or (not rising and mid <= order['triggerPrice'])
+
+    @staticmethod
+    def _trailed(order, mid):
+        # the best price since the trailing stop armed; it fires once the mid retraces ``trailingStop`` from it
+        info = order['info']
+        if order['side'] == 'sell':
+            info['extreme'] = max(info['extreme'], mid)
+            return mid <= info['extreme'] * (1 - info['trailingStop'])
+        info['extreme'] = min(info['extreme'], mid)
+        return mid >= info['extreme'] * (1 + info['trailingStop'])
+
+    def _trigger(self, symbol):
+        mid = self.mids[symbol]
+        for order in list(self.conditional[symbol]):
+            if order['status'] != 'open' or order not in self.conditional[symbol]:
+                continue
+            if 'trailingStop' in order['info']:
+                if 'extreme' in order['info']:
+                    fired = self._trailed(order, mid)
+                else:
+                    if self._crossed(order, mid):
+                        order['info']['extreme'] = mid
+                        self._publish('order', dict(order))
+                    fired = False
+            else:
+                fired = self._crossed(order, mid)
+            if fired:
+                self.conditional[symbol].remove(order)
+                self._execute(order)
+
+    def _slice_twaps(self, symbol, seconds):
+        for order in list(self.twaps[symbol]):
+            info = order['info']
+            info['elapsed'] = min(info['elapsed'] + seconds, info['duration'])
+            quantity = order['amount'] * info['elapsed'] / info['duration'] - order['filled']
+            if quantity > EPSILON:
+                self._take(order, quantity)
+            if order['status'] != 'open':
+                self.twaps[symbol].remove(order)
+            elif info['elapsed'] >= info['duration']:
+                self.twaps[symbol].remove(order)
+                self._expire(order)
+
+    def _take(self, order, quantity, limit=None):
+        for resting, filled, price in self.engines[order['symbol']].match(order['side'], quantity, limit):
+            if resting['owner'] is not None:
+                self._fill(self.orders[resting['id']], filled, price, 'maker')
+            self._fill(order, filled, price, 'taker')
+
+    def _expire(self, order):
+        # whatever the book could not fill is canceled; a partial fill still counts as closed
+        order['status'] = 'canceled' if order['filled'] == 0 else 'closed'
+        self._publish('order', dict(order))
+        if order['status'] == 'closed':
+            self._on_closed(order)
+
+    def _execute(self, order):
+        symbol = order['symbol']
+        if order['reduceOnly']:
+            position = self.positions[symbol]['size']
+            closing = position < 0 if order['side'] == 'buy' else position > 0
+            if not closing:
+                order['status'] = 'canceled'
+                self._publish('order', dict(order))
+                return order
+            order['amount'] = order['remaining'] = min(order['amount'], abs(position))
+
+        self._take(order, order['remaining'], order['price'])
+        if order['status'] == 'open':
+            if order['type'] == 'market':
+                # market orders never rest
+                self._expire(order)
+            else:
+                resting = {'id': order['id'], 'side': order['side'], 'price': order['price'],
+                           'remaining': order['remaining'], 'owner': 'user'}
+                visible = order['info'].get('visibleSize')
+                if visible is not None and visible < order['remaining']:
+                    resting.update(remaining=visible, visible=visible, hidden=order['remaining'] - visible)
+                self._resting[order['id']] = resting
+                self.engines[symbol].rest(resting)
+        return order
+
+    def _check_margin(self, symbol, side, amount, price):
+        position = self.positions[symbol]['size']
+        reducing = position < 0 if side == 'buy' else position > 0
+        if reducing and amount <= abs(position) + EPSILON:
+            return
+        used = sum(abs(p['size']) * self.mids[s] / self.leverage[s] for s, p in self.positions.items())
+        required = amount * price / self.leverage[symbol]
+        if required > self.balance - used:
+            raise ccxt.InsufficientFunds(f"simulator: {required:.4f} USDT margin required, "
+                                         f"{self.balance - used:.4f} available")
+
+    def _cancel(self, order):
+        if order['status'] != 'open':
+            return
+        if order in self.conditional[order['symbol']]:
+            self.conditional[order['symbol']].remove(order)
+        elif order in self.twaps[order['symbol']]:
+            self.twaps[order['symbol']].remove(order)
+        elif order['id'] in self._resting:
+            self.engines[order['symbol']].cancel(self._resting.pop(order['id']))
+        order['status'] = 'canceled'
+        self._publish('order', dict(order))
+
+    # -- exchange interface -----------------------------------------------------------------------
+
+    async def _delay(self):
+        delay = self.latency.sample()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def subscribe(self, channel):
+        """Order and execution updates, in the same shape PrivateStream publishes."""
+        queue = asyncio.Queue()
+        self._queues.setdefault(channel, []).append(queue)
+        return queue
+
+    def _publish(self, channel, message):
+        for queue in self._queues.get(channel, []):
+            queue.put_nowait(message)
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+
+    @staticmethod
+    def milliseconds():
+        return int(time.time() * 1000)
+
+    def nonce(self):
+        return self.milliseconds()
+
+    def amount_to_precision(self, symbol, amount):
+        lot = self._market(symbol)['precision']['amount']
+        decimals = max(0, -math.floor(math.log10(lot)))
+        return f"{math.floor(amount / lot + 1e-9) * lot:.{decimals}f}"
+
+    def price_to_precision(self, symbol, price):
+        tick = self._market(symbol)['precision']['price']
+        decimals = max(0, -math.floor(math.log10(tick)))
+        return f"{round(price / tick) * tick:.{decimals}f}"
+
+    async def fetch_time(self):
+        await self._delay()
+        return self.milliseconds()
+
+    async def load_markets(self, reload=False):
+        await self._delay()
+        return self.markets
+
+    async def fetch_markets(self):
+        await self._delay()
+        return list(self.markets.values())
+
+    async def fetch_ticker(self, symbol):
+        await self._delay()
+        self._market(symbol)
+        engine = self.engines[symbol]
+        return {'symbol': symbol, 'timestamp': self.milliseconds(), 'last': self.mids[symbol],
+                'bid': engine.best('buy'), 'ask': engine.best('sell')}
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        await self._delay()
+        self._market(symbol)
+        candles = self._history(symbol, timeframe)
+        if since is not None:
+            candles = [candle for candle in candles if candle[0] >= since]
+        if limit is not None:
+            candles = candles[:limit] if since is not None else candles[-limit:]
+        return [list(candle) for candle in candles]
+
+    async def fetch_order_book(self, symbol, limit=None):
+        await self._delay()
+        self._market(symbol)
+        engine = self.engines[symbol]
+        limit = limit or self.book_levels
+        now = self.milliseconds()
+        return {'symbol': symbol, 'bids': engine.depth('buy', limit), 'asks': engine.depth('sell', limit),
+                'timestamp': now, 'nonce': now}
+
+    async def set_leverage(self, leverage, symbol=None, params={}):
+        await self._delay()
+        self._market(symbol)
+        if self.leverage[symbol] == float(leverage):
+            # what Bybit answers when nothing changes
+            raise ccxt.ExchangeError('bybit {"retCode":110043,"retMsg":"leverage not modified"}')
+        self.leverage[symbol] = float(leverage)
+        return {'symbol': symbol, 'leverage': float(leverage)}
+
+    async def fetch_balance(self, params={}):
+        await self._delay()
+        used = sum(abs(p['size']) * self.mids[s] / self.leverage[s] for s, p in self.positions.items())
+        balance = {'free': self.balance - used, 'used': used, 'total': self.balance}
+        return {'USDT': balance, 'free': {'USDT': balance['free']}, 'used': {'USDT': used},
+                'total': {'USDT': self.balance}}
+
+    async def fetch_positions(self, symbols=None, params={}):
+        await self._delay()
+        positions = []
+        for symbol, position in self.positions.items():
+            if position['size'] == 0 or (symbols and symbol not in symbols):
+                continue
+            mark = self.mids[symbol]
+            positions.append({
+                'symbol': symbol,
+                'side': 'long' if position['size'] > 0 else 'short',
+                'contracts': abs(position['size']),
+                'entryPrice': position['entry_price'],
+                'markPrice': mark,
+                'unrealizedPnl': position['size'] * (mark - position['entry_price']),
+                'leverage': self.leverage[symbol],
+            })
+        return positions
+
+    async def create_order(self, symbol, type, side, amount, price=None, params={}):
+        await self._delay()
+        self._market(symbol)
+        order_type = type.lower()
+        if order_type not in ORDER_TYPES:
+            raise ccxt.InvalidOrder(f"simulator does not support order type {type}")
+        if side not in ('buy', 'sell') or amount <= 0:
+            raise ccxt.InvalidOrder(f"invalid order: {side} {amount} {symbol}")
+        if order_type in ('limit', 'oco', 'iceberg') and price is None:
+            raise ccxt.InvalidOrder(f"{order_type} orders need a price")
+        trigger_price = params.get('triggerPrice') or params.get('stopPrice')
+        if order_type in ('stop', 'trailing_stop_market', 'oco') and trigger_price is None:
+            raise ccxt.InvalidOrder(f"{order_type} orders need a stopPrice or triggerPrice")
+        if order_type == 'trailing_stop_market' and not 0 < params.get('trailingStop', 0) < 1:
+            raise ccxt.InvalidOrder('trailing stops need a trailingStop fraction between 0 and 1')
+        if order_type == 'iceberg' and not params.get('visibleSize', 0) > 0:
+            raise ccxt.InvalidOrder('iceberg orders need a positive visibleSize')
+        if order_type == 'twap' and not params.get('duration', 0) > 0:
+            raise ccxt.InvalidOrder('TWAP orders need a positive duration')
+
+        reference = price or self.mids[symbol]
+        if not params.get('reduceOnly'):
+            self._check_margin(symbol, side, amount, reference)
+
+        if order_type == 'oco':
+            # the limit order and a stop (a stop-limit at params['price'], if given) cancel each other
+            order = self._new_order(symbol, 'limit', side, amount, price, params)
+            order['info']['group'] = order['id']
+            self.orders[order['id']] = order
+            self._add_conditional(symbol, side, amount, float(trigger_price), params.get('price'),
+                                  order['reduceOnly'], group=order['id'])
+            return dict(self._execute(order))
+
+        if trigger_price is not None:
+            order = self._new_order(symbol, 'limit' if price else 'market', side, amount, price, params)
+            if order_type == 'trailing_stop_market':
+                order['info']['trailingStop'] = float(params['trailingStop'])
+            self.orders[order['id']] = order
+            return dict(self._add_conditional(symbol, side, amount, float(trigger_price), price,
+                                              bool(params.get('reduceOnly')), order=order))
+
+        if order_type == 'twap':
+            order = self._new_order(symbol, 'twap', side, amount, None, params)
+            order['info'].update(duration=float(params['duration']), elapsed=0.0)
+            self.orders[order['id']] = order
+            self.twaps[symbol].append(order)
+            self._publish('order', dict(order))
+            return dict(order)
+
+        order = self._new_order(symbol, order_type, side, amount,
+                                price if order_type in ('limit', 'iceberg') else None, params)
+        if order_type == 'iceberg':
+            order['info']['visibleSize'] = float(params['visibleSize'])
+        for key in ('stopLoss', 'takeProfit'):
+            if params.get(key) is not None:
+                attached = params[key]
+                order['info'][key] = attached if isinstance(attached, dict) else {'triggerPrice': attached}
+        self.orders[order['id']] = order
+        return dict(self._execute(order))
+
+    async def create_market_buy_order(self, symbol, amount, params={}):
+        return await self.create_order(symbol, 'market', 'buy', amount, None, params)
+
+    async def create_market_sell_order(self, symbol, amount, params={}):
+        return await self.create_order(symbol, 'market', 'sell', amount, None, params)
+
+    async def create_limit_buy_order(self, symbol, amount, price, params={}):
+        return await self.create_order(symbol, 'limit', 'buy', amount, price, params)
+
+    async def create_limit_sell_order(self, symbol, amount, price, params={}):
+        return await self.create_order(symbol, 'limit', 'sell', amount, price, params)
+
+    async def cancel_order(self, id, symbol=None, params={}):
+        await self._delay()
+        order = self.orders.get(id)
+        if order is None or order['status'] != 'open':
+            raise ccxt.OrderNotFound(f"simulator: order {id} is not open")
+        self._cancel(order)
+        return dict(order)
+
+    async def cancel_all_orders(self, symbol=None, params={}):
+        await self._delay()
+        canceled = [order for order in self.orders.values()
+                    if order['status'] == 'open' and (symbol is None or order['symbol'] == symbol)]
+        for order in canceled:
+            self._cancel(order)
+        return [dict(order) for order in canceled]
+
+    async def fetch_order(self, id, symbol=None, params={}):
+        await self._delay()
+        if id not in self.orders:
+            raise ccxt.OrderNotFound(f"simulator: unknown order {id}")
+        return dict(self.orders[id])
+
+    async def fetch_open_orders(self, symbol=None, since=None, limit=None, params={}):
+        await self._delay()
+        return [dict(order) for order in self.orders.values()
+                if order['status'] == 'open' and (symbol is None or order['symbol'] == symbol)]
+
+    async def fetch_closed_orders(self, symbol=None, since=None, limit=None, params={}):
+        await self._delay()
+        orders = [dict(order) for order in self.orders.values()
+                  if order['status'] != 'open' and (symbol is None or order['symbol'] == symbol)
+                  and (since is None or order['timestamp'] >= since)]
+        return orders[-limit:] if limit else orders
+
+    async def fetch_my_trades(self, symbol=None, since=None, limit=None, params={}):
+        await self._delay()
+        trades = [dict(trade) for trade in self.trades
+                  if (symbol is None or trade['symbol'] == symbol) and (since is None or trade['timestamp'] >= since)]
+        return trades[-limit:] if limit else trades
@@ -1,30 +1,44 @@
-import time
+import asyncio
 import logging
+import ccxt
 from typing import Dict, Any
-from utils import handle_api_error, get_server_time
+from utils import handle_api_error
+from order_tracker import OrderTracker
+from instrument_cache import InstrumentCache
+from instrumentation import metrics
 
 class Execution:
-    def __init__(self, exchange, config):
+    def __init__(self, exchange, config, order_tracker=None, instruments=None):
         self.exchange = exchange
         self.config = config
         self.max_retries = 5
         self.retry_delay = 60
+        self.order_tracker = order_tracker or OrderTracker(
+            exchange, retention=config.get('execution', {}).get('order_retention', 1000))
+        self.instruments = instruments or InstrumentCache(exchange)
+        self.bracket_orders = config.get('execution', {}).get('bracket_orders', True)
 
     async def place_order(self, symbol: str, side: str, qty: float, price: float, stop_loss: float, take_profit: float) -> Dict[str, Any]:
+        await self.instruments.get(symbol)
+        qty = self.instruments.round_amount(symbol, qty)
+        stop_loss = self.instruments.round_price(symbol, stop_loss)
+        take_profit = self.instruments.round_price(symbol, take_profit)
+        if not await self.instruments.meets_minimums(symbol, qty, price):
+            logging.warning(f"Order for {symbol} ({qty} @ {price}) is below the instrument minimums, skipping")
+            metrics.increment('order_rejections_total', reason='below_minimums')
+            return None
+
         for attempt in range(self.max_retries):
             try:
-                server_time = get_server_time(self.exchange)
-                if not server_time:
-                    logging.warning(f"Attempt {attempt + 1}: Failed to get server time. Retrying...")
-                    time.sleep(self.retry_delay)
-                    continue
-
-                #  leverage
+                #  leverage (only sent when it changed)
                 leverage = self.config['risk_management']['leverage']
-                await self.exchange.set_leverage(leverage, symbol)
+                await self.instruments.ensure_leverage(symbol, leverage)
+
+                if self.bracket_orders:
+                    return await self._place_bracket_order(symbol, side, qty, stop_loss, take_profit)
 
                 #  main order
-                order = await self.exchange.create_order(symbol, 'market', side, qty)
+                order = self.order_tracker.track(await self.exchange.create_order(symbol, 'market', side, qty))
                 logging.info(f"Main order placed successfully: {order}")
 
                 # stop loss order
@@ -41,11 +55,8 @@ class Execution:
                 )
                 logging.info(f"Take profit order placed: {take_profit_order}")
 
-                # delay to allow order processing
-                time.sleep(5)  # delay if necessary
-
-                # fetch the order status
-                order_status = await self._fetch_order_status(order['id'], symbol)
+                # wait for the fill event (falls back to REST reconciliation on timeout)
+                order_status = await self.order_tracker.wait_for(order['id'], symbol)
                 logging.info(f"Fetched order status: {order_status}")
 
                 return {
@@ -55,40 +66,36 @@ class Execution:
                 }
 
             except Exception as e:
+                if isinstance(e, (ccxt.InvalidOrder, ccxt.InsufficientFunds)):
+                    metrics.increment('order_rejections_total', reason=type(e).__name__)
                 handle_api_error(e)
                 logging.error(f"Attempt {attempt + 1}: Error placing order for {symbol}. Error: {e}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    metrics.increment('retries_total', operation='place_order')
+                    await asyncio.sleep(self.retry_delay)
                 else:
                     logging.critical("Max retries reached. Raising exception.")
                     raise
 
-    async def _fetch_order_status(self, order_id: str, symbol: str) -> Dict[str, Any]:
-        """Fetch the complete status of the order using the appropriate method."""
-        try:
-            # fetch open orders and check if the order is among them
-            open_orders = await self.exchange.fetch_open_orders(symbol)
-            logging.debug(f"Open orders: {open_orders}")
-            order_status = next((order for order in open_orders if order['id'] == order_id), None)
-
-            # if not found in open orders, fetch closed orders
-            if not order_status:
-                closed_orders = await self.exchange.fetch_closed_orders(symbol)
-                logging.debug(f"Closed orders: {closed_orders}")
-                order_status = next((order for order in closed_orders if order['id'] == order_id), None)
-
-            if not order_status:
-                logging.warning(f"Order ID {order_id} not found in open or closed orders.")
-            else:
-                logging.debug(f"Order status details - ID: {order_status.get('id')}, Symbol: {order_status.get('symbol')}, "
-                              f"Price: {order_status.get('price')}, Amount: {order_status.get('amount')}, "
-                              f"Status: {order_status.get('status')}")
-
-            return order_status
-
-        except Exception as e:
-            logging.error(f"Error fetching order status for ID {order_id}: {e}")
-            raise
+    async def _place_bracket_order(self, symbol: str, side: str, qty: float, stop_loss: float,
+                                   take_profit: float) -> Dict[str, Any]:
+        """Entry with stop loss and take profit attached, submitted in a single request."""
+        params = {
+            'stopLoss': {'triggerPrice': stop_loss},
+            'takeProfit': {'triggerPrice': take_profit},
+        }
+        order = self.order_tracker.track(await self.exchange.create_order(symbol, 'market', side, qty, None, params))
+        logging.info(f"Bracket order placed successfully: {order}")
+
+        order_status = await self.order_tracker.wait_for(order['id'], symbol)
+        logging.info(f"Fetched order status: {order_status}")
+
+        # stop loss and take profit are attached to the position, not separate orders
+        return {
+            'main_order': order_status,
+            'stop_loss_order': None,
+            'take_profit_order': None
+        }
 
     async def close_position(self, symbol: str, position_size: float) -> Dict[str, Any]:
         """Close an existing position."""
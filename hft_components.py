@@ -1,44 +1,91 @@
+import asyncio
+import time
 import numpy as np
 from collections import deque
+from utils import RingBuffer
+from instrumentation import metrics
 
 
 class OrderBookAnalyzer:
-    def __init__(self, depth=10):
+    """Order book liquidity, slope and top-of-book momentum per symbol.
+
+    Books are handled as (symbols x depth) arrays, so ``analyze_order_books``
+    processes every book of a cycle in one vectorized pass; slopes use the
+    closed-form least-squares estimate instead of ``np.polyfit``. Best bid/ask
+    history is kept in a fixed-size ring buffer per symbol.
+    """
+
+    def __init__(self, depth=10, history=100):
         self.depth = depth
-        self.bid_history = deque(maxlen=100)
-        self.ask_history = deque(maxlen=100)
+        self.history = history
+        self.bid_history = {}
+        self.ask_history = {}
+
+    def analyze_order_book(self, order_book, symbol=None):
+        symbol = symbol or order_book.get('symbol')
+        return self.analyze_order_books({symbol: order_book})[symbol]
 
-    def analyze_order_book(self, order_book):
-        bids = order_book['bids'][:self.depth]
-        asks = order_book['asks'][:self.depth]
+    def analyze_order_books(self, order_books):
+        symbols = list(order_books)
+        bids = self._stack([order_books[symbol]['bids'] for symbol in symbols])
+        asks = self._stack([order_books[symbol]['asks'] for symbol in symbols])
 
-        bid_liquidity = sum(bid[1] for bid in bids)
-        ask_liquidity = sum(ask[1] for ask in asks)
+        bid_liquidity = np.nansum(bids[:, :, 1], axis=1)
+        ask_liquidity = np.nansum(asks[:, :, 1], axis=1)
+        best_bids = bids[:, 0, 0]
+        best_asks = asks[:, 0, 0]
+        spreads = best_asks - best_bids
+        bid_slopes = self.calculate_slope(bids)
+        ask_slopes = self.calculate_slope(asks)
 
-        self.bid_history.append(bids[0][0])
-        self.ask_history.append(asks[0][0])
+        results = {}
+        for i, symbol in enumerate(symbols):
+            bid_history = self._history(self.bid_history, symbol)
+            ask_history = self._history(self.ask_history, symbol)
+            bid_history.append(best_bids[i])
+            ask_history.append(best_asks[i])
+            results[symbol] = {
+                'bid_liquidity': bid_liquidity[i],
+                'ask_liquidity': ask_liquidity[i],
+                'spread': spreads[i],
+                'bid_slope': bid_slopes[i],
+                'ask_slope': ask_slopes[i],
+                'bid_momentum': self.calculate_momentum(bid_history),
+                'ask_momentum': self.calculate_momentum(ask_history)
+            }
+        return results
 
-        spread = asks[0][0] - bids[0][0]
+    def _stack(self, sides):
+        """List of [[price, amount], ...] sides -> (books, depth, 2) array padded with NaN."""
+        levels = np.full((len(sides), self.depth, 2), np.nan)
+        for i, side in enumerate(sides):
+            side = np.asarray(side[:self.depth], dtype=np.float64)
+            if len(side):
+                levels[i, :len(side)] = side[:, :2]
+        return levels
 
-        return {
-            'bid_liquidity': bid_liquidity,
-            'ask_liquidity': ask_liquidity,
-            'spread': spread,
-            'bid_slope': self.calculate_slope(bids),
-            'ask_slope': self.calculate_slope(asks),
-            'bid_momentum': self.calculate_momentum(self.bid_history),
-            'ask_momentum': self.calculate_momentum(self.ask_history)
-        }
+    def _history(self, histories, symbol):
+        if symbol not in histories:
+            histories[symbol] = RingBuffer(self.history)
+        return histories[symbol]
 
     def calculate_slope(self, levels):
-        prices = [level[0] for level in levels]
-        quantities = [level[1] for level in levels]
-        return np.polyfit(prices, quantities, 1)[0]
+        """Least-squares slope of amount against price for each book in a (books, depth, 2) array."""
+        levels = np.asarray(levels, dtype=np.float64)
+        if levels.ndim == 2:
+            return self.calculate_slope(levels[np.newaxis])[0]
+        prices = levels[:, :, 0]
+        quantities = levels[:, :, 1]
+        counts = np.sum(~np.isnan(prices), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            price_dev = prices - np.nansum(prices, axis=1, keepdims=True) / counts[:, np.newaxis]
+            quantity_dev = quantities - np.nansum(quantities, axis=1, keepdims=True) / counts[:, np.newaxis]
+            return np.nansum(price_dev * quantity_dev, axis=1) / np.nansum(price_dev ** 2, axis=1)
 
     def calculate_momentum(self, history):
         if len(history) < 2:
             return 0
-        return (history[-1] - history[0]) / len(history)
+        return (history.last() - history.first()) / len(history)
 
 
 class LatencyOptimizer:
@@ -47,15 +94,17 @@ class LatencyOptimizer:
         self.latencies = deque(maxlen=100)
 
     async def measure_latency(self):
-        start_time = time.time()
-        await self.exchange.fetch_ticker('BTC/USDT')
-        end_time = time.time()
-        latency = end_time - start_time
+        start_time = time.perf_counter()
+        await self.exchange.fetch_time()
+        latency = time.perf_counter() - start_time
         self.latencies.append(latency)
         return latency
 
     def get_average_latency(self):
-        return sum(self.latencies) / len(self.latencies) if self.latencies else None
+        """Mean of the probes, or of every exchange request timed by the metrics registry."""
+        if self.latencies:
+            return sum(self.latencies) / len(self.latencies)
+        return metrics.mean('exchange_request_seconds')
 
     async def optimize_request_timing(self, target_time):
         avg_latency = self.get_average_latency()
@@ -0,0 +1,114 @@
+import logging
+import time
+from collections import deque
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+import aiohttp
+import numpy as np
+
+
+class HTTPTransport:
+    """Shared pooled aiohttp session for exchange REST traffic, with per-request timings.
+
+    Connections are kept alive and reused, DNS lookups are cached and the
+    number of connections per host is capped. Each request records DNS,
+    connect (TCP plus TLS handshake, which aiohttp does not report
+    separately) and time to first byte.
+    """
+
+    def __init__(self, config=None, history=1000):
+        config = config or {}
+        self.limit = config.get('limit', 100)
+        self.limit_per_host = config.get('limit_per_host', 20)
+        self.keepalive_timeout = config.get('keepalive_timeout', 60)
+        self.ttl_dns_cache = config.get('ttl_dns_cache', 300)
+        self.timeout = config.get('timeout', 10)
+        if config.get('http2'):
+            logging.warning("HTTP/2 was requested but aiohttp only speaks HTTP/1.1; using pooled HTTP/1.1")
+        self.timings = deque(maxlen=history)
+        self.session = None
+
+    def create_session(self):
+        if self.session is not None and not self.session.closed:
+            return self.session
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.ttl_dns_cache,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[self._trace_config()],
+        )
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _trace_config(self):
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=lambda trace_request_ctx: SimpleNamespace(
+            start=None, dns=None, connect=None, reused=False, phase_start=None))
+
+        async def on_request_start(session, ctx, params):
+            ctx.start = time.perf_counter()
+
+        async def on_dns_resolvehost_start(session, ctx, params):
+            ctx.phase_start = time.perf_counter()
+
+        async def on_dns_resolvehost_end(session, ctx, params):
+            ctx.dns = time.perf_counter() - ctx.phase_start
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.phase_start = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            ctx.connect = time.perf_counter() - ctx.phase_start
+
+        async def on_connection_reuseconn(session, ctx, params):
+            ctx.reused = True
+
+        async def on_request_end(session, ctx, params):
+            # fires once the response headers are in, i.e. time to first byte
+            self._record(ctx, params.method, params.url, params.response.status)
+
+        async def on_request_exception(session, ctx, params):
+            self._record(ctx, params.method, params.url, None)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+        trace.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    def _record(self, ctx, method, url, status):
+        self.timings.append({
+            'method': method,
+            'path': urlsplit(str(url)).path,
+            'status': status,
+            'dns': ctx.dns,
+            'connect': ctx.connect,
+            'ttfb': time.perf_counter() - ctx.start,
+            'reused': ctx.reused,
+        })
+
+    def summary(self):
+        if not self.timings:
+            return {'requests': 0}
+        ttfb = np.array([timing['ttfb'] for timing in self.timings]) * 1000
+        connects = [timing['connect'] * 1000 for timing in self.timings if timing['connect'] is not None]
+        return {
+            'requests': len(self.timings),
+            'reused_pct': 100 * sum(timing['reused'] for timing in self.timings) / len(self.timings),
+            'ttfb_p50_ms': float(np.percentile(ttfb, 50)),
+            'ttfb_p99_ms': float(np.percentile(ttfb, 99)),
+            'connect_p50_ms': float(np.percentile(connects, 50)) if connects else None,
+        }
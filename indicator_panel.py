@@ -0,0 +1,101 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+SERIES = ['returns', 'atr', 'moving_average', 'chandelier_exit', 'rsi', 'macd']
+FIB_LEVELS = ['0%', '23.6%', '38.2%', '50%', '61.8%', '78.6%', '100%']
+FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
+
+
+def _rolling_mean(x, window):
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    csum = np.zeros((x.shape[0], x.shape[1] + 1))
+    np.cumsum(x, axis=1, out=csum[:, 1:])
+    out[:, window - 1:] = (csum[:, window:] - csum[:, :-window]) / window
+    return out
+
+
+def _rolling_max(x, window):
+    out = np.full(x.shape, np.nan)
+    if x.shape[1] < window:
+        return out
+    out[:, window - 1:] = sliding_window_view(x, window, axis=1).max(axis=-1)
+    return out
+
+
+def _ema(x, span):
+    # y[t] = a * x[t] + (1 - a) * y[t-1] with y[0] = x[0], i.e. ewm(adjust=False)
+    alpha = 2.0 / (span + 1)
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, axis=1, zi=(1.0 - alpha) * x[:, :1])
+    return y
+
+
+class IndicatorPanel:
+    """Indicators for many symbols computed in one NumPy pass over a (symbols x time) array.
+
+    All per-time series live in a single ``values`` array of shape
+    (len(SERIES), symbols, time); ``symbol()`` hands out row views into it.
+    """
+
+    def __init__(self, symbols, ohlcv, atr_period=14, ma_period=50, multiplier=3.0, rsi_period=14):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.ohlcv = ohlcv
+        self.atr_period = atr_period
+        self.ma_period = ma_period
+        self.multiplier = multiplier
+        self.rsi_period = rsi_period
+        self.values = np.full((len(SERIES),) + ohlcv['close'].shape, np.nan)
+        self._compute()
+
+    @classmethod
+    def from_frames(cls, frames, **kwargs):
+        """Build a panel from a dict of per-symbol OHLCV DataFrames, aligned on their last rows."""
+        length = min(len(df) for df in frames.values())
+        ohlcv = {field: np.stack([df[field].values[-length:] for df in frames.values()]).astype(np.float64)
+                 for field in FIELDS}
+        return cls(frames.keys(), ohlcv, **kwargs)
+
+    def _compute(self):
+        high, low, close = self.ohlcv['high'], self.ohlcv['low'], self.ohlcv['close']
+        returns, atr, moving_average, chandelier, rsi, macd = self.values
+
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+        self.volatility = np.nanstd(returns, axis=1, ddof=1)
+
+        true_range = high - low
+        prev_close = close[:, :-1]
+        np.maximum(true_range[:, 1:], np.abs(high[:, 1:] - prev_close), out=true_range[:, 1:])
+        np.maximum(true_range[:, 1:], np.abs(low[:, 1:] - prev_close), out=true_range[:, 1:])
+        atr[:] = _rolling_mean(true_range, self.atr_period)
+
+        moving_average[:] = _rolling_mean(close, self.ma_period)
+        chandelier[:] = _rolling_max(high, self.atr_period) - atr * self.multiplier
+
+        delta = np.zeros_like(close)
+        delta[:, 1:] = np.diff(close, axis=1)
+        gain = _rolling_mean(np.maximum(delta, 0), self.rsi_period)
+        loss = _rolling_mean(np.maximum(-delta, 0), self.rsi_period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi[:] = 100 - 100 / (1 + gain / loss)
+
+        macd_line = _ema(close, 12) - _ema(close, 26)
+        macd[:] = macd_line - _ema(macd_line, 9)
+
+        highest = close.max(axis=1, keepdims=True)
+        lowest = close.min(axis=1, keepdims=True)
+        self.fibonacci = highest - FIB_RATIOS * (highest - lowest)
+
+    def symbol(self, symbol):
+        i = self.index[symbol]
+        result = {name: self.values[k, i] for k, name in enumerate(SERIES)}
+        result['volatility'] = self.volatility[i]
+        result['fibonacci'] = dict(zip(FIB_LEVELS, self.fibonacci[i]))
+        return result
+
+    def latest(self, name):
+        """Last value of one series for every symbol, as a (symbols,) view."""
+        return self.values[SERIES.index(name), :, -1]
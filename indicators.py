@@ -1,6 +1,28 @@
 import pandas as pd
+from streaming_indicators import IndicatorEngine
+from indicator_panel import IndicatorPanel
 
 class Indicators:
+    def __init__(self):
+        self.engines = {}
+
+    def latest(self, symbol, df, atr_period=14, ma_period=50, multiplier=3.0):
+        """Latest ATR, moving average, chandelier exit, RSI and MACD for ``symbol``.
+
+        Backed by a per-symbol IndicatorEngine, so only candles that arrived
+        since the previous call are processed.
+        """
+        engine = self.engines.get(symbol)
+        if engine is None or engine.params[:3] != (atr_period, ma_period, multiplier):
+            engine = self.engines[symbol] = IndicatorEngine(atr_period, ma_period, multiplier)
+        return engine.update(df)
+
+    @staticmethod
+    def panel(frames, atr_period=14, ma_period=50, multiplier=3.0):
+        """Compute indicators for a dict of symbol -> DataFrame in one vectorized pass."""
+        return IndicatorPanel.from_frames(frames, atr_period=atr_period, ma_period=ma_period,
+                                          multiplier=multiplier)
+
     @staticmethod
     def calculate_atr(df, period=14):
         high_low = df['high'] - df['low']
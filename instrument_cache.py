@@ -0,0 +1,76 @@
+import logging
+import time
+import ccxt
+
+# Bybit answers set_leverage with this code when the leverage is already the requested value
+LEVERAGE_NOT_MODIFIED = '110043'
+
+
+class InstrumentCache:
+    """Per-symbol instrument and account metadata, loaded once and refreshed on change.
+
+    Holds tick size, lot size, minimum amount and minimum notional from the
+    market definitions, plus the leverage currently set per symbol, so order
+    placement does not have to ask the exchange again.
+    """
+
+    def __init__(self, exchange, refresh_interval=86400):
+        self.exchange = exchange
+        self.refresh_interval = refresh_interval
+        self.instruments = {}
+        self.leverage = {}
+        self.loaded_at = None
+
+    async def load(self, reload=False):
+        markets = await self.exchange.load_markets(reload)
+        for symbol, market in markets.items():
+            limits = market.get('limits', {})
+            self.instruments[symbol] = {
+                'tick_size': market.get('precision', {}).get('price'),
+                'lot_size': market.get('precision', {}).get('amount'),
+                'min_amount': limits.get('amount', {}).get('min'),
+                'min_notional': limits.get('cost', {}).get('min'),
+                'max_leverage': limits.get('leverage', {}).get('max'),
+            }
+        self.loaded_at = time.time()
+
+        try:
+            for position in await self.exchange.fetch_positions():
+                if position.get('leverage'):
+                    self.leverage[position['symbol']] = float(position['leverage'])
+        except Exception as e:
+            logging.warning(f"Could not load current leverage from positions: {e}")
+        logging.info(f"Loaded metadata for {len(self.instruments)} instruments")
+
+    async def get(self, symbol):
+        if self.loaded_at is None or time.time() - self.loaded_at >= self.refresh_interval \
+                or symbol not in self.instruments:
+            await self.load(reload=self.loaded_at is not None)
+        return self.instruments[symbol]
+
+    async def ensure_leverage(self, symbol, leverage):
+        """Set leverage only when it differs from the cached value."""
+        if self.leverage.get(symbol) == float(leverage):
+            return False
+        try:
+            await self.exchange.set_leverage(leverage, symbol)
+        except ccxt.ExchangeError as e:
+            if LEVERAGE_NOT_MODIFIED not in str(e):
+                self.leverage.pop(symbol, None)
+                raise
+        self.leverage[symbol] = float(leverage)
+        return True
+
+    def round_amount(self, symbol, amount):
+        return float(self.exchange.amount_to_precision(symbol, amount))
+
+    def round_price(self, symbol, price):
+        return float(self.exchange.price_to_precision(symbol, price))
+
+    async def meets_minimums(self, symbol, amount, price):
+        instrument = await self.get(symbol)
+        if instrument['min_amount'] and amount < instrument['min_amount']:
+            return False
+        if instrument['min_notional'] and amount * price < instrument['min_notional']:
+            return False
+        return True
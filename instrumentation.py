@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import math
+import time
+from aiohttp import web
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class LatencyHistogram:
+    """HDR-style histogram with a fixed relative error over a wide value range.
+
+    Each power of two between ``lowest`` and ``highest`` seconds is split
+    into ``sub_buckets`` linear buckets, so recording is one ``frexp`` and a
+    list increment and quantiles are accurate to about 1/sub_buckets.
+    """
+
+    def __init__(self, lowest=1e-6, highest=120.0, sub_buckets=128):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self.octaves = math.ceil(math.log2(highest / lowest))
+        self.counts = [0] * (self.octaves * sub_buckets + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if value <= self.lowest:
+            self.counts[0] += 1
+            return
+        mantissa, exponent = math.frexp(value / self.lowest)
+        index = (exponent - 1) * self.sub_buckets + int((mantissa * 2 - 1) * self.sub_buckets) + 1
+        self.counts[min(index, len(self.counts) - 1)] += 1
+
+    def _upper_bound(self, index):
+        if index == 0:
+            return self.lowest
+        octave, sub_bucket = divmod(index - 1, self.sub_buckets)
+        return self.lowest * 2 ** octave * (1 + (sub_bucket + 1) / self.sub_buckets)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return float('nan')
+        target = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+
+class _Span:
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.record(time.perf_counter() - self.started)
+        return False
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Metrics:
+    """Process-wide counters, gauges and latency histograms, rendered in Prometheus text format.
+
+    Series are keyed by metric name and a sorted tuple of label pairs.
+    Collectors registered with ``add_collector`` are polled at scrape time,
+    so components that already keep their own statistics are not touched on
+    the hot path.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.collectors = []
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def histogram(self, name, **labels):
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        return histogram
+
+    def span(self, name, **labels):
+        """Context manager recording the duration of its block in seconds."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self.histogram(name, **labels))
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self.histogram(name, **labels).record(seconds)
+
+    def increment(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        self.gauges[self._key(name, labels)] = value
+
+    def add_collector(self, prefix, collect):
+        """Poll ``collect()`` at scrape time and export its numeric values as ``prefix_<key>`` gauges."""
+        self.collectors.append((prefix, collect))
+
+    def mean(self, name):
+        histograms = [histogram for (metric, _), histogram in self.histograms.items() if metric == name]
+        count = sum(histogram.count for histogram in histograms)
+        return sum(histogram.total for histogram in histograms) / count if count else None
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+    def render(self):
+        lines = []
+        for prefix, collect in self.collectors:
+            try:
+                values = collect()
+            except Exception as e:
+                logging.warning(f"Metrics collector {prefix} failed: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.gauges[self._key(f"{prefix}_{key}", {})] = value
+
+        for kind, series in (('counter', self.counters), ('gauge', self.gauges)):
+            seen = set()
+            for (name, labels), value in sorted(series.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} {kind}")
+                    seen.add(name)
+                lines.append(f"{name}{self._labels(labels)} {value}")
+
+        seen = set()
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            if name not in seen:
+                lines.append(f"# TYPE {name} summary")
+                seen.add(name)
+            for q in QUANTILES:
+                lines.append(f"{name}{self._labels(labels, [('quantile', q)])} {histogram.quantile(q)}")
+            lines.append(f"{name}_sum{self._labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class EventLoopMonitor:
+    """Measures how late the event loop wakes a task that sleeps ``interval`` seconds."""
+
+    def __init__(self, interval=0.1, registry=metrics):
+        self.interval = interval
+        self.registry = registry
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.registry.observe('event_loop_lag_seconds', lag)
+            self.registry.set_gauge('event_loop_lag_last_seconds', lag)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class MetricsServer:
+    """Serves ``registry.render()`` at /metrics for a Prometheus scraper."""
+
+    def __init__(self, host='127.0.0.1', port=9100, registry=metrics):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(body=self.registry.render().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logging.info(f"Metrics served on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
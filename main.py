@@ -1,18 +1,30 @@
 import asyncio
+import inspect
 import logging
-from typing import Dict, List
-import aiohttp
+from typing import Dict, List, Optional
 from data_fetcher import DataFetcher
-from strategy import MultiStrategyManager
+from strategy import Strategy, MultiStrategyManager
 from risk_management import DynamicRiskManagement
 from execution import Execution
+from instrument_cache import InstrumentCache
 from advanced_order_types import AdvancedOrderTypes
-from utils import setup_logging, initialize_exchange, load_config, sync_time
+from utils import setup_logging, initialize_exchange, load_config
+from rate_limiter import RateLimitedExchange, RequestScheduler
+from http_transport import HTTPTransport
+from clock_sync import ClockSync
+from exchange_simulator import SimulatedExchange
 from ml_predictor import EnhancedMLPredictor
-from hft_components import OrderBookAnalyzer, LatencyOptimizer
+from hft_components import OrderBookAnalyzer
 from market_regime_detector import MarketRegimeDetector
 from smart_execution import SmartExecutionAlgorithm
 from performance_analytics import PerformanceAnalytics
+from market_stream import MarketDataStream, PrivateStream
+from training_service import ModelTrainingScheduler
+from batch_inference import InferenceBatcher
+from instrumentation import metrics, EventLoopMonitor, MetricsServer
+from symbol_scheduler import SymbolScheduler
+from cpu_offload import AnalyticsPool, OffloadedRegimeDetector
+from correlation_engine import CorrelationEngine
 
 
 async def process_symbol(
@@ -22,31 +34,53 @@ async def process_symbol(
         risk_management: DynamicRiskManagement,
         execution: Execution,
         advanced_order_types: AdvancedOrderTypes,
-        ml_predictor: EnhancedMLPredictor,
+        inference_batcher: InferenceBatcher,
+        training_scheduler: ModelTrainingScheduler,
         order_book_analyzer: OrderBookAnalyzer,
         market_regime_detector: MarketRegimeDetector,
         performance_analytics: PerformanceAnalytics,
         current_positions: Dict[str, Dict],
-        correlation_matrix: Dict[str, Dict[str, float]]
+        correlation_matrix: Optional[Dict[str, Dict[str, float]]],
+        scheduler: SymbolScheduler = None
 ) -> None:
+    # without a scheduler, stages are unbounded
+    scheduler = scheduler or SymbolScheduler((), 1)
     try:
-        df = await data_fetcher.fetch_historical_data(symbol)
+        with metrics.span('process_symbol_stage_seconds', stage='fetch_ohlcv'):
+            async with scheduler.stage('market_data'):
+                df = await data_fetcher.fetch_historical_data(symbol)
         if df.empty:
             logging.warning(f"No data available for {symbol}, skipping...")
             return
 
-        regime, regime_probs = market_regime_detector.detect_regime(df['close'])
+        with metrics.span('process_symbol_stage_seconds', stage='regime'):
+            regime = market_regime_detector.detect_regime(df['close'], symbol)
+            if inspect.isawaitable(regime):
+                regime = await regime
+            regime, regime_probs = regime
         logging.info(f"Current market regime for {symbol}: {market_regime_detector.regime_description(regime)}")
 
-        order_book = await data_fetcher.exchange.fetch_order_book(symbol)
-        order_book_analysis = order_book_analyzer.analyze_order_book(order_book)
+        with metrics.span('process_symbol_stage_seconds', stage='fetch_order_book'):
+            async with scheduler.stage('market_data'):
+                order_book = await data_fetcher.fetch_order_book(symbol)
+        with metrics.span('process_symbol_stage_seconds', stage='order_book_analysis'):
+            order_book_analysis = order_book_analyzer.analyze_order_book(order_book, symbol)
 
-        ml_predictor.train(df)
-        ml_prediction = ml_predictor.predict(df)
+        ml_prediction = None
+        if inference_batcher is not None:
+            with metrics.span('process_symbol_stage_seconds', stage='ml_predict'):
+                training_scheduler.maybe_schedule(symbol, df)
+                ml_prediction = await inference_batcher.predict(symbol, df)
 
-        signals = multi_strategy_manager.get_signals(df, order_book_analysis, ml_prediction, regime)
+        with metrics.span('process_symbol_stage_seconds', stage='signals'):
+            signals = multi_strategy_manager.get_signals(df, order_book_analysis, None, ml_prediction, regime)
 
+        execution_config = execution.config.get('execution', {})
+        window = execution_config.get('adaptive_window', 300)
+        interval = execution_config.get('adaptive_interval', 60)
         for strategy, signal in signals.items():
+            if not signal:
+                continue
             if signal['action'] in ['buy', 'sell']:
                 entry_price = df['close'].iloc[-1]
                 stop_loss_price = signal['stop_loss']
@@ -59,37 +93,57 @@ async def process_symbol(
                                                                        correlation_matrix)
 
                 if position_size > 0:
-                    smart_execution = SmartExecutionAlgorithm(data_fetcher.exchange, symbol, position_size, 300)
-                    order = await smart_execution.adaptive_execution(signal['action'], entry_price, stop_loss_price,
-                                                                     take_profit_price)
+                    smart_execution = SmartExecutionAlgorithm(data_fetcher.exchange, symbol, position_size, window,
+                                                              interval)
+                    with metrics.span('process_symbol_stage_seconds', stage='execution'):
+                        async with scheduler.stage('execution', symbol, protect=True):
+                            order = await smart_execution.adaptive_execution(signal['action'])
 
-                    if order:
-                        current_positions[symbol] = {
-                            'strategy': strategy,
-                            'size': position_size,
-                            'entry_price': entry_price,
-                            'stop_loss': stop_loss_price,
-                            'take_profit': take_profit_price
-                        }
+                            if order:
+                                current_positions[symbol] = {
+                                    'strategy': strategy,
+                                    'side': signal['action'],
+                                    'size': position_size,
+                                    'entry_price': entry_price,
+                                    'stop_loss': stop_loss_price,
+                                    'take_profit': take_profit_price
+                                }
 
+                    if order:
                         logging.info(
                             f"New {signal['action'].upper()} order placed for {symbol} - Entry: {entry_price}, Stop Loss: {stop_loss_price}, Take Profit: {take_profit_price}")
 
             elif signal['action'] == 'close' and symbol in current_positions:
                 close_execution = SmartExecutionAlgorithm(data_fetcher.exchange, symbol,
-                                                          current_positions[symbol]['size'], 300)
-                await close_execution.adaptive_execution('close')
-                del current_positions[symbol]
+                                                          current_positions[symbol]['size'], window, interval)
+                close_side = 'buy' if current_positions[symbol].get('side') == 'sell' else 'sell'
+                with metrics.span('process_symbol_stage_seconds', stage='execution'):
+                    async with scheduler.stage('execution', symbol, protect=True):
+                        await close_execution.adaptive_execution(close_side, reduce_only=True)
+                        position = current_positions.pop(symbol)
+                exit_price = df['close'].iloc[-1]
+                direction = -1 if position.get('side') == 'sell' else 1
+                performance_analytics.record_trade({
+                    'symbol': symbol,
+                    'strategy': position['strategy'],
+                    'side': position.get('side'),
+                    'entry_price': position['entry_price'],
+                    'exit_price': exit_price,
+                    'size': position['size'],
+                    'profit': direction * position['size'] * (exit_price - position['entry_price']),
+                })
                 logging.info(f"Position closed for {symbol}")
 
-        performance_analytics.update(current_positions, df)
-        risk_management.update_risk_parameters(df['close'].pct_change().std())
-
-        volatility_list = [df['close'].pct_change().std() for _ in current_positions]
-        var = risk_management.calculate_var(current_positions, volatility_list)
+        with metrics.span('process_symbol_stage_seconds', stage='analytics'):
+            performance_analytics.update_price(symbol, df['close'].iloc[-1])
+        with metrics.span('process_symbol_stage_seconds', stage='risk'):
+            risk_management.observe(symbol, df['close'])
+            risk_management.update_risk_parameters(df['close'].pct_change().std())
+            var = risk_management.calculate_var(current_positions)
         logging.info(f"Current Value at Risk for {symbol}: {var}")
 
     except Exception as e:
+        metrics.increment('process_symbol_errors_total')
         logging.error(f"Error processing {symbol}: {e}", exc_info=True)
 
 
@@ -97,52 +151,130 @@ async def main():
     config = load_config('config.yaml')
     setup_logging(config['logging']['level'])
 
-    exchange = initialize_exchange(config)
-    max_sync_attempts = 5
-    for attempt in range(max_sync_attempts):
-        time_offset = sync_time(exchange)
-        if time_offset is not None:
-            exchange.options['adjustForTimeDifference'] = True
-            break
-        logging.warning(f"Time sync attempt {attempt + 1} failed. Retrying...")
-        await asyncio.sleep(5)
-
-    if time_offset is None:
+    instrumentation_config = config.get('instrumentation', {})
+    metrics.enabled = instrumentation_config.get('enabled', True)
+
+    transport = HTTPTransport(config['exchange'].get('http', {}))
+    paper_config = config.get('paper_trading', {})
+    if paper_config.get('enabled'):
+        client = SimulatedExchange.from_config(config['trading']['symbols'], paper_config)
+        client.start()
+    else:
+        client = initialize_exchange(config, transport)
+    exchange = RateLimitedExchange(client, RequestScheduler.from_config(config['exchange']))
+    # samples go straight to the client: time spent queued in the scheduler would skew the round trips
+    time_config = config['time_synchronization']
+    clock = ClockSync.from_config(client, time_config)
+    if await clock.sync(time_config.get('max_attempts', 5)) is None:
         logging.error("Failed to synchronize time with the exchange. Exiting.")
+        await exchange.close()
+        await transport.close()
         return
+    clock.attach()
+    clock.start()
 
-    data_fetcher = DataFetcher(exchange, config['data_fetcher'])
-    multi_strategy_manager = MultiStrategyManager(config['strategy'])
-    risk_management = DynamicRiskManagement(config['risk_management'])
-    execution = Execution(exchange, config)
+    data_config = config['data_fetcher']
+    if paper_config.get('enabled'):
+        # simulated candles must not end up in the cache that backtests read
+        data_config = dict(data_config, cache_dir=None)
+    data_fetcher = DataFetcher(exchange, data_config)
+    stream_config = config.get('market_stream', {})
+    # the simulator has no websocket feeds; its fills reach the tracker directly
+    if stream_config.get('enabled') and not paper_config.get('enabled'):
+        market_stream = MarketDataStream(config['trading']['symbols'], stream_config,
+                                         config['data_fetcher']['timeframe'])
+        data_fetcher.attach_stream(market_stream)
+        await market_stream.start()
+    capital_allocation = config['strategy']['capital_allocation']
+    multi_strategy_manager = MultiStrategyManager(
+        [Strategy(config['strategy'], strategy_type) for strategy_type in capital_allocation],
+        capital_allocation)
+    correlation_engine = CorrelationEngine.from_config(config['trading']['symbols'], config['correlation'])
+    risk_management = DynamicRiskManagement(config['risk_management'], correlation_engine)
+    instruments = InstrumentCache(exchange)
+    await instruments.load()
+    execution = Execution(exchange, config, instruments=instruments)
+    if paper_config.get('enabled'):
+        execution.order_tracker.attach(client)
+    elif config.get('order_stream', {}).get('enabled'):
+        order_stream = PrivateStream(config['trading']['symbols'], config['order_stream'],
+                                     config['exchange']['api_key'], config['exchange']['secret'])
+        execution.order_tracker.attach(order_stream)
+        await order_stream.start()
     advanced_order_types = AdvancedOrderTypes(exchange)
-    ml_predictor = EnhancedMLPredictor()
-    order_book_analyzer = OrderBookAnalyzer()
-    latency_optimizer = LatencyOptimizer(exchange)
-    market_regime_detector = MarketRegimeDetector()
-    performance_analytics = PerformanceAnalytics()
+    ml_config = config['ml_predictor']
+    training_scheduler = inference_batcher = None
+    if ml_config.get('enabled', True):
+        ml_predictor = EnhancedMLPredictor(backend=ml_config.get('backend', 'keras'))
+        training_scheduler = ModelTrainingScheduler(ml_predictor, ml_config)
+        inference_batcher = InferenceBatcher(ml_predictor, ml_config.get('batch_window_ms', 5))
+    order_book_analyzer = OrderBookAnalyzer(config['hft_components']['order_book_depth'])
+    regime_config = {'lookback_period': config['market_regime']['lookback_period'],
+                     'update_interval': config['market_regime']['update_interval']}
+    analytics_pool = None
+    if config.get('cpu_offload', {}).get('enabled'):
+        analytics_pool = AnalyticsPool.from_config(config['cpu_offload'])
+        market_regime_detector = OffloadedRegimeDetector(analytics_pool, **regime_config)
+    else:
+        market_regime_detector = MarketRegimeDetector(**regime_config)
+    performance_analytics = PerformanceAnalytics.from_config(config.get('performance_analytics', {}),
+                                                             config['risk_management']['capital'])
 
     current_positions = {}
-    correlation_matrix = {}  
     symbols = config['trading']['symbols']
-    iteration_interval = config['trading']['iteration_interval']
+    scheduler = SymbolScheduler.from_config(symbols, config.get('scheduler', {}),
+                                            config['trading']['iteration_interval'], clock)
+    if training_scheduler is not None:
+        await training_scheduler.restore(symbols)
 
-    while True:
-        try:
-            await latency_optimizer.optimize_request_timing(iteration_interval)
+    loop_monitor = metrics_server = None
+    if metrics.enabled:
+        metrics.add_collector('clock', clock.metrics)
+        metrics.add_collector('http', transport.summary)
+        metrics.add_collector('scheduler', scheduler.summary)
+        if inference_batcher is not None:
+            metrics.add_collector('ml_inference', inference_batcher.metrics)
+        loop_monitor = EventLoopMonitor(instrumentation_config.get('loop_lag_interval', 0.1))
+        loop_monitor.start()
+        if instrumentation_config.get('port'):
+            metrics_server = MetricsServer(instrumentation_config.get('host', '127.0.0.1'),
+                                           instrumentation_config['port'])
+            await metrics_server.start()
 
-            tasks = [process_symbol(symbol, data_fetcher, multi_strategy_manager, risk_management, execution,
-                                    advanced_order_types, ml_predictor, order_book_analyzer, market_regime_detector,
-                                    performance_analytics, current_positions, correlation_matrix)
-                     for symbol in symbols]
+    try:
+        while True:
+            try:
+                def process(symbol):
+                    return process_symbol(symbol, data_fetcher, multi_strategy_manager, risk_management, execution,
+                                          advanced_order_types, inference_batcher, training_scheduler,
+                                          order_book_analyzer, market_regime_detector, performance_analytics,
+                                          current_positions, None, scheduler)
 
-            await asyncio.gather(*tasks)
-            metrics = performance_analytics.calculate_metrics()
-            logging.info(f"Performance Summary:\n{metrics}")
+                with metrics.span('cycle_seconds'):
+                    await scheduler.run_cycle(process, priority=set(current_positions))
+                performance_analytics.update(current_positions)
+                with metrics.span('correlation_refresh_seconds'):
+                    correlation_engine.refresh()
+                performance_summary = performance_analytics.calculate_metrics()
+                logging.info(f"Performance Summary:\n{performance_summary}")
+                if inference_batcher is not None:
+                    logging.info(f"ML inference: {inference_batcher.metrics()}")
+                logging.info(f"HTTP transport: {transport.summary()}")
+                logging.info(f"Clock sync: {clock.metrics()}")
 
-        except Exception as e:
-            logging.error(f"Error in main loop: {e}", exc_info=True)
-        await asyncio.sleep(iteration_interval)
+            except Exception as e:
+                logging.error(f"Error in main loop: {e}", exc_info=True)
+            await scheduler.wait_for_boundary()
+    finally:
+        if loop_monitor is not None:
+            await loop_monitor.stop()
+        if metrics_server is not None:
+            await metrics_server.stop()
+        await clock.stop()
+        if analytics_pool is not None:
+            analytics_pool.close()
+        await exchange.close()
+        await transport.close()
 
 
 if __name__ == "__main__":
@@ -1,33 +1,89 @@
+import time
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.special import logsumexp
 from sklearn.mixture import GaussianMixture
 
 
 class MarketRegimeDetector:
-    def __init__(self, n_regimes=3, lookback_period=100):
+    """Per-symbol Gaussian mixture regime models.
+
+    Each symbol keeps its own fitted mixture. It is refit (warm-started from
+    the previous parameters) only every ``update_interval`` seconds or when
+    the recent observations drift away from it; in between, classification is
+    a closed-form density evaluation against the cached parameters. Regimes
+    are numbered by increasing return variance, so labels stay stable across
+    refits and line up with ``regime_description``.
+    """
+
+    def __init__(self, n_regimes=3, lookback_period=100, update_interval=3600, volatility_window=10,
+                 drift_window=10, drift_threshold=3.0):
         self.n_regimes = n_regimes
         self.lookback_period = lookback_period
-        self.gmm = GaussianMixture(n_components=n_regimes, random_state=42)
+        self.update_interval = update_interval
+        self.volatility_window = volatility_window
+        self.drift_window = drift_window
+        self.drift_threshold = drift_threshold
+        self.models = {}
+
+    def _features(self, price_data):
+        prices = np.asarray(price_data, dtype=np.float64)[-self.lookback_period:]
+        returns = np.diff(np.log(prices))
+        # rolling volatility, annualized, aligned with the return that closes each window
+        volatility = sliding_window_view(returns, self.volatility_window).std(axis=-1) * np.sqrt(252)
+        return np.column_stack((returns[self.volatility_window - 1:], volatility))
+
+    def _fit(self, state, features):
+        gmm = state.get('gmm') or GaussianMixture(n_components=self.n_regimes, random_state=42, warm_start=True)
+        gmm.fit(features)
+
+        order = np.argsort(gmm.covariances_[:, 0, 0])
+        state.update({
+            'gmm': gmm,
+            'weights': gmm.weights_[order],
+            'means': gmm.means_[order],
+            'covariances': gmm.covariances_[order],
+            'precisions_cholesky': gmm.precisions_cholesky_[order],
+            'fit_score': gmm.score(features),
+            'fitted_at': time.time(),
+        })
 
-    def detect_regime(self, price_data):
-        returns = np.diff(np.log(price_data[-self.lookback_period:]))
-        volatility = np.std(returns) * np.sqrt(252)  # Annualized volatility
+    def _log_likelihoods(self, state, X):
+        """Per-sample log-likelihood and regime log-responsibilities under the cached mixture."""
+        precisions_cholesky = state['precisions_cholesky']
+        n_features = X.shape[1]
+        diff = X[:, np.newaxis, :] - state['means'][np.newaxis]
+        y = np.einsum('nkd,kde->nke', diff, precisions_cholesky)
+        log_det = np.log(np.diagonal(precisions_cholesky, axis1=1, axis2=2)).sum(axis=1)
+        log_prob = -0.5 * (n_features * np.log(2 * np.pi) + (y ** 2).sum(axis=-1)) + log_det
+        weighted = log_prob + np.log(state['weights'])
+        log_norm = logsumexp(weighted, axis=1)
+        return log_norm, weighted - log_norm[:, np.newaxis]
 
-        features = np.column_stack((returns, volatility))
-        self.gmm.fit(features)
+    def _needs_refit(self, state, features):
+        if 'gmm' not in state:
+            return True
+        if time.time() - state['fitted_at'] >= self.update_interval:
+            return True
+        recent_score, _ = self._log_likelihoods(state, features[-self.drift_window:])
+        return recent_score.mean() < state['fit_score'] - self.drift_threshold
 
-        current_features = np.array([[returns[-1], volatility]])
-        current_regime = self.gmm.predict(current_features)[0]
+    def detect_regime(self, price_data, symbol=None):
+        features = self._features(price_data)
+        state = self.models.setdefault(symbol, {})
+        if self._needs_refit(state, features):
+            self._fit(state, features)
 
-        regime_probabilities = self.gmm.predict_proba(current_features)[0]
+        _, log_resp = self._log_likelihoods(state, features[-1:])
+        regime_probabilities = np.exp(log_resp[0])
+        current_regime = int(np.argmax(regime_probabilities))
 
         return current_regime, regime_probabilities
 
-    def get_regime_parameters(self):
-        means = self.gmm.means_
-        covariances = self.gmm.covariances_
-        weights = self.gmm.weights_
-        return means, covariances, weights
+    def get_regime_parameters(self, symbol=None):
+        state = self.models[symbol]
+        return state['means'], state['covariances'], state['weights']
 
     def regime_description(self, regime):
         descriptions = ['Low Volatility', 'Medium Volatility', 'High Volatility']
-        return descriptions[regime]
\ No newline at end of file
+        return descriptions[regime]
@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+import aiohttp
+
+TIMEFRAME_INTERVALS = {
+    '1m': '1', '3m': '3', '5m': '5', '15m': '15', '30m': '30',
+    '1h': '60', '2h': '120', '4h': '240', '6h': '360', '12h': '720',
+    '1d': 'D', '1w': 'W', '1M': 'M',
+}
+
+# Bybit rejects subscribe requests carrying more than 10 topics
+MAX_TOPICS_PER_REQUEST = 10
+
+
+def to_exchange_symbol(symbol):
+    """'BTC/USDT:USDT' -> 'BTCUSDT'"""
+    base, quote = symbol.split(':')[0].split('/')
+    return base + quote
+
+
+class WebSocketStream:
+    """Reconnecting Bybit WebSocket connections that fan parsed updates out to queues.
+
+    Symbols are spread over sockets of ``symbols_per_connection``; each socket
+    reconnects with exponential backoff and sends its topics again.
+    Subclasses name their ``channels`` and implement ``topics_for`` and
+    ``_handle_message``; updates they ``_publish`` reach every queue handed
+    out by ``subscribe`` for that channel.
+    """
+
+    name = 'Stream'
+    channels = ()
+
+    def __init__(self, symbols, config, url, symbols_per_connection):
+        self.url = config.get('url', url)
+        self.symbols_per_connection = symbols_per_connection
+        self.ping_interval = config.get('ping_interval', 20)
+        self.reconnect_delay = config.get('reconnect_delay', 1)
+        self.max_reconnect_delay = config.get('max_reconnect_delay', 60)
+        self.queue_size = config.get('queue_size', 10000)
+        self.symbols = list(symbols)
+        self.symbol_map = {to_exchange_symbol(symbol): symbol for symbol in self.symbols}
+        self.consumers = {channel: [] for channel in self.channels}
+        # bumped on every (re)connect so consumers can tell whether they missed messages
+        self.connection_epochs = {symbol: 0 for symbol in self.symbols}
+        self.connected = set()
+        # per (channel, symbol) counter stamped on every update, so a consumer can tell it lost some on overflow
+        self.sequences = {}
+        self._session = None
+        self._tasks = []
+
+    def subscribe(self, channel):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.consumers[channel].append(queue)
+        return queue
+
+    def is_live(self, symbol):
+        return symbol in self.connected
+
+    def topics_for(self, symbols):
+        raise NotImplementedError
+
+    async def start(self):
+        self._session = aiohttp.ClientSession()
+        for i in range(0, len(self.symbols), self.symbols_per_connection):
+            chunk = self.symbols[i:i + self.symbols_per_connection]
+            self._tasks.append(asyncio.create_task(self._run_connection(chunk)))
+        logging.info(f"{self.name} started: {len(self.symbols)} symbols over {len(self._tasks)} connections")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.connected.clear()
+
+    async def _run_connection(self, symbols):
+        delay = self.reconnect_delay
+        topics = self.topics_for(symbols)
+        while True:
+            try:
+                async with self._session.ws_connect(self.url, heartbeat=None) as ws:
+                    await self._open(ws, topics)
+                    for symbol in symbols:
+                        self.connection_epochs[symbol] += 1
+                        self.connected.add(symbol)
+                    delay = self.reconnect_delay
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                self._handle_message(json.loads(msg.data))
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                    finally:
+                        pinger.cancel()
+                logging.warning(f"{self.name} closed for {len(symbols)} symbols, reconnecting...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"{self.name} error: {e}. Reconnecting in {delay}s...")
+            finally:
+                self.connected.difference_update(symbols)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _open(self, ws, topics):
+        for i in range(0, len(topics), MAX_TOPICS_PER_REQUEST):
+            await ws.send_json({'op': 'subscribe', 'args': topics[i:i + MAX_TOPICS_PER_REQUEST]})
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send_json({'op': 'ping'})
+
+    def _handle_message(self, message):
+        raise NotImplementedError
+
+    def _publish(self, channel, update):
+        key = (channel, update.get('symbol'))
+        self.sequences[key] = update['sequence'] = self.sequences.get(key, 0) + 1
+        for queue in self.consumers[channel]:
+            if queue.full():
+                # a slow consumer loses the oldest update rather than stalling the socket
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+
+class MarketDataStream(WebSocketStream):
+    """Multiplexed Bybit public WebSocket feed for kline and order book topics."""
+
+    name = 'Market data stream'
+    channels = ('kline', 'orderbook')
+
+    def __init__(self, symbols, config, timeframe):
+        super().__init__(symbols, config, 'wss://stream.bybit.com/v5/public/linear',
+                         config.get('symbols_per_connection', 20))
+        self.orderbook_depth = config.get('orderbook_depth', 50)
+        self.interval = TIMEFRAME_INTERVALS[timeframe]
+
+    def topics_for(self, symbols):
+        topics = []
+        for symbol in symbols:
+            exchange_symbol = to_exchange_symbol(symbol)
+            topics.append(f"kline.{self.interval}.{exchange_symbol}")
+            topics.append(f"orderbook.{self.orderbook_depth}.{exchange_symbol}")
+        return topics
+
+    def _handle_message(self, message):
+        if 'op' in message:
+            if message.get('op') == 'subscribe' and not message.get('success', True):
+                logging.error(f"Stream subscription failed: {message.get('ret_msg')}")
+            return
+
+        topic = message.get('topic')
+        if not topic:
+            return
+        channel = topic.split('.')[0]
+        symbol = self.symbol_map.get(topic.split('.')[-1])
+        if symbol is None or channel not in self.consumers:
+            return
+
+        if channel == 'kline':
+            update = {
+                'channel': 'kline',
+                'symbol': symbol,
+                'ts': message.get('ts'),
+                'candles': [[int(k['start']), float(k['open']), float(k['high']), float(k['low']),
+                             float(k['close']), float(k['volume'])] for k in message['data']],
+                'confirmed': [bool(k.get('confirm')) for k in message['data']],
+            }
+        else:
+            data = message['data']
+            update = {
+                'channel': 'orderbook',
+                'symbol': symbol,
+                'type': message.get('type'),
+                'ts': message.get('ts'),
+                'bids': [[float(p), float(q)] for p, q in data.get('b', [])],
+                'asks': [[float(p), float(q)] for p, q in data.get('a', [])],
+                'update_id': data.get('u'),
+                'seq': data.get('seq'),
+            }
+        self._publish(channel, update)
+
+
+ORDER_STATUSES = {
+    'Created': 'open',
+    'New': 'open',
+    'PartiallyFilled': 'open',
+    'Untriggered': 'open',
+    'Triggered': 'open',
+    'Filled': 'closed',
+    'Cancelled': 'canceled',
+    'PartiallyFilledCanceled': 'canceled',
+    'Deactivated': 'canceled',
+    'Rejected': 'rejected',
+}
+
+
+def _optional_float(value):
+    return float(value) if value not in (None, '') else None
+
+
+class PrivateStream(WebSocketStream):
+    """Authenticated Bybit private WebSocket carrying order and execution updates.
+
+    The account's topics are not per symbol, so there is a single socket.
+    Updates are normalized to ccxt-style order dicts (``id``,
+    ``clientOrderId``, ``status``, ``filled``, ...) before being published on
+    the 'order' and 'execution' channels.
+    """
+
+    name = 'Private stream'
+    channels = ('order', 'execution')
+
+    def __init__(self, symbols, config, api_key, secret):
+        super().__init__(symbols, config, 'wss://stream.bybit.com/v5/private', max(len(symbols), 1))
+        self.api_key = api_key
+        self.secret = secret
+
+    def topics_for(self, symbols):
+        return ['order', 'execution']
+
+    async def _open(self, ws, topics):
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(self.secret.encode(), f"GET/realtime{expires}".encode(), hashlib.sha256).hexdigest()
+        await ws.send_json({'op': 'auth', 'args': [self.api_key, expires, signature]})
+        response = await ws.receive_json(timeout=10)
+        if not response.get('success'):
+            raise ConnectionError(f"Private stream authentication failed: {response.get('ret_msg')}")
+        await super()._open(ws, topics)
+
+    def _handle_message(self, message):
+        channel = message.get('topic')
+        if channel not in self.consumers:
+            return
+        for item in message.get('data', []):
+            symbol = self.symbol_map.get(item.get('symbol'), item.get('symbol'))
+            if channel == 'order':
+                update = {
+                    'id': item.get('orderId'),
+                    'clientOrderId': item.get('orderLinkId') or None,
+                    'symbol': symbol,
+                    'type': (item.get('orderType') or '').lower(),
+                    'side': (item.get('side') or '').lower(),
+                    'status': ORDER_STATUSES.get(item.get('orderStatus'), 'open'),
+                    'price': _optional_float(item.get('price')),
+                    'amount': _optional_float(item.get('qty')),
+                    'filled': _optional_float(item.get('cumExecQty')),
+                    'average': _optional_float(item.get('avgPrice')),
+                    'timestamp': int(item['updatedTime']) if item.get('updatedTime') else None,
+                    'info': item,
+                }
+            else:
+                update = {
+                    'id': item.get('execId'),
+                    'order': item.get('orderId'),
+                    'clientOrderId': item.get('orderLinkId') or None,
+                    'symbol': symbol,
+                    'side': (item.get('side') or '').lower(),
+                    'price': _optional_float(item.get('execPrice')),
+                    'amount': _optional_float(item.get('execQty')),
+                    'timestamp': int(item['execTime']) if item.get('execTime') else None,
+                    'info': item,
+                }
+            self._publish(channel, update)
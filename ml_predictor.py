@@ -1,18 +1,60 @@
+import os
+import logging
+import pickle
+import time
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.optimizers import Adam
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy_lstm import NumpyLSTM, export_weights
+
+BACKENDS = ('keras', 'numpy')
+
+
+def sliding_windows(X, lookback):
+    """(rows, features) -> (rows - lookback + 1, lookback, features) strided view, no copy."""
+    return sliding_window_view(X, lookback, axis=0).transpose(0, 2, 1)
+
 
 class EnhancedMLPredictor:
-    def __init__(self, lookback=60, features=['open', 'high', 'low', 'close', 'volume']):
+    """LSTM close-price predictor.
+
+    ``backend`` selects how checkpoints are served: 'keras' loads the full
+    model, 'numpy' runs the exported weights through NumpyLSTM. TensorFlow and
+    scikit-learn are only imported when a Keras model or a scaler is first
+    needed, so the numpy backend never loads them.
+    """
+
+    def __init__(self, lookback=60, features=['open', 'high', 'low', 'close', 'volume'], backend='keras'):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown ML backend '{backend}', expected one of {BACKENDS}")
         self.lookback = lookback
         self.features = features
-        self.model = self._build_lstm_model()
-        self.scaler = MinMaxScaler()
+        self.backend = backend
+        self._model = None
+        self._scaler = None
+        # symbol -> (version, model, scaler); replaced as a whole so readers never see a half-swapped slot
+        self.models = {}
+        # symbol -> (cache key, feature matrix) so unchanged candles are not re-engineered
+        self.feature_cache = {}
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = self._build_lstm_model()
+        return self._model
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import MinMaxScaler
+            self._scaler = MinMaxScaler()
+        return self._scaler
 
     def _build_lstm_model(self):
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense, Dropout
+        from tensorflow.keras.optimizers import Adam
+
         model = Sequential([
             LSTM(100, return_sequences=True, input_shape=(self.lookback, len(self.features))),
             Dropout(0.2),
@@ -23,24 +65,41 @@ class EnhancedMLPredictor:
         model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
         return model
 
-    def prepare_data(self, df):
-        df_featured = self._engineer_features(df)
-        X = df_featured[self.features].values
-        y = df_featured['close'].shift(-1).values[:-1]
-        X = X[:-1]
+    def prepare_data(self, df, symbol=None, fit=True):
+        X = self._feature_matrix(df, symbol)[:-1]
+        y = df['close'].values[1:]
 
-        X_scaled = self.scaler.fit_transform(X)
-        X_seq = np.array([X_scaled[i-self.lookback:i] for i in range(self.lookback, len(X_scaled))])
+        # fit only when training; prediction reuses the scaler fitted on the training data
+        X_scaled = self.scaler.fit_transform(X) if fit else self.scaler.transform(X)
+        X_seq = sliding_windows(X_scaled, self.lookback)
         y_seq = y[self.lookback-1:]
 
         return X_seq, y_seq
 
+    def _feature_matrix(self, df, symbol=None):
+        last = df.iloc[-1]
+        key = (len(df), df.index[-1], tuple(last.values))
+        if symbol is not None:
+            cached = self.feature_cache.get(symbol)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        df_featured = self._engineer_features(df)
+        X = np.ascontiguousarray(df_featured[self.features].values, dtype=np.float64)
+        if symbol is not None:
+            self.feature_cache[symbol] = (key, X)
+        return X
+
     def _engineer_features(self, df):
-        df = df.copy()
-        df['MA_10'] = df['close'].rolling(window=10).mean()
-        df['RSI'] = self._calculate_rsi(df['close'])
-        df['MACD'] = self._calculate_macd(df['close'])
-        return df
+        # only the engineered columns actually used as features are computed
+        columns = {name: df[name] for name in self.features if name in df.columns}
+        if 'MA_10' in self.features:
+            columns['MA_10'] = df['close'].rolling(window=10).mean()
+        if 'RSI' in self.features:
+            columns['RSI'] = self._calculate_rsi(df['close'])
+        if 'MACD' in self.features:
+            columns['MACD'] = self._calculate_macd(df['close'])
+        return pd.DataFrame(columns, index=df.index)
 
     def _calculate_rsi(self, prices, period=14):
         delta = prices.diff()
@@ -56,10 +115,75 @@ class EnhancedMLPredictor:
         signal_line = macd.ewm(span=signal, adjust=False).mean()
         return macd - signal_line
 
-    def train(self, df, epochs=50, batch_size=32):
+    def train(self, df, epochs=50, batch_size=32, verbose=1):
         X, y = self.prepare_data(df)
-        self.model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.2, verbose=1)
+        self.model.fit(X, y, epochs=epochs, batch_size=batch_size, validation_split=0.2, verbose=verbose)
+
+    def predict(self, df, symbol=None):
+        if symbol is None:
+            model, scaler = self.model, self.scaler
+        else:
+            slot = self.models.get(symbol)
+            if slot is None:
+                return None
+            model, scaler = slot[1], slot[2]
+        return model.predict(self._latest_window(df, scaler, symbol)[np.newaxis])[0][0]
+
+    def _latest_window(self, df, scaler, symbol=None):
+        return scaler.transform(self._feature_matrix(df, symbol)[-self.lookback:])
+
+    def predict_batch(self, frames):
+        """Predict for many symbols with one forward pass per distinct model.
+
+        ``frames`` maps symbol -> DataFrame. Returns (predictions, stats) where
+        predictions maps symbol -> value (None for symbols without a model) and
+        stats holds the batch sizes and forward-pass latency in seconds.
+        """
+        predictions = {}
+        groups = {}
+        for symbol, df in frames.items():
+            slot = self.models.get(symbol)
+            if slot is None:
+                predictions[symbol] = None
+                continue
+            try:
+                window = self._latest_window(df, slot[2], symbol)
+            except Exception as e:
+                logging.warning(f"Could not build prediction window for {symbol}: {e}")
+                predictions[symbol] = None
+                continue
+            model = slot[1]
+            group = groups.setdefault(id(model), (model, [], []))
+            group[1].append(symbol)
+            group[2].append(window)
+
+        batch_sizes = []
+        start = time.perf_counter()
+        for model, symbols, windows in groups.values():
+            output = model.predict_on_batch(np.stack(windows))
+            predictions.update(zip(symbols, np.asarray(output)[:, 0]))
+            batch_sizes.append(len(symbols))
+        return predictions, {'batch_sizes': batch_sizes, 'latency': time.perf_counter() - start}
+
+    def install_model(self, symbol, version, model, scaler):
+        self.models[symbol] = (version, model, scaler)
+
+    def model_version(self, symbol):
+        slot = self.models.get(symbol)
+        return slot[0] if slot else None
+
+    def save_checkpoint(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.model.save_weights(os.path.join(path, 'model.weights.h5'))
+        with open(os.path.join(path, 'scaler.pkl'), 'wb') as f:
+            pickle.dump(self.scaler, f)
+        export_weights(self.model, self.scaler, os.path.join(path, 'model.npz'))
 
-    def predict(self, df):
-        X, _ = self.prepare_data(df.tail(self.lookback + 1))
-        return self.model.predict(X[-1].reshape(1, self.lookback, -1))[0][0]
\ No newline at end of file
+    def load_checkpoint(self, path):
+        if self.backend == 'numpy':
+            return NumpyLSTM.load(os.path.join(path, 'model.npz'))
+        model = self._build_lstm_model()
+        model.load_weights(os.path.join(path, 'model.weights.h5'))
+        with open(os.path.join(path, 'scaler.pkl'), 'rb') as f:
+            scaler = pickle.load(f)
+        return model, scaler
\ No newline at end of file
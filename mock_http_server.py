@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import random
+import time
+from aiohttp import web
+
+
+class MockRESTServer:
+    """Local stand-in for the Bybit v5 public REST API used to exercise the HTTP transport offline.
+
+    Serves server time, klines and order book snapshots with an optional
+    artificial latency, and counts the distinct client connections it sees so
+    connection reuse can be checked.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, seed=42):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.peers = set()
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def connections(self):
+        return len(self.peers)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/v5/market/time', self._time)
+        app.router.add_get('/v5/market/kline', self._kline)
+        app.router.add_get('/v5/market/orderbook', self._orderbook)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logging.info(f"Mock REST server listening on {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _respond(self, request, result):
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info('peername'))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now = int(time.time() * 1000)
+        return web.json_response({'retCode': 0, 'retMsg': 'OK', 'result': result, 'retExtInfo': {}, 'time': now})
+
+    async def _time(self, request):
+        now = time.time_ns()
+        return await self._respond(request, {'timeSecond': str(now // 10**9), 'timeNano': str(now)})
+
+    async def _kline(self, request):
+        limit = int(request.query.get('limit', 200))
+        interval_ms = int(request.query.get('interval', 1)) * 60000
+        start = int(time.time() * 1000) // interval_ms * interval_ms
+        price = 100.0
+        candles = []
+        for i in range(limit):
+            close = price * (1 + self.random.gauss(0, 0.001))
+            candles.append([str(start - i * interval_ms), str(price), str(max(price, close) * 1.0005),
+                            str(min(price, close) * 0.9995), str(close), str(self.random.uniform(1, 10)), '0'])
+            price = close
+        return await self._respond(request, {'symbol': request.query.get('symbol'), 'category': 'linear',
+                                             'list': candles})
+
+    async def _orderbook(self, request):
+        depth = int(request.query.get('limit', 50))
+        bids = [[str(100 - 0.1 * (i + 1)), str(self.random.uniform(0.1, 5))] for i in range(depth)]
+        asks = [[str(100 + 0.1 * (i + 1)), str(self.random.uniform(0.1, 5))] for i in range(depth)]
+        return await self._respond(request, {'s': request.query.get('symbol'), 'b': bids, 'a': asks,
+                                             'ts': int(time.time() * 1000), 'u': 1, 'seq': 1})
+
+
+async def _demo(requests=200, concurrency=20):
+    from http_transport import HTTPTransport
+    from utils import initialize_exchange, load_config
+
+    config = load_config('config.yaml')
+    server = MockRESTServer(latency=0.002)
+    url = await server.start()
+    transport = HTTPTransport(config['exchange'].get('http', {}))
+    exchange = initialize_exchange(config, transport)
+    exchange.urls['api'] = {key: url for key in exchange.urls['api']}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch():
+        async with semaphore:
+            return await exchange.fetch_time()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{requests} requests in {elapsed:.3f}s over {server.connections} connections: {transport.summary()}")
+    await exchange.close()
+    await transport.close()
+    await server.stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_demo())
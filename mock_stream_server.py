@@ -0,0 +1,162 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from aiohttp import web, WSMsgType
+
+
+class MockStreamServer:
+    """Local stand-in for the Bybit public WebSocket used to run the stream offline.
+
+    Answers subscribe/ping ops like the real endpoint and pushes synthetic
+    kline and order book (snapshot then delta) messages for every subscribed
+    topic. ``drop_connections`` closes all sockets to exercise reconnects.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, tick_interval=0.1, seed=42):
+        self.host = host
+        self.port = port
+        self.tick_interval = tick_interval
+        self.random = random.Random(seed)
+        self.prices = {}
+        self.update_ids = {}
+        self.subscriptions = {}
+        self.subscribe_requests = 0
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/v5/public/linear"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/v5/public/linear', self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logging.info(f"Mock stream server listening on {self.url}")
+        return self.url
+
+    async def stop(self):
+        await self.drop_connections()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def drop_connections(self):
+        for ws in list(self.subscriptions):
+            await ws.close()
+
+    async def _handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.subscriptions[ws] = set()
+        publisher = asyncio.create_task(self._publish(ws))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                request_msg = json.loads(msg.data)
+                op = request_msg.get('op')
+                if op == 'ping':
+                    await ws.send_json({'success': True, 'ret_msg': 'pong', 'op': 'ping'})
+                elif op == 'subscribe':
+                    self.subscribe_requests += 1
+                    topics = request_msg.get('args', [])
+                    self.subscriptions[ws].update(topics)
+                    await ws.send_json({'success': True, 'ret_msg': '', 'op': 'subscribe'})
+                    for topic in topics:
+                        if topic.startswith('orderbook.'):
+                            await ws.send_json(self._orderbook_message(topic, 'snapshot'))
+        finally:
+            publisher.cancel()
+            del self.subscriptions[ws]
+        return ws
+
+    async def _publish(self, ws):
+        while not ws.closed:
+            await asyncio.sleep(self.tick_interval)
+            for topic in list(self.subscriptions.get(ws, ())):
+                if ws.closed:
+                    break
+                if topic.startswith('kline.'):
+                    await ws.send_json(self._kline_message(topic))
+                else:
+                    await ws.send_json(self._orderbook_message(topic, 'delta'))
+
+    def _next_price(self, symbol):
+        price = self.prices.get(symbol, 100.0) * (1 + self.random.gauss(0, 0.001))
+        self.prices[symbol] = price
+        return price
+
+    def _kline_message(self, topic):
+        _, interval, symbol = topic.split('.')
+        now = int(time.time() * 1000)
+        minutes = {'D': 1440, 'W': 10080, 'M': 43200}.get(interval) or int(interval)
+        start = now - now % (minutes * 60000)
+        price = self._next_price(symbol)
+        return {
+            'topic': topic,
+            'type': 'snapshot',
+            'ts': now,
+            'data': [{
+                'start': start,
+                'end': start + minutes * 60000 - 1,
+                'interval': interval,
+                'open': str(price),
+                'close': str(price),
+                'high': str(price * 1.001),
+                'low': str(price * 0.999),
+                'volume': str(round(self.random.uniform(1, 100), 3)),
+                'turnover': '0',
+                'confirm': False,
+                'timestamp': now,
+            }],
+        }
+
+    def _orderbook_message(self, topic, message_type):
+        _, depth, symbol = topic.split('.')
+        key = (symbol, depth)
+        self.update_ids[key] = 1 if message_type == 'snapshot' else self.update_ids.get(key, 0) + 1
+        price = self.prices.get(symbol, 100.0)
+        levels = int(depth) if message_type == 'snapshot' else 3
+        bids = [[f"{price * (1 - 0.0005 * (i + 1)):.4f}", f"{self.random.uniform(0, 10):.3f}"] for i in range(levels)]
+        asks = [[f"{price * (1 + 0.0005 * (i + 1)):.4f}", f"{self.random.uniform(0, 10):.3f}"] for i in range(levels)]
+        return {
+            'topic': topic,
+            'type': message_type,
+            'ts': int(time.time() * 1000),
+            'data': {'s': symbol, 'b': bids, 'a': asks, 'u': self.update_ids[key], 'seq': self.update_ids[key]},
+        }
+
+
+async def _demo(seconds=3):
+    from market_stream import MarketDataStream
+    from utils import load_config
+
+    config = load_config('config.yaml')
+    server = MockStreamServer()
+    url = await server.start()
+    stream = MarketDataStream(config['trading']['symbols'], {'url': url, 'ping_interval': 1},
+                              config['data_fetcher']['timeframe'])
+    klines = stream.subscribe('kline')
+    books = stream.subscribe('orderbook')
+    await stream.start()
+
+    await asyncio.sleep(seconds)
+    await server.drop_connections()
+    await asyncio.sleep(seconds)
+
+    print(f"connections: {len(stream._tasks)}, subscribe requests: {server.subscribe_requests}, "
+          f"kline updates: {klines.qsize()}, order book updates: {books.qsize()}, "
+          f"live symbols: {len(stream.connected)}/{len(stream.symbols)}")
+    await stream.stop()
+    await server.stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_demo())
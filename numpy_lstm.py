@@ -0,0 +1,86 @@
+import numpy as np
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class ArrayScaler:
+    """MinMaxScaler.transform from exported parameters, without importing scikit-learn."""
+
+    def __init__(self, min_, scale_):
+        self.min_ = min_
+        self.scale_ = scale_
+
+    def transform(self, X):
+        return X * self.scale_ + self.min_
+
+
+class NumpyLSTM:
+    """Inference-only forward pass of the stacked LSTM built by EnhancedMLPredictor.
+
+    Weights come from ``export_weights``; dropout layers are the identity at
+    inference time and are skipped. Gate order follows Keras: input, forget,
+    cell, output.
+    """
+
+    def __init__(self, lstm_layers, dense_kernel, dense_bias):
+        self.lstm_layers = lstm_layers
+        self.dense_kernel = dense_kernel
+        self.dense_bias = dense_bias
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            n_layers = int(data['n_lstm_layers'])
+            layers = [(data[f"lstm{i}_kernel"], data[f"lstm{i}_recurrent_kernel"], data[f"lstm{i}_bias"])
+                      for i in range(n_layers)]
+            model = cls(layers, data['dense_kernel'], data['dense_bias'])
+            scaler = ArrayScaler(data['scaler_min'], data['scaler_scale']) if 'scaler_min' in data else None
+        return model, scaler
+
+    def predict_on_batch(self, X):
+        h_seq = np.asarray(X, dtype=np.float32)
+        for kernel, recurrent_kernel, bias in self.lstm_layers:
+            units = recurrent_kernel.shape[0]
+            batch, steps, _ = h_seq.shape
+            # input projection for every timestep in one matmul
+            projected = h_seq @ kernel + bias
+            h = np.zeros((batch, units), dtype=np.float32)
+            c = np.zeros((batch, units), dtype=np.float32)
+            outputs = np.empty((batch, steps, units), dtype=np.float32)
+            for t in range(steps):
+                z = projected[:, t] + h @ recurrent_kernel
+                i = _sigmoid(z[:, :units])
+                f = _sigmoid(z[:, units:2 * units])
+                g = np.tanh(z[:, 2 * units:3 * units])
+                o = _sigmoid(z[:, 3 * units:])
+                c = f * c + i * g
+                h = o * np.tanh(c)
+                outputs[:, t] = h
+            h_seq = outputs
+        return h_seq[:, -1] @ self.dense_kernel + self.dense_bias
+
+    def predict(self, X, verbose=0):
+        return self.predict_on_batch(X)
+
+
+def export_weights(model, scaler, path):
+    """Freeze a trained Keras LSTM (and its fitted MinMaxScaler) into a compact .npz file."""
+    arrays = {}
+    lstm_index = 0
+    for layer in model.layers:
+        name = type(layer).__name__
+        if name == 'LSTM':
+            kernel, recurrent_kernel, bias = layer.get_weights()
+            arrays[f"lstm{lstm_index}_kernel"] = kernel
+            arrays[f"lstm{lstm_index}_recurrent_kernel"] = recurrent_kernel
+            arrays[f"lstm{lstm_index}_bias"] = bias
+            lstm_index += 1
+        elif name == 'Dense':
+            arrays['dense_kernel'], arrays['dense_bias'] = layer.get_weights()
+    arrays['n_lstm_layers'] = np.array(lstm_index)
+    if scaler is not None:
+        arrays['scaler_min'] = scaler.min_
+        arrays['scaler_scale'] = scaler.scale_
+    np.savez(path, **arrays)
@@ -0,0 +1,127 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+DTYPES = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+
+
+class OHLCVCache:
+    """Append-only columnar candle store, one raw binary file per column.
+
+    Files live under ``<root>/<symbol>/<timeframe>/<column>.bin`` and are read
+    back through ``np.memmap`` so serving the newest window never loads the
+    whole history into memory.
+    """
+
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _series_dir(self, symbol, timeframe):
+        safe_symbol = re.sub(r'[^A-Za-z0-9]+', '_', symbol).strip('_')
+        return os.path.join(self.root_dir, safe_symbol, timeframe)
+
+    def _column_path(self, symbol, timeframe, column):
+        return os.path.join(self._series_dir(symbol, timeframe), f"{column}.bin")
+
+    def length(self, symbol, timeframe):
+        # Columns are appended one after another, so a crash mid-append can leave
+        # them uneven; only rows present in every column count.
+        lengths = []
+        for column in COLUMNS:
+            path = self._column_path(symbol, timeframe, column)
+            if not os.path.exists(path):
+                return 0
+            lengths.append(os.path.getsize(path) // np.dtype(DTYPES[column]).itemsize)
+        return min(lengths)
+
+    def last_timestamp(self, symbol, timeframe):
+        n = self.length(symbol, timeframe)
+        if n == 0:
+            return None
+        timestamps = self._memmap(symbol, timeframe, 'timestamp', n - 1, n)
+        return int(timestamps[0])
+
+    def _memmap(self, symbol, timeframe, column, start, stop):
+        dtype = np.dtype(DTYPES[column])
+        return np.memmap(self._column_path(symbol, timeframe, column), dtype=dtype, mode='r',
+                         offset=start * dtype.itemsize, shape=(stop - start,))
+
+    def update(self, symbol, timeframe, ohlcv):
+        """Merge raw ``[timestamp, o, h, l, c, v]`` rows into the store.
+
+        Rows older than the last stored candle are ignored, a row with the same
+        timestamp as the last stored candle overwrites it (the candle was still
+        open when it was written) and newer rows are appended. Returns the number
+        of rows written.
+        """
+        if not ohlcv:
+            return 0
+
+        rows = np.asarray(ohlcv, dtype=np.float64)
+        rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        timestamps = rows[:, 0].astype(np.int64)
+        # keep the last occurrence of any duplicated timestamp
+        keep = np.append(timestamps[1:] != timestamps[:-1], True)
+        rows, timestamps = rows[keep], timestamps[keep]
+
+        os.makedirs(self._series_dir(symbol, timeframe), exist_ok=True)
+        n = self.length(symbol, timeframe)
+        self._truncate(symbol, timeframe, n)
+
+        last_ts = self.last_timestamp(symbol, timeframe) if n else None
+        written = 0
+        if last_ts is not None:
+            same = timestamps == last_ts
+            if same.any():
+                self._overwrite_last(symbol, timeframe, n, rows[same][-1])
+                written += 1
+            newer = timestamps > last_ts
+            rows, timestamps = rows[newer], timestamps[newer]
+
+        if len(rows):
+            for i, column in enumerate(COLUMNS):
+                values = timestamps if column == 'timestamp' else rows[:, i]
+                with open(self._column_path(symbol, timeframe, column), 'ab') as f:
+                    f.write(np.ascontiguousarray(values, dtype=DTYPES[column]).tobytes())
+            written += len(rows)
+        return written
+
+    def _overwrite_last(self, symbol, timeframe, n, row):
+        for i, column in enumerate(COLUMNS):
+            dtype = np.dtype(DTYPES[column])
+            with open(self._column_path(symbol, timeframe, column), 'r+b') as f:
+                f.seek((n - 1) * dtype.itemsize)
+                f.write(np.array([row[i]], dtype=dtype).tobytes())
+
+    def _truncate(self, symbol, timeframe, n):
+        for column in COLUMNS:
+            path = self._column_path(symbol, timeframe, column)
+            size = n * np.dtype(DTYPES[column]).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def read_arrays(self, symbol, timeframe, limit=None):
+        """Return the newest ``limit`` candles as a dict of read-only memmaps."""
+        n = self.length(symbol, timeframe)
+        start = 0 if limit is None else max(0, n - limit)
+        if n == 0:
+            return {column: np.empty(0, dtype=DTYPES[column]) for column in COLUMNS}
+        return {column: self._memmap(symbol, timeframe, column, start, n) for column in COLUMNS}
+
+    def read(self, symbol, timeframe, limit=None):
+        arrays = self.read_arrays(symbol, timeframe, limit)
+        df = pd.DataFrame({column: np.array(arrays[column]) for column in COLUMNS[1:]},
+                          index=pd.to_datetime(np.array(arrays['timestamp']), unit='ms'))
+        df.index.name = 'timestamp'
+        return df
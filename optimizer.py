@@ -0,0 +1,335 @@
+import argparse
+import copy
+import itertools
+import json
+import logging
+import multiprocessing
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtester import Backtester
+from strategy import Strategy
+
+METHODS = ('grid', 'random', 'bayesian')
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+_worker = {}
+
+
+def apply_params(config, params):
+    """Copy of ``config`` with dotted keys such as ``strategy.atr_period`` replaced by ``params``."""
+    config = copy.deepcopy(config)
+    for path, value in params.items():
+        section = config
+        *parents, key = path.split('.')
+        for parent in parents:
+            section = section.setdefault(parent, {})
+        section[key] = value
+    return config
+
+
+def _init_worker(names, shape, symbols, config, strategy_factory):
+    # Attach to the parent's candle arrays; only parameter sets and bar ranges travel per task.
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    candles = np.ndarray((len(FIELDS),) + shape, dtype=np.float64, buffer=blocks[0].buf)
+    timestamps = np.ndarray(shape[1:], dtype='datetime64[ns]', buffer=blocks[1].buf)
+    index = pd.DatetimeIndex(timestamps)
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        present = ~np.isnan(candles[3, i])
+        frames[symbol] = pd.DataFrame({field: candles[f, i, present] for f, field in enumerate(FIELDS)},
+                                      index=index[present])
+    _worker.update(blocks=blocks, index=index, frames=frames, config=config, strategy_factory=strategy_factory)
+
+
+def _evaluate(params, start, stop, mode):
+    config = apply_params(_worker['config'], params)
+    index = _worker['index']
+    backtester = Backtester(config)
+    bar = index[1] - index[0]
+    backtester.start = index[start]
+    backtester.end = index[stop - 1] + bar
+    first = index[max(0, start - backtester.warmup)]
+    frames = {symbol: df.loc[first:backtester.end] for symbol, df in _worker['frames'].items()}
+    frames = {symbol: df for symbol, df in frames.items() if len(df)}
+
+    allocation = config['strategy']['capital_allocation']
+    total_weight = sum(allocation.values()) or 1
+    returns = None
+    trades = 0
+    for strategy_type, weight in allocation.items():
+        result = backtester.run(_worker['strategy_factory'](config['strategy'], strategy_type), frames, mode)
+        strategy_returns = result['equity'].pct_change().fillna(0).to_numpy()
+        returns = strategy_returns * weight / total_weight + (0 if returns is None else returns)
+        trades += len(result['trades'])
+
+    equity = np.cumprod(1 + returns)
+    bars_per_year = pd.Timedelta(days=365) / bar
+    volatility = returns.std()
+    return {
+        'sharpe': float(returns.mean() / volatility * np.sqrt(bars_per_year)) if volatility > 0 else 0.0,
+        'total_return': float(equity[-1] - 1),
+        'max_drawdown': float(np.max(1 - equity / np.maximum.accumulate(equity))),
+        'trades': trades,
+    }
+
+
+class ParameterSpace:
+    """Search space from a dict of dotted config keys to a list of choices or a {low, high} range."""
+
+    def __init__(self, space, seed=42):
+        self.space = space
+        self.names = list(space)
+        self.random = random.Random(seed)
+
+    def grid(self):
+        choices = []
+        for name in self.names:
+            spec = self.space[name]
+            if isinstance(spec, dict):
+                steps = spec.get('steps', 5)
+                values = np.linspace(spec['low'], spec['high'], steps)
+                if isinstance(spec['low'], int) and isinstance(spec['high'], int):
+                    values = sorted(set(int(round(value)) for value in values))
+                else:
+                    values = [float(value) for value in values]
+                choices.append(values)
+            else:
+                choices.append(spec)
+        return [dict(zip(self.names, values)) for values in itertools.product(*choices)]
+
+    def sample(self):
+        params = {}
+        for name in self.names:
+            spec = self.space[name]
+            if not isinstance(spec, dict):
+                params[name] = self.random.choice(spec)
+            elif isinstance(spec['low'], int) and isinstance(spec['high'], int):
+                params[name] = self.random.randint(spec['low'], spec['high'])
+            else:
+                params[name] = self.random.uniform(spec['low'], spec['high'])
+        return params
+
+    def encode(self, params):
+        """Map a parameter set into the unit cube for the Gaussian process."""
+        point = []
+        for name in self.names:
+            spec = self.space[name]
+            if isinstance(spec, dict):
+                point.append((params[name] - spec['low']) / ((spec['high'] - spec['low']) or 1))
+            else:
+                point.append(spec.index(params[name]) / max(len(spec) - 1, 1))
+        return point
+
+
+class OptimizationResults:
+    """SQLite table of every evaluated parameter set, one row per (run, split, phase, params)."""
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS trials (
+                run_id TEXT, split INTEGER, phase TEXT, window_start TEXT, window_end TEXT,
+                params TEXT, objective REAL, sharpe REAL, total_return REAL, max_drawdown REAL,
+                trades INTEGER, created REAL
+            )""")
+        self.connection.commit()
+
+    def record(self, run_id, split, phase, window, params, objective, metrics):
+        self.connection.execute(
+            "INSERT INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, split, phase, str(window[0]), str(window[1]), json.dumps(params, sort_keys=True), objective,
+             metrics['sharpe'], metrics['total_return'], metrics['max_drawdown'], metrics['trades'], time.time()))
+        self.connection.commit()
+
+    def top(self, run_id, phase='test', limit=10):
+        return self.connection.execute(
+            "SELECT split, params, objective, total_return, max_drawdown, trades FROM trials "
+            "WHERE run_id = ? AND phase = ? ORDER BY objective DESC LIMIT ?", (run_id, phase, limit)).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+class WalkForwardOptimizer:
+    """Fans parameter sets out over a process pool and validates the winners walk-forward.
+
+    Candles are aligned into one (fields x symbols x time) array in shared
+    memory that every worker maps once, so a task is only a parameter set and
+    a bar range. Each split searches on its training window and scores the
+    best parameter set on the following, unseen test window.
+    """
+
+    def __init__(self, config, space, strategy_factory=Strategy, method='random', trials=50, workers=None,
+                 objective='sharpe', mode='event', results_path='optimization.db', seed=42):
+        if method not in METHODS:
+            raise ValueError(f"Unknown search method {method!r}, expected one of {METHODS}")
+        self.config = config
+        self.space = ParameterSpace(space, seed)
+        self.strategy_factory = strategy_factory
+        self.method = method
+        self.trials = trials
+        self.workers = workers or multiprocessing.cpu_count()
+        self.objective = objective
+        self.mode = mode
+        self.results = OptimizationResults(results_path)
+        self.seed = seed
+
+    @classmethod
+    def from_config(cls, config, strategy_factory=Strategy):
+        optimization = config.get('optimization', {})
+        return cls(config, optimization['space'], strategy_factory,
+                   method=optimization.get('method', 'random'),
+                   trials=optimization.get('trials', 50),
+                   workers=optimization.get('workers'),
+                   objective=optimization.get('objective', 'sharpe'),
+                   mode=optimization.get('mode', 'event'),
+                   results_path=optimization.get('results_db', 'optimization.db'))
+
+    def _share(self, frames):
+        index = pd.DatetimeIndex(np.unique(np.concatenate([df.index.values for df in frames.values()])))
+        shape = (len(frames), len(index))
+        candles_block = shared_memory.SharedMemory(create=True, size=8 * len(FIELDS) * shape[0] * shape[1])
+        index_block = shared_memory.SharedMemory(create=True, size=8 * shape[1])
+        candles = np.ndarray((len(FIELDS),) + shape, dtype=np.float64, buffer=candles_block.buf)
+        candles[:] = np.nan
+        for i, df in enumerate(frames.values()):
+            columns = index.searchsorted(df.index.values)
+            for f, field in enumerate(FIELDS):
+                candles[f, i, columns] = df[field].to_numpy(dtype=np.float64)
+        np.ndarray(shape[1:], dtype='datetime64[ns]', buffer=index_block.buf)[:] = index.values
+        return [candles_block, index_block], shape, index
+
+    def splits(self, index, start, end):
+        """(train_start, train_stop, test_start, test_stop) bar ranges, stepping by the test window."""
+        walk_forward = self.config.get('optimization', {}).get('walk_forward', {})
+        bar = index[1] - index[0]
+        train_bars = int(pd.Timedelta(days=walk_forward.get('train_days', 90)) / bar)
+        test_bars = int(pd.Timedelta(days=walk_forward.get('test_days', 30)) / bar)
+        first, last = index.searchsorted(start), index.searchsorted(end)
+        ranges = []
+        while first + train_bars + test_bars <= last:
+            ranges.append((first, first + train_bars, first + train_bars, first + train_bars + test_bars))
+            first += test_bars
+        if not ranges:
+            # window too short to walk forward: search and report on the whole range
+            ranges.append((first, last, first, last))
+        return ranges
+
+    def _score(self, metrics):
+        return -metrics['max_drawdown'] if self.objective == 'max_drawdown' else metrics[self.objective]
+
+    def _evaluate_all(self, executor, candidates, start, stop):
+        futures = {executor.submit(_evaluate, params, start, stop, self.mode): params for params in candidates}
+        evaluated = []
+        for future in as_completed(futures):
+            try:
+                metrics = future.result()
+            except Exception as e:
+                logging.warning(f"Parameter set {futures[future]} failed: {e}")
+                continue
+            evaluated.append((futures[future], metrics))
+        return evaluated
+
+    def _propose(self, evaluated, count):
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+        from scipy.stats import norm
+
+        X = np.array([self.space.encode(params) for params, _ in evaluated])
+        y = np.nan_to_num(np.array([self._score(metrics) for _, metrics in evaluated]))
+        model = GaussianProcessRegressor(Matern(nu=2.5) + WhiteKernel(), normalize_y=True, random_state=self.seed)
+        model.fit(X, y)
+
+        candidates = [self.space.sample() for _ in range(max(500, 50 * count))]
+        mean, std = model.predict(np.array([self.space.encode(params) for params in candidates]), return_std=True)
+        improvement = mean - y.max()
+        z = improvement / np.maximum(std, 1e-9)
+        expected_improvement = improvement * norm.cdf(z) + std * norm.pdf(z)
+        return [candidates[i] for i in np.argsort(expected_improvement)[::-1][:count]]
+
+    def _search(self, executor, start, stop):
+        if self.method == 'grid':
+            return self._evaluate_all(executor, self.space.grid(), start, stop)
+        if self.method == 'random':
+            return self._evaluate_all(executor, [self.space.sample() for _ in range(self.trials)], start, stop)
+
+        # bayesian: random start, then batches of expected-improvement proposals, one per worker
+        # failed trials count against the budget too, so a batch that yields nothing cannot loop forever
+        initial = min(self.trials, max(self.workers, 10))
+        evaluated = self._evaluate_all(executor, [self.space.sample() for _ in range(initial)], start, stop)
+        attempted = initial
+        while attempted < self.trials and len(evaluated) >= 2:
+            batch = self._propose(evaluated, min(self.workers, self.trials - attempted))
+            attempted += len(batch)
+            evaluated += self._evaluate_all(executor, batch, start, stop)
+        return evaluated
+
+    def run(self, frames):
+        run_id = time.strftime('%Y%m%d-%H%M%S')
+        blocks, shape, index = self._share(frames)
+        backtester = Backtester(self.config)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker,
+                                     initargs=([block.name for block in blocks], shape, list(frames), self.config,
+                                               self.strategy_factory)) as executor:
+                for split, (train_start, train_stop, test_start, test_stop) in enumerate(
+                        self.splits(index, backtester.start, backtester.end)):
+                    started = time.perf_counter()
+                    evaluated = self._search(executor, train_start, train_stop)
+                    if not evaluated:
+                        logging.error(f"Split {split}: every parameter set failed")
+                        continue
+                    train_window = (index[train_start], index[train_stop - 1])
+                    for params, metrics in evaluated:
+                        self.results.record(run_id, split, 'train', train_window, params, self._score(metrics),
+                                            metrics)
+
+                    best, _ = max(evaluated, key=lambda item: self._score(item[1]))
+                    metrics = executor.submit(_evaluate, best, test_start, test_stop, self.mode).result()
+                    self.results.record(run_id, split, 'test', (index[test_start], index[test_stop - 1]), best,
+                                        self._score(metrics), metrics)
+                    logging.info(f"Split {split}: {len(evaluated)} sets in {time.perf_counter() - started:.1f}s, "
+                                 f"best {best}, out-of-sample {self.objective} {self._score(metrics):.3f}")
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return run_id
+
+
+def main():
+    from utils import load_config
+
+    parser = argparse.ArgumentParser(description='Walk-forward parameter optimization on cached candles.')
+    parser.add_argument('--config', default='config.yaml')
+    parser.add_argument('--method', choices=METHODS)
+    parser.add_argument('--trials', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--symbols', nargs='*', help='defaults to trading.symbols')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    optimizer = WalkForwardOptimizer.from_config(config)
+    if args.method:
+        optimizer.method = args.method
+    if args.trials:
+        optimizer.trials = args.trials
+    if args.workers:
+        optimizer.workers = args.workers
+
+    frames = Backtester(config).load(args.symbols or config['trading']['symbols'])
+    run_id = optimizer.run(frames)
+    for row in optimizer.results.top(run_id):
+        print(row)
+    optimizer.results.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import numpy as np
+
+
+class _BookSide:
+    """Price levels of one side in sorted arrays, best price at the end.
+
+    Bids are keyed by price and asks by -price, so both sides sort ascending
+    and updates near the top of the book only shift a few elements.
+    """
+
+    def __init__(self, sign, capacity=256):
+        self.sign = sign
+        self.keys = np.empty(capacity)
+        self.sizes = np.empty(capacity)
+        self.n = 0
+
+    def clear(self):
+        self.n = 0
+
+    def _grow(self):
+        self.keys = np.concatenate((self.keys, np.empty(len(self.keys))))
+        self.sizes = np.concatenate((self.sizes, np.empty(len(self.sizes))))
+
+    def update(self, price, size):
+        key = self.sign * price
+        n = self.n
+        i = int(np.searchsorted(self.keys[:n], key))
+        if i < n and self.keys[i] == key:
+            if size == 0:
+                self.keys[i:n - 1] = self.keys[i + 1:n]
+                self.sizes[i:n - 1] = self.sizes[i + 1:n]
+                self.n -= 1
+            else:
+                self.sizes[i] = size
+        elif size != 0:
+            if n == len(self.keys):
+                self._grow()
+            self.keys[i + 1:n + 1] = self.keys[i:n]
+            self.sizes[i + 1:n + 1] = self.sizes[i:n]
+            self.keys[i] = key
+            self.sizes[i] = size
+            self.n += 1
+
+    def top(self, depth):
+        start = max(0, self.n - depth)
+        prices = self.keys[start:self.n][::-1] * self.sign
+        return np.column_stack((prices, self.sizes[start:self.n][::-1]))
+
+
+class L2OrderBook:
+    """Level 2 book for one symbol rebuilt from snapshot and delta messages.
+
+    Deltas must carry consecutive update ids; a gap marks the book out of
+    sync until the next snapshot, and stale (already applied) deltas are
+    ignored. A snapshot without an update id leaves the book out of sync,
+    since nothing could tell which deltas it already contains.
+    """
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.bids = _BookSide(1)
+        self.asks = _BookSide(-1)
+        self.update_id = None
+        self.seq = None
+        self.timestamp = None
+        self.synced = False
+
+    def apply_snapshot(self, bids, asks, update_id=None, seq=None, timestamp=None):
+        self.bids.clear()
+        self.asks.clear()
+        for price, size in bids:
+            self.bids.update(float(price), float(size))
+        for price, size in asks:
+            self.asks.update(float(price), float(size))
+        self.update_id = update_id
+        self.seq = seq
+        self.timestamp = timestamp
+        self.synced = update_id is not None
+
+    def apply_delta(self, bids, asks, update_id, seq=None, timestamp=None):
+        """Apply a delta; returns False when it could not be applied because of a gap."""
+        if not self.synced:
+            return False
+        if update_id <= self.update_id:
+            return True
+        if update_id != self.update_id + 1:
+            logging.warning(f"Order book gap for {self.symbol}: expected update {self.update_id + 1}, "
+                            f"got {update_id}")
+            self.synced = False
+            return False
+        for price, size in bids:
+            self.bids.update(float(price), float(size))
+        for price, size in asks:
+            self.asks.update(float(price), float(size))
+        self.update_id = update_id
+        self.seq = seq
+        self.timestamp = timestamp
+        return True
+
+    def top(self, depth=10):
+        return {
+            'symbol': self.symbol,
+            'bids': self.bids.top(depth).tolist(),
+            'asks': self.asks.top(depth).tolist(),
+            'timestamp': self.timestamp,
+            'nonce': self.update_id,
+        }
+
+
+class OrderBookManager:
+    """Keeps an L2OrderBook per symbol from stream updates and resyncs books on gaps.
+
+    A gap triggers a REST snapshot. Deltas arriving while it is fetched are
+    buffered and replayed over it: those at or below the snapshot's update id
+    are dropped by ``apply_delta`` and later ones must continue from it, or
+    the book stays out of sync and the next delta triggers another resync. A
+    snapshot whose update id is unknown is never used; the book then waits
+    for the stream's own snapshot.
+    """
+
+    def __init__(self, exchange, resync_depth=50):
+        self.exchange = exchange
+        self.resync_depth = resync_depth
+        self.books = {}
+        self.resyncs = 0
+        self._resyncing = set()
+        self._buffered = {}
+
+    def book(self, symbol):
+        if symbol not in self.books:
+            self.books[symbol] = L2OrderBook(symbol)
+        return self.books[symbol]
+
+    def apply(self, update):
+        symbol = update['symbol']
+        book = self.book(symbol)
+        if update['type'] == 'snapshot':
+            book.apply_snapshot(update['bids'], update['asks'], update['update_id'], update['seq'], update['ts'])
+            # deltas held for a REST resync predate this snapshot
+            self._buffered.pop(symbol, None)
+        elif symbol in self._resyncing and not book.synced:
+            self._buffered.setdefault(symbol, []).append(update)
+        elif not book.apply_delta(update['bids'], update['asks'], update['update_id'], update['seq'], update['ts']):
+            self._schedule_resync(symbol)
+
+    def _schedule_resync(self, symbol):
+        if symbol in self._resyncing:
+            return
+        self._resyncing.add(symbol)
+        self._buffered[symbol] = []
+        asyncio.ensure_future(self._resync(symbol))
+
+    @staticmethod
+    def _snapshot_update_id(snapshot):
+        # ccxt leaves nonce empty for Bybit; the raw response carries the id as result.u
+        update_id = snapshot.get('nonce')
+        if update_id is None:
+            update_id = ((snapshot.get('info') or {}).get('result') or {}).get('u')
+        return int(update_id) if update_id is not None else None
+
+    async def _resync(self, symbol):
+        try:
+            snapshot = await self.exchange.fetch_order_book(symbol, self.resync_depth)
+            book = self.book(symbol)
+            if book.synced:
+                return
+            update_id = self._snapshot_update_id(snapshot)
+            if update_id is None:
+                logging.warning(f"Order book snapshot for {symbol} has no update id; waiting for a stream snapshot")
+                await asyncio.sleep(1)
+                return
+            book.apply_snapshot([level[:2] for level in snapshot['bids']],
+                                [level[:2] for level in snapshot['asks']],
+                                update_id, timestamp=snapshot.get('timestamp'))
+            for update in self._buffered.get(symbol, []):
+                if not book.apply_delta(update['bids'], update['asks'], update['update_id'], update['seq'],
+                                        update['ts']):
+                    logging.warning(f"Buffered deltas for {symbol} do not continue the snapshot, resyncing again")
+                    break
+            if book.synced:
+                self.resyncs += 1
+        except Exception as e:
+            logging.warning(f"Order book resync failed for {symbol}: {e}")
+            await asyncio.sleep(1)
+        finally:
+            self._resyncing.discard(symbol)
+            self._buffered.pop(symbol, None)
+
+    async def consume(self, queue):
+        while True:
+            self.apply(await queue.get())
+
+    def is_synced(self, symbol):
+        return symbol in self.books and self.books[symbol].synced
+
+    def top(self, symbol, depth=10):
+        return self.books[symbol].top(depth)
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+
+FINAL_STATUSES = ('closed', 'canceled', 'rejected', 'expired')
+
+
+class OrderTracker:
+    """Order state cache indexed by order id and client order id.
+
+    State comes from REST responses (``track``) and private stream updates
+    (``on_order_update``/``on_execution``). Callers ``wait_for`` a status
+    instead of sleeping; if no update arrives in time the order is reconciled
+    over REST. Only the last ``retention`` orders to reach a final status
+    are kept, together with their fills; older ones are evicted.
+    """
+
+    def __init__(self, exchange, reconcile_timeout=5, retention=1000):
+        self.exchange = exchange
+        self.reconcile_timeout = reconcile_timeout
+        self.retention = retention
+        self.orders = {}
+        self.client_ids = {}
+        self.fills = {}
+        # ids of finished orders, oldest first
+        self._finished = {}
+        self._waiters = {}
+        self._tasks = []
+
+    def attach(self, stream):
+        self._tasks = [
+            asyncio.create_task(self._consume(stream.subscribe('order'), self.on_order_update)),
+            asyncio.create_task(self._consume(stream.subscribe('execution'), self.on_execution)),
+        ]
+
+    async def _consume(self, queue, handler):
+        while True:
+            handler(await queue.get())
+
+    def get(self, order_id=None, client_order_id=None):
+        if order_id is None and client_order_id is not None:
+            order_id = self.client_ids.get(client_order_id)
+        return self.orders.get(order_id)
+
+    def track(self, order):
+        """Record an order dict from a REST response or stream update, merging with known state."""
+        if not order or not order.get('id'):
+            return order
+        order_id = order['id']
+        known = self.orders.get(order_id)
+        merged = dict(known) if known else {}
+        merged.update({key: value for key, value in order.items() if value is not None})
+        self.orders[order_id] = merged
+        if merged.get('clientOrderId'):
+            self.client_ids[merged['clientOrderId']] = order_id
+        self._notify(order_id)
+        if merged.get('status') in FINAL_STATUSES:
+            self._finish(order_id)
+        return merged
+
+    def _finish(self, order_id):
+        self._finished[order_id] = None
+        while len(self._finished) > self.retention:
+            evicted = next(iter(self._finished))
+            del self._finished[evicted]
+            order = self.orders.pop(evicted, None)
+            self.fills.pop(evicted, None)
+            client_order_id = order.get('clientOrderId') if order else None
+            if client_order_id and self.client_ids.get(client_order_id) == evicted:
+                del self.client_ids[client_order_id]
+
+    def on_order_update(self, update):
+        self.track(update)
+
+    def on_execution(self, execution):
+        self.fills.setdefault(execution['order'], []).append(execution)
+
+    def _notify(self, order_id):
+        status = self.orders[order_id].get('status')
+        remaining = []
+        for statuses, future in self._waiters.pop(order_id, []):
+            if future.done():
+                continue
+            if status in statuses:
+                future.set_result(self.orders[order_id])
+            else:
+                remaining.append((statuses, future))
+        if remaining:
+            self._waiters[order_id] = remaining
+
+    async def wait_for(self, order_id, symbol, statuses=FINAL_STATUSES, timeout=None):
+        """Wait until the order reaches one of ``statuses``; reconcile over REST on timeout."""
+        order = self.orders.get(order_id)
+        if order is not None and order.get('status') in statuses:
+            return order
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (statuses, future)
+        self._waiters.setdefault(order_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout or self.reconcile_timeout)
+        except asyncio.TimeoutError:
+            logging.info(f"No stream update for order {order_id} within timeout, reconciling over REST")
+            return await self.reconcile(order_id, symbol)
+        finally:
+            self._discard_waiter(order_id, waiter)
+
+    def _discard_waiter(self, order_id, waiter):
+        waiters = self._waiters.get(order_id)
+        if waiters is None:
+            return
+        if waiter in waiters:
+            waiters.remove(waiter)
+        if not waiters:
+            del self._waiters[order_id]
+
+    async def reconcile(self, order_id, symbol):
+        try:
+            order = await self.exchange.fetch_order(order_id, symbol)
+        except Exception as e:
+            logging.debug(f"fetch_order failed for {order_id} ({e}), scanning open and closed orders")
+            order = await self._scan_orders(order_id, symbol)
+
+        if not order:
+            logging.warning(f"Order ID {order_id} not found in open or closed orders.")
+            return self.orders.get(order_id)
+        return self.track(order)
+
+    async def _scan_orders(self, order_id, symbol):
+        open_orders = await self.exchange.fetch_open_orders(symbol)
+        for order in open_orders:
+            self.track(order)
+        found = next((order for order in open_orders if order['id'] == order_id), None)
+        if found:
+            return found
+
+        closed_orders = await self.exchange.fetch_closed_orders(symbol)
+        for order in closed_orders:
+            self.track(order)
+        return next((order for order in closed_orders if order['id'] == order_id), None)
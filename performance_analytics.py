@@ -1,37 +1,136 @@
+import math
+import time
+from collections import deque
 import numpy as np
-import pandas as pd
+from utils import RingBuffer
 
 
 class PerformanceAnalytics:
-    def __init__(self):
-        self.equity_curve = []
-        self.trades = []
+    """Streaming portfolio and trade statistics; every update is O(1).
 
-    def update(self, current_positions, latest_prices):
-        portfolio_value = sum(pos['size'] * latest_prices[symbol]['close'] for symbol, pos in current_positions.items())
-        self.equity_curve.append(portfolio_value)
+    Each equity point folds its return into Welford's running mean and
+    variance and moves the running peak and maximum drawdown, so
+    ``calculate_metrics`` never rescans history. Trades update win counts
+    and per-strategy attribution the same way. Only the last ``history``
+    equity points and ``trade_history`` trades are kept in memory; with
+    ``history_path`` every (timestamp, equity) pair is also appended to a
+    binary file that ``load_history`` reads back.
+    """
 
-    def calculate_metrics(self):
-        returns = pd.Series(self.equity_curve).pct_change()
-        total_return = (self.equity_curve[-1] / self.equity_curve[0]) - 1
-        sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
-        max_drawdown = (pd.Series(self.equity_curve).cummax() - self.equity_curve).max() / pd.Series(
-            self.equity_curve).cummax()
+    def __init__(self, initial_capital=0.0, history=10080, trade_history=1000, history_path=None,
+                 periods_per_year=252):
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self.history_path = history_path
+        self.equity_curve = RingBuffer(history)
+        self.trades = deque(maxlen=trade_history)
+        self.prices = {}
+        self.realized_pnl = 0.0
+
+        self.points = 0
+        self.first_equity = None
+        self.last_equity = None
+        self.n_returns = 0
+        self.mean_return = 0.0
+        self.m2 = 0.0
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+
+        self.trade_count = 0
+        self.wins = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.by_strategy = {}
+
+    @classmethod
+    def from_config(cls, config, initial_capital=0.0):
+        return cls(initial_capital=initial_capital,
+                   history=config.get('history', 10080),
+                   trade_history=config.get('trade_history', 1000),
+                   history_path=config.get('history_path'),
+                   periods_per_year=config.get('periods_per_year', 252))
+
+    def update_price(self, symbol, price):
+        self.prices[symbol] = float(price)
+
+    def update(self, current_positions, timestamp=None):
+        """Record one equity point: capital plus realized and open P&L at the latest prices."""
+        unrealized = 0.0
+        for symbol, position in current_positions.items():
+            price = self.prices.get(symbol)
+            if price is None:
+                continue
+            direction = -1 if position.get('side') == 'sell' else 1
+            unrealized += direction * position['size'] * (price - position['entry_price'])
+        self.record_equity(self.initial_capital + self.realized_pnl + unrealized, timestamp)
+
+    def record_equity(self, value, timestamp=None):
+        value = float(value)
+        if self.last_equity is not None and self.last_equity > 0:
+            # Welford's update of the return mean and variance
+            change = value / self.last_equity - 1
+            self.n_returns += 1
+            delta = change - self.mean_return
+            self.mean_return += delta / self.n_returns
+            self.m2 += delta * (change - self.mean_return)
+        if self.first_equity is None:
+            self.first_equity = value
+        self.last_equity = value
+        self.points += 1
+
+        if value > self.peak:
+            self.peak = value
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - value) / self.peak)
+
+        self.equity_curve.append(value)
+        if self.history_path is not None:
+            with open(self.history_path, 'ab') as f:
+                f.write(np.array([timestamp if timestamp is not None else time.time(), value]).tobytes())
 
-        win_rate = len([t for t in self.trades if t['profit'] > 0]) / len(self.trades) if self.trades else 0
+    @staticmethod
+    def load_history(path):
+        """(timestamp, equity) rows written by an instance with ``history_path``."""
+        return np.fromfile(path, dtype=np.float64).reshape(-1, 2)
+
+    def record_trade(self, trade):
+        profit = trade['profit']
+        self.trades.append(trade)
+        self.realized_pnl += profit
+        self.trade_count += 1
+        if profit > 0:
+            self.wins += 1
+            self.gross_profit += profit
+        else:
+            self.gross_loss -= profit
+
+        stats = self.by_strategy.setdefault(trade.get('strategy'), {'trades': 0, 'wins': 0, 'profit': 0.0})
+        stats['trades'] += 1
+        stats['wins'] += profit > 0
+        stats['profit'] += profit
+
+    def calculate_metrics(self):
+        variance = self.m2 / (self.n_returns - 1) if self.n_returns > 1 else 0.0
+        volatility = math.sqrt(variance)
+        sharpe_ratio = math.sqrt(self.periods_per_year) * self.mean_return / volatility if volatility > 0 else 0.0
+        total_return = self.last_equity / self.first_equity - 1 if self.first_equity else 0.0
+        current_drawdown = (self.peak - self.last_equity) / self.peak if self.points and self.peak > 0 else 0.0
 
         return {
             'total_return': total_return,
             'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': max_drawdown,
-            'win_rate': win_rate
+            'volatility': volatility * math.sqrt(self.periods_per_year),
+            'max_drawdown': self.max_drawdown,
+            'current_drawdown': current_drawdown,
+            'win_rate': self.wins / self.trade_count if self.trade_count else 0,
+            'profit_factor': self.gross_profit / self.gross_loss if self.gross_loss > 0 else None,
+            'trades': self.trade_count,
+            'by_strategy': {strategy: dict(stats, win_rate=stats['wins'] / stats['trades'])
+                            for strategy, stats in self.by_strategy.items()},
         }
 
-    def record_trade(self, trade):
-        self.trades.append(trade)
-
     def get_equity_curve(self):
-        return self.equity_curve
+        return self.equity_curve.values()
 
     def get_trades(self):
-        return self.trades
\ No newline at end of file
+        return list(self.trades)
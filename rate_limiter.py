@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import time
+import ccxt
+from instrumentation import metrics
+
+ENDPOINT_CLASSES = {
+    'fetch_time': 'market_data',
+    'load_markets': 'market_data',
+    'fetch_markets': 'market_data',
+    'fetch_ticker': 'market_data',
+    'fetch_tickers': 'market_data',
+    'fetch_ohlcv': 'market_data',
+    'fetch_order_book': 'market_data',
+    'fetch_trades': 'market_data',
+    'fetch_funding_rate': 'market_data',
+    'create_order': 'trading',
+    'create_orders': 'trading',
+    'create_market_buy_order': 'trading',
+    'create_market_sell_order': 'trading',
+    'create_limit_buy_order': 'trading',
+    'create_limit_sell_order': 'trading',
+    'edit_order': 'trading',
+    'cancel_order': 'trading',
+    'cancel_orders': 'trading',
+    'cancel_all_orders': 'trading',
+    'set_leverage': 'trading',
+    'fetch_balance': 'account',
+    'fetch_positions': 'account',
+    'fetch_order': 'account',
+    'fetch_open_orders': 'account',
+    'fetch_closed_orders': 'account',
+    'fetch_my_trades': 'account',
+}
+
+ENDPOINT_WEIGHTS = {
+    'load_markets': 5,
+    'fetch_markets': 5,
+    'fetch_tickers': 5,
+    'fetch_closed_orders': 2,
+}
+
+# lower runs first: order placement and cancels never wait behind bulk data downloads
+CLASS_PRIORITIES = {'trading': 0, 'account': 1, 'market_data': 2}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost, now):
+        """Seconds until ``cost`` tokens are available (0 when they are available now)."""
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def consume(self, cost):
+        self.tokens -= cost
+
+    def pause(self, seconds):
+        # no tokens accrue while paused
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.updated = max(self.updated, self.paused_until)
+        self.tokens = 0.0
+
+
+class RequestScheduler:
+    """Token-bucket request scheduler with per-endpoint-class buckets and priority lanes.
+
+    Every request needs tokens from its class bucket (market data, trading,
+    account) and from a global bucket. Waiters are served in priority order;
+    once the highest-priority waiter is short of global tokens, lower
+    priorities wait too, so a burst of kline downloads cannot starve orders.
+    """
+
+    def __init__(self, global_rate, class_rates):
+        self.global_bucket = TokenBucket(global_rate)
+        self.buckets = {endpoint_class: TokenBucket(rate) for endpoint_class, rate in class_rates.items()}
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._dispatcher = None
+
+    @classmethod
+    def from_config(cls, config):
+        global_rate = config.get('rate_limit', 10)
+        class_rates = {'market_data': global_rate, 'trading': global_rate, 'account': global_rate}
+        class_rates.update(config.get('rate_limits', {}))
+        return cls(global_rate, class_rates)
+
+    async def acquire(self, endpoint_class, cost=1, priority=None):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        if priority is None:
+            priority = CLASS_PRIORITIES.get(endpoint_class, len(CLASS_PRIORITIES))
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), endpoint_class, cost, future))
+        self._wakeup.set()
+        await future
+
+    async def _dispatch(self):
+        while True:
+            now = time.monotonic()
+            delay = None
+            global_blocked = False
+            deferred = []
+            while self._waiters:
+                waiter = heapq.heappop(self._waiters)
+                _, _, endpoint_class, cost, future = waiter
+                if future.done():
+                    continue
+                if global_blocked:
+                    deferred.append(waiter)
+                    continue
+                wait = self.buckets[endpoint_class].wait_time(cost, now)
+                if wait == 0:
+                    wait = self.global_bucket.wait_time(cost, now)
+                    global_blocked = wait > 0
+                if wait > 0:
+                    deferred.append(waiter)
+                    delay = wait if delay is None else min(delay, wait)
+                    continue
+                self.buckets[endpoint_class].consume(cost)
+                self.global_bucket.consume(cost)
+                future.set_result(None)
+            for waiter in deferred:
+                heapq.heappush(self._waiters, waiter)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def observe_headers(self, endpoint_class, headers):
+        """Pause a class when the exchange reports its rate-limit window is used up."""
+        if not headers:
+            return
+        headers = {key.lower(): value for key, value in headers.items()}
+        remaining = headers.get('x-bapi-limit-status')
+        reset = headers.get('x-bapi-limit-reset-timestamp')
+        if remaining is None or reset is None:
+            return
+        if int(remaining) <= 1:
+            seconds = min(max(int(reset) / 1000 - time.time(), 0.0), 60.0)
+            logging.warning(f"Exchange rate limit nearly exhausted for {endpoint_class}, pausing {seconds:.2f}s")
+            self.buckets[endpoint_class].pause(seconds)
+
+    def backoff(self, endpoint_class, seconds=1.0):
+        self.buckets[endpoint_class].pause(seconds)
+
+
+class RateLimitedExchange:
+    """Drop-in wrapper that routes every exchange call through a RequestScheduler.
+
+    Attribute reads and writes pass through to the wrapped exchange, so code
+    holding ``exchange`` does not need to know it is wrapped.
+    """
+
+    def __init__(self, exchange, scheduler):
+        object.__setattr__(self, '_exchange', exchange)
+        object.__setattr__(self, '_scheduler', scheduler)
+        # throttling is done here; ccxt's own limiter would only add a second queue
+        exchange.enableRateLimit = False
+
+    def __setattr__(self, name, value):
+        setattr(self._exchange, name, value)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._exchange, name)
+        endpoint_class = ENDPOINT_CLASSES.get(name)
+        if endpoint_class is None or not callable(attribute):
+            return attribute
+
+        async def call(*args, **kwargs):
+            with metrics.span('rate_limit_wait_seconds', endpoint_class=endpoint_class):
+                await self._scheduler.acquire(endpoint_class, ENDPOINT_WEIGHTS.get(name, 1))
+            try:
+                with metrics.span('exchange_request_seconds', method=name):
+                    result = attribute(*args, **kwargs)
+                    if inspect.isawaitable(result):
+                        result = await result
+                return result
+            except (ccxt.RateLimitExceeded, ccxt.DDoSProtection) as e:
+                metrics.increment('exchange_errors_total', method=name, error=type(e).__name__)
+                self._scheduler.backoff(endpoint_class)
+                raise
+            except Exception as e:
+                metrics.increment('exchange_errors_total', method=name, error=type(e).__name__)
+                raise
+            finally:
+                self._scheduler.observe_headers(endpoint_class, getattr(self._exchange, 'last_response_headers', None))
+
+        return call
@@ -1,10 +1,10 @@
 import numpy as np
 from scipy.stats import norm
-from typing import Dict, List
+from typing import Dict
 
 
 class DynamicRiskManagement:
-    def __init__(self, config):
+    def __init__(self, config, correlation_engine=None):
         self.initial_risk_per_trade = config['risk_per_trade']
         self.max_risk_per_trade = config['max_risk_per_trade']
         self.lookback_period = config['lookback_period']
@@ -12,6 +12,14 @@ class DynamicRiskManagement:
         self.trade_history = []
         self.var_confidence = config['var_confidence']
         self.max_position_size = config['max_position_size']
+        self.correlation_engine = correlation_engine
+        self.volatilities = {}
+
+    def observe(self, symbol, closes) -> None:
+        """Record a symbol's return volatility and feed its closes to the correlation engine, if there is one."""
+        self.volatilities[symbol] = closes.pct_change().std()
+        if self.correlation_engine is not None:
+            self.correlation_engine.observe(symbol, closes)
 
     def update_risk_parameters(self, market_volatility: float) -> None:
         recent_performance = self.calculate_recent_performance()
@@ -54,27 +62,41 @@ class DynamicRiskManagement:
         return position_size
 
     def adjust_for_correlation(self, position_size: float, symbol: str, current_positions: Dict[str, Dict],
-                               correlation_matrix: Dict[str, Dict[str, float]]) -> float:
-        if not current_positions or symbol not in correlation_matrix:
+                               correlation_matrix: Dict[str, Dict[str, float]] = None) -> float:
+        if correlation_matrix is None and self.correlation_engine is not None:
+            correlations = self.correlation_engine.correlations(symbol)
+        else:
+            correlations = (correlation_matrix or {}).get(symbol)
+        if not current_positions or not correlations:
             return position_size
 
-        total_correlation = sum(correlation_matrix[symbol].get(pos_symbol, 0) for pos_symbol in current_positions)
+        total_correlation = sum(correlations.get(pos_symbol, 0) for pos_symbol in current_positions)
         avg_correlation = total_correlation / len(current_positions)
 
-        correlation_factor = 1 - avg_correlation
+        # negatively correlated positions do not license a size above the risk budget
+        correlation_factor = min(max(1 - avg_correlation, 0.0), 1.0)
         return position_size * correlation_factor
 
-    def calculate_var(self, positions: Dict[str, Dict], volatilities: List[float]) -> float:
+    def calculate_var(self, positions: Dict[str, Dict]) -> float:
         if not positions:
             return 0.0
 
+        engine = self.correlation_engine
+        if engine is not None and engine.seeded and all(symbol in engine.index for symbol in positions):
+            # parametric VaR over one engine update interval: z * sqrt(w' S w) with signed exposures w
+            exposures = np.array([(-1 if pos.get('side') == 'sell' else 1) * pos['size'] * pos['entry_price']
+                                  for pos in positions.values()])
+            variance = exposures @ engine.covariance(list(positions)) @ exposures
+            return norm.ppf(1 - self.var_confidence) * np.sqrt(max(variance, 0.0))
+
         portfolio_value = sum(pos['size'] * pos['entry_price'] for pos in positions.values())
 
         if portfolio_value == 0:
             return 0.0
 
-        weighted_volatility = sum((pos['size'] * pos['entry_price'] * vol) / portfolio_value
-                                  for pos, vol in zip(positions.values(), volatilities))
+        # each position at the volatility of its own symbol's closes; unobserved symbols add none
+        weighted_volatility = sum((pos['size'] * pos['entry_price'] * self.volatilities.get(symbol, 0.0))
+                                  / portfolio_value for symbol, pos in positions.items())
 
         var = portfolio_value * norm.ppf(1 - self.var_confidence) * weighted_volatility
         return var
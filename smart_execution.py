@@ -3,13 +3,19 @@ import numpy as np
 import time
 
 class SmartExecutionAlgorithm:
-    def __init__(self, exchange, symbol, total_quantity, time_window):
+    def __init__(self, exchange, symbol, total_quantity, time_window, interval=60, lookback=60):
         self.exchange = exchange
         self.symbol = symbol
         self.total_quantity = total_quantity
         self.time_window = time_window
+        self.interval = interval
+        self.lookback = lookback
         self.executed_quantity = 0
         self.start_time = time.time()
+        self.side = 'buy'
+        self.reduce_only = False
+        self.orders = []
+        self._candles = None
 
     async def vwap_execution(self):
         interval = self.time_window / 10
@@ -37,7 +43,15 @@ class SmartExecutionAlgorithm:
             await self._place_order(quantity_per_interval)
             await asyncio.sleep(interval)
 
-    async def adaptive_execution(self):
+    async def adaptive_execution(self, side='buy', reduce_only=False):
+        """Work ``total_quantity`` on ``side`` in slices sized by recent volume and volatility.
+
+        Slices go out every ``interval`` seconds; whatever is left when
+        ``time_window`` has passed is sent at once, so a zero window is a
+        single market order. Returns the orders placed.
+        """
+        self.side = side
+        self.reduce_only = reduce_only
         while self.executed_quantity < self.total_quantity:
             current_time = time.time()
             elapsed_time = current_time - self.start_time
@@ -50,33 +64,40 @@ class SmartExecutionAlgorithm:
             market_volatility = await self._get_market_volatility()
 
             quantity_to_execute = self._calculate_adaptive_quantity(market_volume, market_volatility)
-            await self._place_order(quantity_to_execute)
+            await self._place_order(min(quantity_to_execute, self.total_quantity - self.executed_quantity))
 
-            await asyncio.sleep(60)
+            await asyncio.sleep(self.interval)
+        return self.orders
 
     async def _place_order(self, quantity):
         try:
-            order = await self.exchange.create_market_buy_order(self.symbol, quantity)
+            params = {'reduceOnly': True} if self.reduce_only else {}
+            order = await self.exchange.create_order(self.symbol, 'market', self.side, quantity, None, params)
             self.executed_quantity += quantity
+            self.orders.append(order)
             print(f"Executed {quantity} at {order['price']}")
         except Exception as e:
             print(f"Error placing order: {e}")
 
     async def _get_market_volume(self):
-        pass
+        candles = await self.exchange.fetch_ohlcv(self.symbol, '1m', limit=self.lookback)
+        self._candles = np.array(candles, dtype=float)
+        return self._candles[-1, 5]
 
     async def _get_market_volatility(self):
-        pass
+        # the candles fetched with the volume; the last ten minutes against the whole lookback
+        return np.diff(np.log(self._candles[-11:, 4])).std()
 
     def _calculate_adaptive_quantity(self, volume, volatility):
-        base_quantity = self.total_quantity / (self.time_window / 60)  
-        volume_factor = volume / self._get_average_volume()
-        volatility_factor = self._get_average_volatility() / volatility
+        base_quantity = self.total_quantity / max(self.time_window / self.interval, 1)
+        average_volume = self._get_average_volume()
+        volume_factor = volume / average_volume if average_volume > 0 else 1.0
+        volatility_factor = self._get_average_volatility() / volatility if volatility > 0 else 1.0
 
         return base_quantity * volume_factor * volatility_factor
 
     def _get_average_volume(self):
-        pass
+        return self._candles[:, 5].mean()
 
     def _get_average_volatility(self):
-        pass
+        return np.diff(np.log(self._candles[:, 4])).std()
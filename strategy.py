@@ -15,6 +15,17 @@ class Strategy:
         elif self.strategy_type == 'breakout':
             return self._breakout_strategy(df, order_book_analysis, market_sentiment, ml_prediction, market_regime)
 
+    def signal_frame(self, df):
+        """Signals for every row of ``df`` at once, used by the vectorized backtester.
+
+        Strategies that can compute their signals over a whole frame return a
+        DataFrame indexed like ``df`` with a ``position`` column (1 long, -1
+        short, 0 flat, NaN keep) and optional ``stop_loss``/``take_profit``
+        columns. The default None makes the backtester replay
+        ``generate_signals`` bar by bar instead.
+        """
+        return None
+
     def _momentum_strategy(self, df, order_book_analysis, market_sentiment, ml_prediction, market_regime):
         pass
 
@@ -0,0 +1,227 @@
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class SMA:
+    """Simple moving average, matches ``Series.rolling(period).mean()``."""
+
+    def __init__(self, period):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, x):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self.value = self.total / self.period if len(self.window) == self.period else NAN
+        return self.value
+
+    def peek(self, x):
+        if len(self.window) + 1 < self.period:
+            return NAN
+        total = self.total + x
+        if len(self.window) == self.period:
+            total -= self.window[0]
+        return total / self.period
+
+
+class EMA:
+    """Exponential moving average, matches ``Series.ewm(span=span, adjust=False).mean()``."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.value = NAN
+
+    def update(self, x):
+        self.value = self.peek(x)
+        return self.value
+
+    def peek(self, x):
+        if math.isnan(self.value):
+            return x
+        return self.value + self.alpha * (x - self.value)
+
+
+class RollingMax:
+    """Rolling maximum over a monotonic deque, matches ``Series.rolling(period).max()``."""
+
+    def __init__(self, period):
+        self.period = period
+        self.count = 0
+        self.candidates = deque()
+        self.value = NAN
+
+    def update(self, x):
+        while self.candidates and self.candidates[-1][1] <= x:
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        self.count += 1
+        if self.candidates[0][0] <= self.count - 1 - self.period:
+            self.candidates.popleft()
+        self.value = self.candidates[0][1] if self.count >= self.period else NAN
+        return self.value
+
+    def peek(self, x):
+        if self.count + 1 < self.period:
+            return NAN
+        best = x
+        for index, value in self.candidates:
+            # candidates are sorted by index, and only the front one can fall out of the window
+            if index > self.count - self.period:
+                best = max(best, value)
+                break
+        return best
+
+
+class ATR:
+    """Average true range, matches ``Indicators.calculate_atr``."""
+
+    def __init__(self, period=14):
+        self.sma = SMA(period)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def _true_range(self, high, low):
+        if math.isnan(self.prev_close):
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update(self, high, low, close):
+        self.value = self.sma.update(self._true_range(high, low))
+        self.prev_close = close
+        return self.value
+
+    def peek(self, high, low, close):
+        return self.sma.peek(self._true_range(high, low))
+
+
+class RSI:
+    """Simple-average RSI, matches ``EnhancedMLPredictor._calculate_rsi``."""
+
+    def __init__(self, period=14):
+        self.gain = SMA(period)
+        self.loss = SMA(period)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def _moves(self, close):
+        if math.isnan(self.prev_close):
+            return 0.0, 0.0
+        delta = close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    @staticmethod
+    def _rsi(gain, loss):
+        if math.isnan(gain) or math.isnan(loss):
+            return NAN
+        if loss == 0:
+            return 100.0 if gain > 0 else NAN
+        return 100 - (100 / (1 + gain / loss))
+
+    def update(self, close):
+        gain, loss = self._moves(close)
+        self.value = self._rsi(self.gain.update(gain), self.loss.update(loss))
+        self.prev_close = close
+        return self.value
+
+    def peek(self, close):
+        gain, loss = self._moves(close)
+        return self._rsi(self.gain.peek(gain), self.loss.peek(loss))
+
+
+class MACD:
+    """MACD histogram (MACD minus signal line), matches ``EnhancedMLPredictor._calculate_macd``."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = NAN
+
+    def update(self, close):
+        macd = self.fast.update(close) - self.slow.update(close)
+        self.value = macd - self.signal.update(macd)
+        return self.value
+
+    def peek(self, close):
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        return macd - self.signal.peek(macd)
+
+
+class ChandelierExit:
+    """Highest high minus ATR multiple, matches ``Indicators.chandelier_exit``."""
+
+    def __init__(self, atr_period=14, multiplier=3.0):
+        self.highest_high = RollingMax(atr_period)
+        self.multiplier = multiplier
+        self.value = NAN
+
+    def update(self, high, atr):
+        self.value = self.highest_high.update(high) - atr * self.multiplier
+        return self.value
+
+    def peek(self, high, atr):
+        return self.highest_high.peek(high) - atr * self.multiplier
+
+
+class IndicatorEngine:
+    """Incremental indicator state for one symbol.
+
+    Closed candles are committed once; the newest candle is treated as still
+    open and only peeked at, so revisions to it never have to be undone.
+    Each call therefore costs O(new candles), independent of history length.
+    """
+
+    def __init__(self, atr_period=14, ma_period=50, multiplier=3.0, rsi_period=14):
+        self.params = (atr_period, ma_period, multiplier, rsi_period)
+        self._reset()
+
+    def _reset(self):
+        atr_period, ma_period, multiplier, rsi_period = self.params
+        self.atr = ATR(atr_period)
+        self.moving_average = SMA(ma_period)
+        self.chandelier = ChandelierExit(atr_period, multiplier)
+        self.rsi = RSI(rsi_period)
+        self.macd = MACD()
+        self.last_committed = None
+
+    def seed(self, df):
+        self._reset()
+        return self.update(df)
+
+    def _commit(self, high, low, close):
+        atr = self.atr.update(high, low, close)
+        self.moving_average.update(close)
+        self.chandelier.update(high, atr)
+        self.rsi.update(close)
+        self.macd.update(close)
+
+    def update(self, df):
+        index = df.index
+        if self.last_committed is not None and index[0] > self.last_committed:
+            # history no longer overlaps what was committed; start again from this frame
+            self._reset()
+
+        start = 0 if self.last_committed is None else index.searchsorted(self.last_committed, side='right')
+        highs = df['high'].values
+        lows = df['low'].values
+        closes = df['close'].values
+        for i in range(start, len(df) - 1):
+            self._commit(highs[i], lows[i], closes[i])
+        if len(df) > 1 and start < len(df) - 1:
+            self.last_committed = index[-2]
+
+        high, low, close = highs[-1], lows[-1], closes[-1]
+        atr = self.atr.peek(high, low, close)
+        return {
+            'atr': atr,
+            'moving_average': self.moving_average.peek(close),
+            'chandelier_exit': self.chandelier.peek(high, atr),
+            'rsi': self.rsi.peek(close),
+            'macd': self.macd.peek(close),
+        }
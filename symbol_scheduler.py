@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from instrumentation import metrics
+
+
+class SymbolScheduler:
+    """Runs one pass over every symbol per period, aligned to candle closes.
+
+    Cycles start ``close_delay`` seconds after each multiple of ``period``
+    since the epoch, so with a period equal to the candle timeframe every pass
+    sees a freshly closed candle. Symbols with open positions start at once;
+    the rest are spread evenly over ``stagger`` seconds to smooth the API
+    load. A symbol that runs past ``deadline`` is cancelled, unless it is
+    inside a protected stage such as order placement, in which case it is
+    left to finish and skipped by the next cycle. ``stage_limits`` bounds how
+    many symbols are inside each stage at once.
+    """
+
+    def __init__(self, symbols, period, close_delay=1.0, stagger=0.0, deadline=None, stage_limits=None, clock=None):
+        self.symbols = list(symbols)
+        self.period = period
+        self.close_delay = close_delay
+        self.stagger = stagger
+        self.deadline = deadline
+        self.limits = {stage: asyncio.Semaphore(limit) for stage, limit in (stage_limits or {}).items()}
+        self.clock = clock
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._running = {}
+        self._protected = set()
+        if deadline is not None and stagger + deadline > period:
+            logging.warning(f"Scheduler stagger ({stagger}s) plus deadline ({deadline}s) exceeds the "
+                            f"{period}s period; late symbols may overlap the next cycle")
+
+    @classmethod
+    def from_config(cls, symbols, config, period, clock=None):
+        return cls(symbols, period,
+                   close_delay=config.get('close_delay', 1.0),
+                   stagger=config.get('stagger', 0.0),
+                   deadline=config.get('deadline'),
+                   stage_limits=config.get('stage_limits'),
+                   clock=clock)
+
+    def _now(self):
+        return self.clock.now_ms() / 1000 if self.clock is not None else time.time()
+
+    def next_wakeup(self, now=None):
+        """Time of the next period boundary plus ``close_delay``, in exchange seconds."""
+        now = self._now() if now is None else now
+        return (now - self.close_delay) // self.period * self.period + self.period + self.close_delay
+
+    async def wait_for_boundary(self):
+        await asyncio.sleep(max(self.next_wakeup() - self._now(), 0.0))
+
+    @asynccontextmanager
+    async def stage(self, name, symbol=None, protect=False):
+        """Hold a slot of stage ``name``; a protected symbol is not cancelled at its deadline meanwhile."""
+        semaphore = self.limits.get(name)
+        if semaphore is not None:
+            with metrics.span('scheduler_stage_wait_seconds', stage=name):
+                await semaphore.acquire()
+        if protect:
+            self._protected.add(symbol)
+        try:
+            yield
+        finally:
+            if protect:
+                self._protected.discard(symbol)
+            if semaphore is not None:
+                semaphore.release()
+
+    async def run_cycle(self, process, priority=()):
+        """Run ``process(symbol)`` for every symbol and return once each has finished or hit its deadline."""
+        for symbol, task in list(self._running.items()):
+            if task.done():
+                del self._running[symbol]
+        if self._running:
+            self.skipped += len(self._running)
+            logging.warning(f"Skipping symbols still busy from the previous cycle: {', '.join(self._running)}")
+
+        symbols = [symbol for symbol in self.symbols if symbol not in self._running]
+        urgent = [symbol for symbol in symbols if symbol in priority]
+        rest = [symbol for symbol in symbols if symbol not in priority]
+        spacing = self.stagger / len(rest) if rest else 0.0
+        jobs = [self._run_symbol(process, symbol, 0.0) for symbol in urgent]
+        jobs += [self._run_symbol(process, symbol, i * spacing) for i, symbol in enumerate(rest)]
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for symbol, result in zip(urgent + rest, results):
+            if isinstance(result, Exception):
+                logging.error(f"Unhandled error processing {symbol}: {result}")
+        self.cycles += 1
+
+    async def _run_symbol(self, process, symbol, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(process(symbol))
+        done, _ = await asyncio.wait({task}, timeout=self.deadline)
+        if done:
+            return task.result()
+
+        self.overruns += 1
+        metrics.increment('symbol_deadline_exceeded_total')
+        if symbol in self._protected:
+            logging.warning(f"{symbol} passed its {self.deadline}s deadline while placing orders, letting it finish")
+            self._running[symbol] = task
+        else:
+            logging.warning(f"{symbol} passed its {self.deadline}s deadline, cancelling")
+            task.cancel()
+
+    def summary(self):
+        return {
+            'cycles': self.cycles,
+            'deadline_overruns': self.overruns,
+            'skipped': self.skipped,
+            'in_flight': len(self._running),
+            'next_wakeup_in_s': self.next_wakeup() - self._now(),
+        }
@@ -0,0 +1,148 @@
+"""Candle cache consistency while klines are streamed, offline against MockStreamServer."""
+import asyncio
+import time
+import numpy as np
+from data_fetcher import DataFetcher
+from market_stream import MarketDataStream
+from mock_stream_server import MockStreamServer
+from ohlcv_cache import OHLCVCache
+
+SYMBOL = 'BTC/USDT:USDT'
+MINUTE = 60000
+
+
+def current_minute():
+    now = int(time.time() * 1000)
+    return now - now % MINUTE
+
+
+def candle(timestamp):
+    return [timestamp, 100.0, 101.0, 99.0, 100.0, 1.0]
+
+
+class CandleExchange:
+    """REST side: one-minute candles from ``start`` up to the current minute, paged like ccxt."""
+
+    def __init__(self, start):
+        self.start = start
+
+    async def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None):
+        stamps = range(self.start, current_minute() + MINUTE, MINUTE)
+        if since is None:
+            stamps = stamps[-limit:]
+        else:
+            stamps = [t for t in stamps if t >= since][:limit]
+        return [candle(t) for t in stamps]
+
+
+def assert_contiguous(cache):
+    timestamps = np.array(cache.read_arrays(SYMBOL, '1m')['timestamp'])
+    assert len(timestamps) > 1
+    assert np.all(np.diff(timestamps) == MINUTE)
+
+
+async def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.01)
+
+
+def make_fetcher(tmp_path, start):
+    return DataFetcher(CandleExchange(start), {'timeframe': '1m', 'limit': 50, 'cache_dir': str(tmp_path)})
+
+
+def test_reconnect_and_stale_cache_leave_no_gaps(tmp_path):
+    async def scenario():
+        minute = current_minute()
+        start = minute - 200 * MINUTE
+        stale_end = minute - 30 * MINUTE
+        cache = OHLCVCache(str(tmp_path))
+        # a cache left behind by an earlier run, half an hour out of date
+        cache.update(SYMBOL, '1m', [candle(t) for t in range(start, stale_end, MINUTE)])
+
+        server = MockStreamServer(tick_interval=0.02)
+        url = await server.start()
+        stream = MarketDataStream([SYMBOL], {'url': url, 'ping_interval': 1, 'reconnect_delay': 0.05}, '1m')
+        fetcher = make_fetcher(tmp_path, start)
+        fetcher.attach_stream(stream)
+        await stream.start()
+        try:
+            await wait_until(lambda: stream.is_live(SYMBOL))
+            await asyncio.sleep(0.2)
+            # streamed candles are held off until REST has filled the gap behind them
+            assert cache.last_timestamp(SYMBOL, '1m') == stale_end - MINUTE
+
+            await fetcher.fetch_historical_data(SYMBOL)
+            assert fetcher._stream_is_current(SYMBOL)
+            assert_contiguous(cache)
+            assert cache.last_timestamp(SYMBOL, '1m') >= minute
+
+            epoch = stream.connection_epochs[SYMBOL]
+            await server.drop_connections()
+            await wait_until(lambda: stream.connection_epochs[SYMBOL] > epoch and stream.is_live(SYMBOL))
+            assert not fetcher._stream_is_current(SYMBOL)
+
+            await fetcher.fetch_historical_data(SYMBOL)
+            assert fetcher._stream_is_current(SYMBOL)
+            await asyncio.sleep(0.2)
+            assert_contiguous(cache)
+        finally:
+            for task in fetcher._stream_tasks:
+                task.cancel()
+            await stream.stop()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_empty_cache_gets_full_history(tmp_path):
+    async def scenario():
+        server = MockStreamServer(tick_interval=0.02)
+        url = await server.start()
+        stream = MarketDataStream([SYMBOL], {'url': url, 'ping_interval': 1}, '1m')
+        fetcher = make_fetcher(tmp_path, current_minute() - 500 * MINUTE)
+        fetcher.attach_stream(stream)
+        await stream.start()
+        try:
+            await wait_until(lambda: stream.is_live(SYMBOL))
+            await asyncio.sleep(0.2)
+            df = await fetcher.fetch_historical_data(SYMBOL)
+            assert len(df) == 50
+            assert_contiguous(OHLCVCache(str(tmp_path)))
+        finally:
+            for task in fetcher._stream_tasks:
+                task.cancel()
+            await stream.stop()
+            await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_updates_lost_on_overflow_force_a_resync(tmp_path):
+    async def scenario():
+        stream = MarketDataStream([SYMBOL], {'queue_size': 1}, '1m')
+        fetcher = make_fetcher(tmp_path, current_minute() - 100 * MINUTE)
+        fetcher.attach_stream(stream)
+        stream.connection_epochs[SYMBOL] = 1
+        stream.connected.add(SYMBOL)
+        try:
+            await fetcher.fetch_historical_data(SYMBOL)
+            assert fetcher._stream_is_current(SYMBOL)
+
+            update = {'channel': 'kline', 'symbol': SYMBOL, 'candles': [candle(current_minute())]}
+            stream._publish('kline', dict(update))
+            await asyncio.sleep(0.01)
+            # the consumer is not scheduled in between, so the queue of one overflows twice
+            for _ in range(3):
+                stream._publish('kline', dict(update))
+            await asyncio.sleep(0.01)
+            assert not fetcher._stream_is_current(SYMBOL)
+
+            await fetcher.fetch_historical_data(SYMBOL)
+            assert fetcher._stream_is_current(SYMBOL)
+        finally:
+            for task in fetcher._stream_tasks:
+                task.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,229 @@
+"""Matching engine behaviour and bracket handling of the paper-trading simulator."""
+import asyncio
+import ccxt
+import pytest
+from advanced_order_types import AdvancedOrderTypes
+from exchange_simulator import MatchingEngine, SimulatedExchange
+from execution import Execution
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def resting(order_id, side, price, amount, owner='user'):
+    return {'id': order_id, 'side': side, 'price': price, 'remaining': amount, 'owner': owner}
+
+
+def fills(engine, side, amount, limit=None):
+    return [(maker['id'], quantity, price) for maker, quantity, price in engine.match(side, amount, limit)]
+
+
+def test_best_price_first_then_oldest_order():
+    engine = MatchingEngine()
+    for order in (resting('a', 'sell', 101.0, 2.0), resting('b', 'sell', 100.0, 1.0),
+                  resting('c', 'sell', 100.0, 1.0)):
+        engine.rest(order)
+
+    assert fills(engine, 'buy', 3.0, 101.0) == [('b', 1.0, 100.0), ('c', 1.0, 100.0), ('a', 1.0, 101.0)]
+    assert engine.best('sell') == 101.0
+    assert engine.depth('sell', 5) == [[101.0, 1.0]]
+
+
+def test_bids_fill_from_the_highest_price():
+    engine = MatchingEngine()
+    for order in (resting('a', 'buy', 99.0, 1.0), resting('b', 'buy', 100.0, 1.0)):
+        engine.rest(order)
+
+    assert fills(engine, 'sell', 2.0) == [('b', 1.0, 100.0), ('a', 1.0, 99.0)]
+    assert engine.best('buy') is None
+
+
+def test_partial_fill_keeps_the_rest_of_the_maker_at_the_front():
+    engine = MatchingEngine()
+    first, second = resting('a', 'sell', 100.0, 3.0), resting('b', 'sell', 100.0, 1.0)
+    engine.rest(first)
+    engine.rest(second)
+
+    assert fills(engine, 'buy', 1.0) == [('a', 1.0, 100.0)]
+    assert first['remaining'] == pytest.approx(2.0)
+    assert fills(engine, 'buy', 2.5) == [('a', 2.0, 100.0), ('b', 0.5, 100.0)]
+    assert second['remaining'] == pytest.approx(0.5)
+
+
+def test_limit_stops_matching_and_leaves_the_remainder_unfilled():
+    engine = MatchingEngine()
+    engine.rest(resting('a', 'sell', 100.0, 1.0))
+    engine.rest(resting('b', 'sell', 102.0, 1.0))
+
+    assert fills(engine, 'buy', 5.0, 101.0) == [('a', 1.0, 100.0)]
+    assert engine.depth('sell', 5) == [[102.0, 1.0]]
+    assert fills(engine, 'buy', 1.0, 101.0) == []
+
+
+def test_iceberg_shows_one_slice_and_requeues_behind_the_level():
+    engine = MatchingEngine()
+    iceberg = dict(resting('a', 'sell', 100.0, 1.0), visible=1.0, hidden=2.0)
+    engine.rest(iceberg)
+    engine.rest(resting('b', 'sell', 100.0, 1.0))
+    assert engine.depth('sell', 5) == [[100.0, 2.0]]
+
+    assert fills(engine, 'buy', 2.5) == [('a', 1.0, 100.0), ('b', 1.0, 100.0), ('a', 0.5, 100.0)]
+    assert iceberg['remaining'] == pytest.approx(0.5)
+    assert iceberg['hidden'] == pytest.approx(1.0)
+    assert engine.depth('sell', 5) == [[100.0, 0.5]]
+
+
+def test_cancel_removes_the_order_and_empty_levels():
+    engine = MatchingEngine()
+    first, second = resting('a', 'sell', 100.0, 1.0), resting('b', 'sell', 100.0, 1.0)
+    engine.rest(first)
+    engine.rest(second)
+
+    assert engine.cancel(first)
+    assert not engine.cancel(first)
+    assert fills(engine, 'buy', 1.0) == [('b', 1.0, 100.0)]
+    assert engine.best('sell') is None
+    assert engine.prices['sell'] == []
+
+
+def make_exchange():
+    return SimulatedExchange([SYMBOL], initial_balance=1_000_000, initial_prices={SYMBOL: 100.0})
+
+
+def move_to(exchange, price):
+    exchange.mids[SYMBOL] = price
+    exchange._quote(SYMBOL)
+    exchange._trigger(SYMBOL)
+
+
+@pytest.mark.parametrize('exit_price, fired, canceled', [(106.0, 'takeProfit', 'stopLoss'),
+                                                         (94.0, 'stopLoss', 'takeProfit')])
+def test_bracket_leg_closing_cancels_the_other(exit_price, fired, canceled):
+    exchange = make_exchange()
+
+    async def scenario():
+        return await exchange.create_order(SYMBOL, 'market', 'buy', 1.0,
+                                           params={'stopLoss': 95.0, 'takeProfit': 105.0})
+
+    entry = asyncio.run(scenario())
+    assert entry['status'] == 'closed'
+    legs = {order['triggerPrice']: order for order in exchange.conditional[SYMBOL]}
+    assert sorted(legs) == [95.0, 105.0]
+    assert all(order['info']['group'] == entry['id'] and order['reduceOnly'] for order in legs.values())
+    by_key = {'stopLoss': legs[95.0], 'takeProfit': legs[105.0]}
+
+    move_to(exchange, exit_price)
+
+    assert by_key[fired]['status'] == 'closed'
+    assert by_key[canceled]['status'] == 'canceled'
+    assert exchange.conditional[SYMBOL] == []
+    assert exchange.positions[SYMBOL]['size'] == 0.0
+
+
+def test_cancelled_limit_order_leaves_the_book():
+    exchange = make_exchange()
+
+    async def scenario():
+        order = await exchange.create_order(SYMBOL, 'limit', 'buy', 1.0, 90.0)
+        assert order['status'] == 'open'
+        assert order['id'] in exchange._resting
+        return await exchange.cancel_order(order['id'], SYMBOL)
+
+    canceled = asyncio.run(scenario())
+    assert canceled['status'] == 'canceled'
+    assert canceled['id'] not in exchange._resting
+    # the price falling through the old limit fills nothing
+    move_to(exchange, 89.0)
+    assert exchange.orders[canceled['id']]['filled'] == 0.0
+
+
+def test_place_order_attaches_the_bracket_in_one_request():
+    exchange = make_exchange()
+    execution = Execution(exchange, {'risk_management': {'leverage': 2}})
+
+    result = asyncio.run(execution.place_order(SYMBOL, 'buy', 1.0, 100.0, 95.0, 105.0))
+
+    assert result['main_order']['status'] == 'closed'
+    assert exchange.positions[SYMBOL]['size'] == pytest.approx(1.0)
+    assert exchange.leverage[SYMBOL] == 2.0
+    assert sorted(order['triggerPrice'] for order in exchange.conditional[SYMBOL]) == [95.0, 105.0]
+
+
+def test_place_order_without_brackets_places_separate_exit_orders():
+    exchange = make_exchange()
+    execution = Execution(exchange, {'risk_management': {'leverage': 2}, 'execution': {'bracket_orders': False}})
+
+    result = asyncio.run(execution.place_order(SYMBOL, 'buy', 1.0, 100.0, 95.0, 105.0))
+
+    assert result['main_order']['status'] == 'closed'
+    assert result['stop_loss_order']['triggerPrice'] == 95.0
+    assert result['take_profit_order']['id'] in exchange._resting
+    move_to(exchange, 106.0)
+    assert exchange.orders[result['take_profit_order']['id']]['status'] == 'closed'
+    assert exchange.positions[SYMBOL]['size'] == 0.0
+
+
+def open_long(exchange, amount=1.0):
+    asyncio.run(exchange.create_order(SYMBOL, 'market', 'buy', amount))
+
+
+def test_trailing_stop_arms_at_its_trigger_and_fires_on_the_retrace():
+    exchange = make_exchange()
+    open_long(exchange)
+    stop = asyncio.run(AdvancedOrderTypes(exchange).place_trailing_stop(SYMBOL, 1.0, 102.0, 0.01))
+
+    for price in (101.0, 103.0, 104.0, 103.5):
+        move_to(exchange, price)
+        assert exchange.orders[stop['id']]['status'] == 'open'
+    assert exchange.orders[stop['id']]['info']['extreme'] == 104.0
+
+    move_to(exchange, 102.9)
+    assert exchange.orders[stop['id']]['status'] == 'closed'
+    assert exchange.positions[SYMBOL]['size'] == 0.0
+
+
+@pytest.mark.parametrize('exit_price, filled_leg', [(106.0, 'limit'), (94.8, 'stop')])
+def test_oco_leg_filling_cancels_the_other(exit_price, filled_leg):
+    exchange = make_exchange()
+    open_long(exchange)
+    limit = asyncio.run(AdvancedOrderTypes(exchange).place_oco_order(SYMBOL, 1.0, 105.0, 95.0, 94.5))
+    stop, = exchange.conditional[SYMBOL]
+    assert limit['status'] == 'open' and stop['info']['group'] == limit['id']
+
+    move_to(exchange, exit_price)
+
+    legs = {'limit': exchange.orders[limit['id']], 'stop': stop}
+    other = 'stop' if filled_leg == 'limit' else 'limit'
+    assert legs[filled_leg]['status'] == 'closed'
+    assert legs[other]['status'] == 'canceled'
+    assert exchange._resting == {} and exchange.conditional[SYMBOL] == []
+    assert exchange.positions[SYMBOL]['size'] == 0.0
+
+
+def test_iceberg_rests_one_slice_at_a_time():
+    exchange = make_exchange()
+    order = asyncio.run(AdvancedOrderTypes(exchange).place_iceberg_order(SYMBOL, 'sell', 3.0, 101.0, 1.0))
+    assert order['status'] == 'open'
+    assert [101.0, 1.0] in exchange.engines[SYMBOL].depth('sell', 50)
+
+    # bids re-quoted above the order take every slice in turn
+    move_to(exchange, 102.0)
+    assert exchange.orders[order['id']]['status'] == 'closed'
+    assert exchange.orders[order['id']]['filled'] == pytest.approx(3.0)
+
+
+def test_twap_takes_liquidity_evenly_over_its_duration():
+    exchange = make_exchange()
+    order = asyncio.run(AdvancedOrderTypes(exchange).place_twap_order(SYMBOL, 'buy', 3.0, 30))
+    assert order['status'] == 'open' and order['filled'] == 0.0
+
+    for expected in (1.0, 2.0, 3.0):
+        exchange.tick(10)
+        assert exchange.orders[order['id']]['filled'] == pytest.approx(expected)
+    assert exchange.orders[order['id']]['status'] == 'closed'
+    assert exchange.twaps[SYMBOL] == []
+
+
+def test_unknown_order_types_are_rejected():
+    exchange = make_exchange()
+    with pytest.raises(ccxt.InvalidOrder):
+        asyncio.run(exchange.create_order(SYMBOL, 'fill_or_kill', 'buy', 1.0, 100.0))
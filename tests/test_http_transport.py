@@ -0,0 +1,79 @@
+"""Connection reuse and request timings of HTTPTransport, offline against MockRESTServer."""
+import asyncio
+from http_transport import HTTPTransport
+from mock_http_server import MockRESTServer
+
+
+async def get(transport, url):
+    async with transport.create_session().get(url) as response:
+        assert response.status == 200
+        return await response.json()
+
+
+def test_sequential_requests_share_one_connection():
+    async def scenario():
+        server = MockRESTServer()
+        url = await server.start()
+        transport = HTTPTransport()
+        try:
+            for _ in range(20):
+                body = await get(transport, f"{url}/v5/market/time")
+                assert body['retCode'] == 0
+        finally:
+            await transport.close()
+            await server.stop()
+        return server, transport
+
+    server, transport = asyncio.run(scenario())
+    assert server.requests == 20
+    assert server.connections == 1
+    summary = transport.summary()
+    assert summary['requests'] == 20
+    assert summary['reused_pct'] == 95.0
+
+
+def test_concurrent_requests_stay_within_the_per_host_limit():
+    async def scenario():
+        server = MockRESTServer(latency=0.01)
+        url = await server.start()
+        transport = HTTPTransport({'limit_per_host': 2})
+        try:
+            await asyncio.gather(*(get(transport, f"{url}/v5/market/orderbook?symbol=BTCUSDT&limit=5")
+                                   for _ in range(20)))
+        finally:
+            await transport.close()
+            await server.stop()
+        return server, transport
+
+    server, transport = asyncio.run(scenario())
+    assert server.connections <= 2
+    assert transport.summary()['reused_pct'] >= 90.0
+
+
+def test_traced_timings_reach_the_summary():
+    async def scenario():
+        server = MockRESTServer(latency=0.005)
+        url = await server.start()
+        transport = HTTPTransport()
+        try:
+            for _ in range(5):
+                await get(transport, f"{url}/v5/market/kline?symbol=BTCUSDT&interval=1&limit=10")
+        finally:
+            await transport.close()
+            await server.stop()
+        return transport
+
+    transport = asyncio.run(scenario())
+    timings = list(transport.timings)
+    assert [timing['path'] for timing in timings] == ['/v5/market/kline'] * 5
+    assert all(timing['status'] == 200 for timing in timings)
+    # only the first request opened a connection, so only it has a connect time
+    assert timings[0]['connect'] is not None and not timings[0]['reused']
+    assert all(timing['connect'] is None and timing['reused'] for timing in timings[1:])
+
+    summary = transport.summary()
+    assert summary['requests'] == 5
+    # the server sleeps before answering, so time to first byte covers that latency
+    assert summary['ttfb_p50_ms'] >= 5
+    assert summary['ttfb_p99_ms'] >= summary['ttfb_p50_ms']
+    assert summary['connect_p50_ms'] is not None and summary['connect_p50_ms'] >= 0
@@ -0,0 +1,35 @@
+"""Channel layout of the public and private streams built on WebSocketStream."""
+import asyncio
+from market_stream import MarketDataStream, PrivateStream
+
+SYMBOL = 'BTC/USDT:USDT'
+
+
+def test_private_stream_carries_only_account_channels():
+    stream = PrivateStream([SYMBOL], {}, 'key', 'secret')
+    assert set(stream.consumers) == {'order', 'execution'}
+    assert stream.topics_for(stream.symbols) == ['order', 'execution']
+    assert not hasattr(stream, 'interval')
+    assert stream.url == 'wss://stream.bybit.com/v5/private'
+
+
+def test_private_order_update_is_normalized_and_sequenced():
+    async def scenario():
+        stream = PrivateStream([SYMBOL], {}, 'key', 'secret')
+        queue = stream.subscribe('order')
+        stream._handle_message({'topic': 'order', 'data': [{
+            'orderId': '42', 'orderLinkId': '', 'symbol': 'BTCUSDT', 'orderType': 'Market', 'side': 'Buy',
+            'orderStatus': 'Filled', 'price': '100', 'qty': '1', 'cumExecQty': '1', 'avgPrice': '100',
+            'updatedTime': '1700000000000'}]})
+        return queue.get_nowait()
+
+    update = asyncio.run(scenario())
+    assert (update['id'], update['symbol'], update['status'], update['side']) == ('42', SYMBOL, 'closed', 'buy')
+    assert update['clientOrderId'] is None
+    assert update['sequence'] == 1
+
+
+def test_market_stream_topics_per_symbol():
+    stream = MarketDataStream([SYMBOL], {'orderbook_depth': 50}, '5m')
+    assert set(stream.consumers) == {'kline', 'orderbook'}
+    assert stream.topics_for(stream.symbols) == ['kline.5.BTCUSDT', 'orderbook.50.BTCUSDT']
@@ -0,0 +1,148 @@
+"""L2OrderBook replay against a dict-of-levels reference, and OrderBookManager resyncs."""
+import asyncio
+from benchmarks.order_book_replay import synthetic_feed
+from order_book import L2OrderBook, OrderBookManager
+
+SYMBOL = 'BTC/USDT:USDT'
+DEPTH = 10
+
+
+def reference_at(messages, last_update_id):
+    """Book state after every message up to ``last_update_id``."""
+    reference = {'bids': {}, 'asks': {}}
+    for kind, bids, asks, update_id in messages:
+        if update_id > last_update_id:
+            break
+        if kind == 'snapshot':
+            reference = {'bids': dict(map(tuple, bids)), 'asks': dict(map(tuple, asks))}
+            continue
+        for levels, name in ((bids, 'bids'), (asks, 'asks')):
+            for price, size in levels:
+                if size == 0:
+                    reference[name].pop(price, None)
+                else:
+                    reference[name][price] = size
+    return reference
+
+
+def assert_matches(book, reference, depth=DEPTH):
+    top = book.top(depth)
+    assert top['bids'] == [list(level) for level in sorted(reference['bids'].items(), reverse=True)[:depth]]
+    assert top['asks'] == [list(level) for level in sorted(reference['asks'].items())[:depth]]
+
+
+def as_update(message):
+    kind, bids, asks, update_id = message
+    return {'symbol': SYMBOL, 'type': kind, 'bids': bids, 'asks': asks, 'update_id': update_id,
+            'seq': update_id, 'ts': None}
+
+
+def test_replay_matches_reference():
+    messages = synthetic_feed(5000, 200)
+    book = L2OrderBook(SYMBOL)
+    reference = {'bids': {}, 'asks': {}}
+    for kind, bids, asks, update_id in messages:
+        if kind == 'snapshot':
+            reference = {'bids': dict(map(tuple, bids)), 'asks': dict(map(tuple, asks))}
+            book.apply_snapshot(bids, asks, update_id)
+        else:
+            for levels, name in ((bids, 'bids'), (asks, 'asks')):
+                for price, size in levels:
+                    if size == 0:
+                        reference[name].pop(price, None)
+                    else:
+                        reference[name][price] = size
+            assert book.apply_delta(bids, asks, update_id)
+        assert_matches(book, reference)
+
+
+def test_gap_and_stale_deltas():
+    messages = synthetic_feed(20, 50)
+    book = L2OrderBook(SYMBOL)
+    for kind, bids, asks, update_id in messages:
+        if kind == 'snapshot':
+            book.apply_snapshot(bids, asks, update_id)
+        else:
+            book.apply_delta(bids, asks, update_id)
+    last = messages[-1][3]
+    # an already applied delta is ignored, a skipped update id is detected
+    assert book.apply_delta([[1.0, 1.0]], [], last)
+    assert_matches(book, reference_at(messages, last))
+    assert not book.apply_delta([], [], last + 2)
+    assert not book.synced
+
+
+def test_snapshot_without_update_id_is_not_synced():
+    _, bids, asks, _ = synthetic_feed(1, 50)[0]
+    book = L2OrderBook(SYMBOL)
+    book.apply_snapshot(bids, asks)
+    assert not book.synced
+    assert not book.apply_delta([], [], 2)
+
+
+class SnapshotExchange:
+    """REST snapshots in ccxt's shape, with the update id only in the raw response, held until released."""
+
+    def __init__(self, messages, update_id):
+        self.messages = messages
+        self.update_id = update_id
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def fetch_order_book(self, symbol, limit=None):
+        self.calls += 1
+        await self.release.wait()
+        reference = reference_at(self.messages, self.update_id if self.update_id is not None else 0)
+        info = {'result': {'u': self.update_id}} if self.update_id is not None else {}
+        return {'symbol': symbol,
+                'bids': [list(level) for level in sorted(reference['bids'].items(), reverse=True)],
+                'asks': [list(level) for level in sorted(reference['asks'].items())],
+                'timestamp': None, 'nonce': None, 'info': info}
+
+
+def resync_scenario(snapshot_update_id):
+    messages = synthetic_feed(200, 50)
+    exchange = SnapshotExchange(messages, snapshot_update_id)
+    manager = OrderBookManager(exchange)
+
+    async def scenario():
+        # messages[i] carries update id i + 1; id 101 is lost
+        for message in messages[:100]:
+            manager.apply(as_update(message))
+        manager.apply(as_update(messages[101]))
+        assert not manager.is_synced(SYMBOL)
+        await asyncio.sleep(0)
+        assert exchange.calls == 1
+        # these arrive while the snapshot is in flight
+        for message in messages[102:150]:
+            manager.apply(as_update(message))
+        exchange.release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+        return manager
+
+    return messages, asyncio.run(scenario())
+
+
+def test_resync_replays_buffered_deltas_over_the_snapshot():
+    messages, manager = resync_scenario(120)
+    book = manager.books[SYMBOL]
+    assert manager.is_synced(SYMBOL)
+    assert manager.resyncs == 1
+    assert book.update_id == 150
+    assert_matches(book, reference_at(messages, 150))
+    for message in messages[150:]:
+        manager.apply(as_update(message))
+    assert_matches(book, reference_at(messages, messages[-1][3]))
+
+
+def test_resync_with_a_stale_snapshot_stays_out_of_sync():
+    _, manager = resync_scenario(90)
+    assert not manager.is_synced(SYMBOL)
+    assert manager.resyncs == 0
+
+
+def test_resync_without_an_update_id_stays_out_of_sync():
+    _, manager = resync_scenario(None)
+    assert not manager.is_synced(SYMBOL)
+    assert manager.resyncs == 0
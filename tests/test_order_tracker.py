@@ -0,0 +1,56 @@
+"""Waiter cleanup and bounded retention of the order tracker."""
+import asyncio
+from order_tracker import OrderTracker
+
+
+class SilentExchange:
+    """REST fake whose orders never show up, so waits end in a failed reconcile."""
+
+    async def fetch_order(self, order_id, symbol):
+        raise RuntimeError('not found')
+
+    async def fetch_open_orders(self, symbol):
+        return []
+
+    async def fetch_closed_orders(self, symbol):
+        return []
+
+
+def test_waiters_are_removed_when_the_wait_ends():
+    tracker = OrderTracker(SilentExchange(), reconcile_timeout=0.01)
+
+    async def scenario():
+        tracker.track({'id': '1', 'status': 'open'})
+        await tracker.wait_for('1', 'BTC/USDT:USDT')
+        assert tracker._waiters == {}
+
+        waiting = asyncio.create_task(tracker.wait_for('1', 'BTC/USDT:USDT', timeout=5))
+        await asyncio.sleep(0)
+        tracker.track({'id': '1', 'status': 'closed'})
+        assert (await waiting)['status'] == 'closed'
+        assert tracker._waiters == {}
+
+        cancelled = asyncio.create_task(tracker.wait_for('2', 'BTC/USDT:USDT', timeout=5))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert tracker._waiters == {}
+
+    asyncio.run(scenario())
+
+
+def test_finished_orders_are_evicted_with_their_fills():
+    tracker = OrderTracker(SilentExchange(), retention=2)
+    tracker.track({'id': 'live', 'clientOrderId': 'c-live', 'status': 'open'})
+    for i in range(4):
+        tracker.on_execution({'order': str(i), 'amount': 1.0})
+        tracker.track({'id': str(i), 'clientOrderId': f"c-{i}", 'status': 'closed'})
+
+    assert set(tracker.orders) == {'live', '2', '3'}
+    assert set(tracker.fills) == {'2', '3'}
+    assert set(tracker.client_ids) == {'c-live', 'c-2', 'c-3'}
+    assert tracker.get(client_order_id='c-0') is None
+
+    # an update repeating a final status does not count twice
+    tracker.track({'id': '3', 'status': 'closed'})
+    assert set(tracker.orders) == {'live', '2', '3'}
@@ -0,0 +1,62 @@
+"""process_symbol opening and closing a position against the exchange simulator."""
+import asyncio
+from data_fetcher import DataFetcher
+from exchange_simulator import SimulatedExchange
+from execution import Execution
+from hft_components import OrderBookAnalyzer
+from main import process_symbol
+from performance_analytics import PerformanceAnalytics
+from risk_management import DynamicRiskManagement
+from strategy import Strategy, MultiStrategyManager
+
+SYMBOL = 'BTC/USDT:USDT'
+RISK_CONFIG = {'risk_per_trade': 1.0, 'max_risk_per_trade': 2.0, 'lookback_period': 100, 'var_confidence': 0.95,
+               'max_position_size': 1e6}
+
+
+class ScriptedStrategy(Strategy):
+    """Hands out one queued action per call."""
+
+    def __init__(self, actions):
+        super().__init__({}, 'momentum')
+        self.actions = list(actions)
+
+    def generate_signals(self, df, order_book_analysis, market_sentiment, ml_prediction, market_regime):
+        close = df['close'].iloc[-1]
+        return {'action': self.actions.pop(0), 'stop_loss': close * 0.95, 'take_profit': close * 1.05}
+
+
+class FixedRegime:
+    def detect_regime(self, prices, symbol=None):
+        return 0, [1.0, 0.0, 0.0]
+
+    def regime_description(self, regime):
+        return 'Low Volatility'
+
+
+def test_closing_a_position_records_the_trade():
+    exchange = SimulatedExchange([SYMBOL], initial_balance=1_000_000, initial_prices={SYMBOL: 100.0})
+    strategy = ScriptedStrategy(['buy', 'close'])
+    manager = MultiStrategyManager([strategy], {'momentum': 1.0})
+    analytics = PerformanceAnalytics(initial_capital=1_000_000)
+    data_fetcher = DataFetcher(exchange, {'timeframe': '1m', 'limit': 200})
+    risk_management = DynamicRiskManagement(RISK_CONFIG)
+    # a zero window makes each entry and exit one market order
+    execution = Execution(exchange, {'execution': {'adaptive_window': 0}})
+    current_positions = {}
+
+    async def run_once():
+        await process_symbol(SYMBOL, data_fetcher, manager, risk_management, execution, None, None, None,
+                             OrderBookAnalyzer(10), FixedRegime(), analytics, current_positions, None)
+
+    asyncio.run(run_once())
+    assert current_positions[SYMBOL]['side'] == 'buy'
+    assert exchange.positions[SYMBOL]['size'] > 0
+    assert analytics.calculate_metrics()['trades'] == 0
+
+    asyncio.run(run_once())
+    assert current_positions == {}
+    assert exchange.positions[SYMBOL]['size'] == 0.0
+    metrics = analytics.calculate_metrics()
+    assert metrics['trades'] == 1
+    assert metrics['by_strategy'][strategy]['trades'] == 1
@@ -0,0 +1,25 @@
+"""Portfolio VaR before the correlation engine can supply a covariance matrix."""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+from risk_management import DynamicRiskManagement
+
+CONFIG = {'risk_per_trade': 0.001, 'max_risk_per_trade': 0.002, 'lookback_period': 100, 'var_confidence': 0.95,
+          'max_position_size': 1e6}
+
+
+def test_fallback_var_weights_each_position_by_its_own_volatility():
+    rng = np.random.default_rng(7)
+    calm = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.001, 500))))
+    wild = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500))))
+    risk = DynamicRiskManagement(CONFIG)
+    risk.observe('CALM', calm)
+    risk.observe('WILD', wild)
+    positions = {'CALM': {'size': 1.0, 'entry_price': 100.0}, 'WILD': {'size': 3.0, 'entry_price': 100.0}}
+
+    expected = norm.ppf(0.05) * (100 * calm.pct_change().std() + 300 * wild.pct_change().std())
+    assert risk.calculate_var(positions) == pytest.approx(expected)
+    # the same portfolio seen from the calm symbol's cycle does not change
+    risk.observe('CALM', calm)
+    assert risk.calculate_var(positions) == pytest.approx(expected)
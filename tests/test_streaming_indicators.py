@@ -0,0 +1,96 @@
+"""Parity of the streaming indicators with the pandas implementations they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.indicator_panel import synthetic_frames
+from indicators import Indicators
+from ml_predictor import EnhancedMLPredictor
+from streaming_indicators import EMA, SMA, IndicatorEngine, RollingMax
+
+RTOL = 1e-9
+# a sliding window restarts pandas' EMAs at the window's first close while the
+# engine carries them from the first candle it saw; the gap decays as (1 - 2/27)^window
+MACD_ATOL = 1e-4
+WINDOW = 200
+
+
+@pytest.fixture(scope='module')
+def df():
+    return next(iter(synthetic_frames(1, 600, seed=3).values()))
+
+
+def reference(df):
+    predictor = EnhancedMLPredictor(backend='numpy')
+    atr = Indicators.calculate_atr(df, 14)
+    return pd.DataFrame({
+        'atr': atr,
+        'moving_average': Indicators.moving_average(df, 50),
+        'chandelier_exit': Indicators.chandelier_exit(df, atr, 14, 3.0),
+        'rsi': predictor._calculate_rsi(df['close'], 14),
+        'macd': predictor._calculate_macd(df['close']),
+    })
+
+
+def assert_row(values, expected, macd_atol=0.0):
+    for name, value in values.items():
+        if name == 'macd':
+            np.testing.assert_allclose(value, expected[name], rtol=RTOL, atol=macd_atol, equal_nan=True,
+                                       err_msg=name)
+        else:
+            np.testing.assert_allclose(value, expected[name], rtol=RTOL, equal_nan=True, err_msg=name)
+
+
+@pytest.mark.parametrize('period', [1, 5, 50])
+def test_sma_matches_rolling_mean(df, period):
+    sma = SMA(period)
+    streamed = [sma.update(x) for x in df['close']]
+    np.testing.assert_allclose(streamed, df['close'].rolling(period).mean(), rtol=RTOL, equal_nan=True)
+
+
+@pytest.mark.parametrize('span', [9, 12, 26])
+def test_ema_matches_ewm(df, span):
+    ema = EMA(span)
+    streamed = [ema.update(x) for x in df['close']]
+    np.testing.assert_allclose(streamed, df['close'].ewm(span=span, adjust=False).mean(), rtol=RTOL)
+
+
+@pytest.mark.parametrize('period', [1, 14, 22])
+def test_rolling_max_matches_pandas(df, period):
+    rolling_max = RollingMax(period)
+    streamed = []
+    for x in df['high']:
+        peeked = rolling_max.peek(x)
+        streamed.append(rolling_max.update(x))
+        np.testing.assert_allclose(peeked, streamed[-1], rtol=RTOL, equal_nan=True)
+    np.testing.assert_allclose(streamed, df['high'].rolling(period).max(), rtol=RTOL, equal_nan=True)
+
+
+def test_seeded_from_history(df):
+    expected = reference(df)
+    assert_row(IndicatorEngine().seed(df), expected.iloc[-1])
+
+
+def test_updated_one_candle_at_a_time(df):
+    expected = reference(df)
+    engine = IndicatorEngine()
+    for t in range(1, len(df)):
+        assert_row(engine.update(df.iloc[:t + 1]), expected.iloc[t])
+
+
+def test_open_candle_revisions_are_peeked_not_committed(df):
+    expected = reference(df)
+    engine = IndicatorEngine()
+    engine.seed(df.iloc[:-1])
+    # the newest candle changes while open; only its final version may count
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] *= 1.05
+    revised.iloc[-1, revised.columns.get_loc('high')] *= 1.05
+    engine.update(revised)
+    assert_row(engine.update(df), expected.iloc[-1])
+
+
+def test_sliding_window(df):
+    engine = IndicatorEngine()
+    for t in range(WINDOW, len(df)):
+        window = df.iloc[t - WINDOW + 1:t + 1]
+        assert_row(engine.update(window), reference(window).iloc[-1], macd_atol=MACD_ATOL)
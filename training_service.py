@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _train_in_worker(df, lookback, features, epochs, batch_size, checkpoint_path):
+    # Runs in a separate process; TensorFlow is imported there, not on the trading loop.
+    from ml_predictor import EnhancedMLPredictor
+
+    predictor = EnhancedMLPredictor(lookback=lookback, features=features)
+    predictor.train(df, epochs=epochs, batch_size=batch_size, verbose=0)
+
+    tmp_path = checkpoint_path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    predictor.save_checkpoint(tmp_path)
+    os.replace(tmp_path, checkpoint_path)
+    return checkpoint_path
+
+
+class ModelTrainingScheduler:
+    """Trains per-symbol LSTM models in a worker process and hot-swaps them into the predictor.
+
+    A symbol is retrained at most once per ``train_interval`` hours. Every fit
+    writes a new versioned checkpoint directory, which is loaded off the event
+    loop and installed in one dict assignment, so ``predict`` keeps using the
+    previous model until the new one is complete.
+    """
+
+    def __init__(self, predictor, config):
+        self.predictor = predictor
+        self.train_interval = config.get('train_interval', 24) * 3600
+        self.epochs = config.get('epochs', 50)
+        self.batch_size = config.get('batch_size', 32)
+        self.checkpoint_dir = config.get('checkpoint_dir', 'models')
+        self.keep_versions = config.get('keep_versions', 3)
+        self.retry_interval = config.get('retry_interval', 600)
+        self.executor = ProcessPoolExecutor(max_workers=config.get('max_workers', 1),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        self.last_trained = {}
+        self.pending = {}
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.checkpoint_dir, re.sub(r'[^A-Za-z0-9]+', '_', symbol).strip('_'))
+
+    def _versions(self, symbol):
+        symbol_dir = self._symbol_dir(symbol)
+        if not os.path.isdir(symbol_dir):
+            return []
+        return sorted(int(name[1:]) for name in os.listdir(symbol_dir) if re.fullmatch(r'v\d+', name))
+
+    def _version_path(self, symbol, version):
+        return os.path.join(self._symbol_dir(symbol), f"v{version:06d}")
+
+    async def restore(self, symbols):
+        """Install the newest checkpoint of every symbol, so a restart does not retrain everything."""
+        for symbol in symbols:
+            versions = self._versions(symbol)
+            if not versions:
+                continue
+            path = self._version_path(symbol, versions[-1])
+            try:
+                await self._install(symbol, versions[-1], path)
+                self.last_trained[symbol] = os.path.getmtime(path)
+            except Exception as e:
+                logging.warning(f"Could not restore model checkpoint {path}: {e}")
+
+    def is_due(self, symbol):
+        if symbol in self.pending:
+            return False
+        return time.time() - self.last_trained.get(symbol, 0) >= self.train_interval
+
+    def maybe_schedule(self, symbol, df):
+        if not self.is_due(symbol):
+            return False
+        self.pending[symbol] = asyncio.create_task(self._train(symbol, df))
+        return True
+
+    async def _train(self, symbol, df):
+        versions = self._versions(symbol)
+        version = versions[-1] + 1 if versions else 1
+        path = self._version_path(symbol, version)
+        os.makedirs(self._symbol_dir(symbol), exist_ok=True)
+        started = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, _train_in_worker, df, self.predictor.lookback,
+                                       self.predictor.features, self.epochs, self.batch_size, path)
+            await self._install(symbol, version, path)
+            self.last_trained[symbol] = time.time()
+            self._prune(symbol)
+            logging.info(f"Installed model v{version} for {symbol} (trained in {time.time() - started:.1f}s)")
+        except Exception as e:
+            # try again after retry_interval instead of waiting a full train_interval
+            self.last_trained[symbol] = time.time() - self.train_interval + self.retry_interval
+            logging.error(f"Model training failed for {symbol}: {e}", exc_info=True)
+        finally:
+            del self.pending[symbol]
+
+    async def _install(self, symbol, version, path):
+        model, scaler = await asyncio.to_thread(self.predictor.load_checkpoint, path)
+        self.predictor.install_model(symbol, version, model, scaler)
+
+    def _prune(self, symbol):
+        for version in self._versions(symbol)[:-self.keep_versions]:
+            shutil.rmtree(self._version_path(symbol, version), ignore_errors=True)
+
+    async def shutdown(self):
+        for task in list(self.pending.values()):
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
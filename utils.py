@@ -1,9 +1,8 @@
 import yaml
 import logging
 import ccxt
-import time
-import aiohttp
-import asyncio
+import ccxt.async_support as ccxt_async
+import numpy as np
 
 def setup_logging(log_level: str) -> None:
     logging.basicConfig(
@@ -16,16 +15,20 @@ def setup_logging(log_level: str) -> None:
     console.setLevel(log_level)
     logging.getLogger('').addHandler(console)
 
-def initialize_exchange(config):
+def initialize_exchange(config, transport=None):
     exchange_id = config['exchange']['id']
-    exchange_class = getattr(ccxt, exchange_id)
-    return exchange_class({
+    exchange_class = getattr(ccxt_async, exchange_id)
+    params = {
         'apiKey': config['exchange']['api_key'],
         'secret': config['exchange']['secret'],
         'enableRateLimit': True,
         'options': config['exchange'].get('options', {}),
         'aiohttp_proxy': config.get('proxy_url')  
-    })
+    }
+    if transport is not None:
+        # ccxt leaves a session it was handed open on close(); the transport owns it
+        params['session'] = transport.create_session()
+    return exchange_class(params)
 
 def load_config(file_path):
     with open(file_path, 'r') as file:
@@ -44,36 +47,35 @@ def handle_api_error(error):
         logging.error(f"An unexpected error occurred: {error}")
     logging.error(f"Error details: {str(error)}")
 
-async def get_server_time(exchange):
-    try:
-        response = await exchange.fetch_time()
-        return response
-    except Exception as e:
-        handle_api_error(e)
-        return None
+class RingBuffer:
+    """Fixed-capacity NumPy ring buffer; appends are O(1) and never reallocate."""
 
-async def sync_time(exchange):
-    max_attempts = 5
-    for attempt in range(max_attempts):
-        server_time = await get_server_time(exchange)
-        if server_time:
-            local_time = int(time.time() * 1000)
-            time_offset = server_time - local_time
-            logging.info(f"Time offset: {time_offset}ms")
-            return time_offset
-        logging.warning(f"Time sync attempt {attempt + 1} failed. Retrying...")
-        await asyncio.sleep(5)
-    logging.error("Failed to synchronize time after multiple attempts")
-    return None
+    def __init__(self, capacity, dtype=float):
+        self.capacity = capacity
+        self.data = np.empty(capacity, dtype=dtype)
+        self.start = 0
+        self.count = 0
 
-async def rate_limit_request(semaphore, callback, *args, **kwargs):
-    async with semaphore:
-        return await callback(*args, **kwargs)
+    def __len__(self):
+        return self.count
 
-class APIRateLimiter:
-    def __init__(self, rate_limit):
-        self.rate_limit = rate_limit
-        self.semaphore = asyncio.Semaphore(rate_limit)
+    def append(self, value):
+        end = (self.start + self.count) % self.capacity
+        self.data[end] = value
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
 
-    async def execute(self, callback, *args, **kwargs):
-        return await rate_limit_request(self.semaphore, callback, *args, **kwargs)
+    def first(self):
+        return self.data[self.start]
+
+    def last(self):
+        return self.data[(self.start + self.count - 1) % self.capacity]
+
+    def values(self):
+        """Contents in insertion order (a copy once the buffer has wrapped)."""
+        end = self.start + self.count
+        if end <= self.capacity:
+            return self.data[self.start:end]
+        return np.concatenate((self.data[self.start:], self.data[:end - self.capacity]))